@@ -0,0 +1,169 @@
+"""Wellness Activity Catalog
+
+Versioned catalog of curated wellness activities with precomputed embeddings.
+Activities are retrieved by similarity to a user's pattern summary instead of
+being generated by the LLM on every request.
+
+The embedding index is never built on a request thread. Build it offline with:
+    python activity_catalog.py
+or let main's startup task build it in the background when it is missing.
+Until an index for the current catalog version is available, retrieve()
+ranks activities by keyword overlap with their tags and benefits.
+"""
+
+import os
+import json
+import pickle
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+CATALOG_PATH = os.environ.get(
+    'ACTIVITY_CATALOG_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wellness_activities.json')
+)
+# Built index; defaults to next to the catalog (git-ignored), override to keep it with other runtime state
+INDEX_PATH = os.environ.get('ACTIVITY_INDEX_PATH')
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+CONTEXT_MATCH_BONUS = 0.1  # Similarity boost for activities tagged with the requested context
+INDEX_RECHECK_INTERVAL = 60  # Seconds between looks for an index built by another process
+
+def activity_document(activity: Dict) -> str:
+    """Text representation of an activity used for embedding"""
+    return " | ".join([
+        activity['activity_name'],
+        activity['description'],
+        "Helps with: " + ", ".join(activity.get('tags', [])),
+        "Benefits: " + ", ".join(activity.get('benefits', [])),
+        "Contexts: " + ", ".join(activity.get('contexts', []))
+    ])
+
+class ActivityCatalog:
+    def __init__(self, embedding_model, catalog_path: str = CATALOG_PATH,
+                 index_path: Optional[str] = None):
+        self.embedding_model = embedding_model
+        self.catalog_path = catalog_path
+        self.index_path = index_path or INDEX_PATH or os.path.splitext(catalog_path)[0] + '.index.pkl'
+        self.version = None
+        self.activities: List[Dict] = []
+        self.embeddings = None
+        self._index_checked_at = 0.0
+        self._lock = threading.Lock()
+
+        with open(catalog_path, encoding='utf-8') as f:
+            catalog = json.load(f)
+        self.version = catalog['version']
+        self.activities = catalog['activities']
+
+    def _load_index(self) -> bool:
+        """Load precomputed embeddings if they match the catalog version"""
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, 'rb') as f:
+                index = pickle.load(f)
+            if (index.get('version') != self.version
+                    or index.get('model') != EMBEDDING_MODEL_NAME
+                    or index.get('ids') != [a['id'] for a in self.activities]):
+                log.warning("⚠️ Activity index is stale", path=self.index_path)
+                return False
+            self.embeddings = index['embeddings']
+            return True
+        except Exception as e:
+            log.error("Error loading activity index", error=str(e))
+            return False
+
+    def build_index(self) -> None:
+        """Embed every activity and persist the normalised vectors"""
+        if not self.embedding_model:
+            raise RuntimeError("Embedding model required to build the activity index")
+
+        vectors = np.asarray(
+            self.embedding_model.encode([activity_document(a) for a in self.activities]),
+            dtype=np.float32
+        )
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        self.embeddings = vectors
+
+        with open(self.index_path, 'wb') as f:
+            pickle.dump({
+                'version': self.version,
+                'model': EMBEDDING_MODEL_NAME,
+                'ids': [a['id'] for a in self.activities],
+                'embeddings': vectors
+            }, f)
+        log.info("✅ Built activity index", version=self.version, activities=len(self.activities))
+
+    def has_index(self) -> bool:
+        """Whether embeddings are available; loads an index built offline or by another process
+        (at most every INDEX_RECHECK_INTERVAL seconds), never builds one"""
+        if self.embeddings is not None:
+            return True
+        if time.time() - self._index_checked_at < INDEX_RECHECK_INTERVAL:
+            return False
+        with self._lock:
+            if self.embeddings is None and time.time() - self._index_checked_at >= INDEX_RECHECK_INTERVAL:
+                self._load_index()
+                self._index_checked_at = time.time()
+        return self.embeddings is not None
+
+    def ensure_index(self) -> bool:
+        """Load the index, or build it when missing or stale (offline or on a background thread)"""
+        with self._lock:
+            if self.embeddings is not None or self._load_index():
+                return True
+            try:
+                self.build_index()
+                return True
+            except Exception as e:
+                log.error("Could not build activity index", error=str(e))
+                return False
+
+    def retrieve(self, query_text: str, context: str = 'general', top_k: int = 3) -> List[Dict]:
+        """Return the best matching activities with similarity scores (keyword scores until indexed)"""
+        if not self.has_index() or not self.embedding_model:
+            return self._retrieve_by_keywords(query_text, context, top_k)
+
+        query = np.asarray(self.embedding_model.encode(query_text), dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+        scores = self.embeddings @ query
+        return self._ranked([float(score) for score in scores], context, top_k)
+
+    def _retrieve_by_keywords(self, query_text: str, context: str, top_k: int) -> List[Dict]:
+        """Share of an activity's tags and benefit words that appear in the query"""
+        text = " " + " ".join(re.findall(r"[a-z]+(?:-[a-z]+)*", query_text.lower())) + " "
+        scores = []
+        for activity in self.activities:
+            terms = set(activity.get('tags', []))
+            for benefit in activity.get('benefits', []):
+                terms.update(re.findall(r"[a-z]{4,}", benefit.lower()))
+            matched = sum(1 for term in terms if f" {term} " in text)
+            scores.append(matched / len(terms) if terms else 0.0)
+        if not any(scores):
+            return []
+        return self._ranked(scores, context, top_k)
+
+    def _ranked(self, scores: List[float], context: str, top_k: int) -> List[Dict]:
+        results = []
+        for score, activity in zip(scores, self.activities):
+            if context in activity.get('contexts', []):
+                score += CONTEXT_MATCH_BONUS
+            results.append((score, activity))
+        results.sort(key=lambda x: x[0], reverse=True)
+
+        return [
+            dict(activity, similarity=round(score, 4), catalog_version=self.version)
+            for score, activity in results[:top_k]
+        ]
+
+if __name__ == "__main__":
+    from sentence_transformers import SentenceTransformer
+
+    catalog = ActivityCatalog(SentenceTransformer(EMBEDDING_MODEL_NAME))
+    catalog.build_index()
@@ -0,0 +1,171 @@
+"""Local content-addressed audio store
+
+Synthesized speech is downloaded once from Murf (or decoded from a data URL)
+and kept on disk under the SHA-256 of its bytes, with a small SQLite index of
+MIME type, size and last access for LRU eviction. The service then hands out
+its own /audio/<hash> URL, so replays and seeking never go back to Murf's CDN
+and never break when Murf's signed URLs expire.
+"""
+
+import os
+import base64
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+AUDIO_STORE_DIR = os.environ.get('AUDIO_STORE_DIR', 'audio_store')
+AUDIO_STORE_MAX_BYTES = int(os.environ.get('AUDIO_STORE_MAX_BYTES', 1024 * 1024 * 1024))  # 1 GB
+AUDIO_BASE_URL = os.environ.get('AUDIO_BASE_URL', 'http://localhost:5010')  # Public address of this service
+AUDIO_FETCH_TIMEOUT = 30  # Seconds
+AUDIO_FETCH_MAX_BYTES = int(os.environ.get('AUDIO_FETCH_MAX_BYTES', 20 * 1024 * 1024))  # Per clip, 20 MB
+AUDIO_FETCH_CHUNK_BYTES = 64 * 1024
+
+MIME_EXTENSIONS = {
+    'audio/mpeg': 'mp3',
+    'audio/wav': 'wav',
+    'audio/x-wav': 'wav',
+    'audio/ogg': 'ogg',
+    'audio/flac': 'flac'
+}
+
+class AudioStore:
+    def __init__(self, store_dir: str = AUDIO_STORE_DIR, max_bytes: int = AUDIO_STORE_MAX_BYTES,
+                 base_url: str = AUDIO_BASE_URL):
+        self.store_dir = os.path.abspath(store_dir)  # send_file resolves relative paths against the app root
+        self.max_bytes = max_bytes
+        self.base_url = base_url.rstrip('/')
+        self._lock = threading.Lock()
+        self._session = requests.Session()  # Reuse connections to the Murf CDN
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(os.path.join(self.store_dir, 'index.db'), check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS audio_blobs (
+                hash TEXT PRIMARY KEY,
+                mime_type TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_audio_blobs_lru ON audio_blobs (last_access)")
+        return conn
+
+    def reopen(self) -> None:
+        """Fresh index connection and HTTP session in a forked worker (neither is fork-safe)"""
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._session = requests.Session()
+
+    def path_for(self, audio_hash: str, mime_type: str) -> str:
+        extension = MIME_EXTENSIONS.get(mime_type, 'bin')
+        return os.path.join(self.store_dir, audio_hash[:2], f"{audio_hash}.{extension}")
+
+    def url_for(self, audio_hash: str) -> str:
+        return f"{self.base_url}/audio/{audio_hash}"
+
+    def put_bytes(self, data: bytes, mime_type: str = 'audio/mpeg') -> str:
+        """Store audio bytes and return their content hash"""
+        audio_hash = hashlib.sha256(data).hexdigest()
+        path = self.path_for(audio_hash, mime_type)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO audio_blobs (hash, mime_type, size_bytes, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(hash) DO UPDATE SET last_access = excluded.last_access
+            """, (audio_hash, mime_type, len(data), now, now))
+            self._evict()
+        return audio_hash
+
+    def fetch(self, url: str) -> str:
+        """Download audio from a URL (or decode a data URL) into the store and return its hash
+
+        Raises ValueError for anything that is not audio/* or is over AUDIO_FETCH_MAX_BYTES;
+        downloads are streamed and abandoned as soon as they pass the limit."""
+        if url.startswith('data:'):
+            header, encoded = url.split(',', 1)
+            mime_type = header[5:].split(';')[0] or 'audio/mpeg'
+            self._check_mime_type(mime_type)
+            if len(encoded) * 3 // 4 > AUDIO_FETCH_MAX_BYTES:
+                raise ValueError(f"Audio data URL over {AUDIO_FETCH_MAX_BYTES} bytes")
+            return self.put_bytes(base64.b64decode(encoded), mime_type)
+
+        with self._session.get(url, timeout=AUDIO_FETCH_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            mime_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            self._check_mime_type(mime_type)
+            content_length = response.headers.get('Content-Length')
+            if content_length and content_length.isdigit() and int(content_length) > AUDIO_FETCH_MAX_BYTES:
+                raise ValueError(f"Audio of {content_length} bytes is over {AUDIO_FETCH_MAX_BYTES}")
+
+            chunks, size = [], 0
+            for chunk in response.iter_content(chunk_size=AUDIO_FETCH_CHUNK_BYTES):
+                size += len(chunk)
+                if size > AUDIO_FETCH_MAX_BYTES:
+                    raise ValueError(f"Audio download passed {AUDIO_FETCH_MAX_BYTES} bytes")
+                chunks.append(chunk)
+        return self.put_bytes(b''.join(chunks), mime_type)
+
+    @staticmethod
+    def _check_mime_type(mime_type: str) -> None:
+        if not mime_type.startswith('audio/'):
+            raise ValueError(f"Not audio: {mime_type or 'no Content-Type'}")
+
+    def get_meta(self, audio_hash: str) -> Optional[Dict]:
+        """Metadata and file path for a stored blob, or None if it is missing"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mime_type, size_bytes, created_at FROM audio_blobs WHERE hash = ?", (audio_hash,)
+            ).fetchone()
+            if not row:
+                return None
+            path = self.path_for(audio_hash, row[0])
+            if not os.path.exists(path):
+                self._conn.execute("DELETE FROM audio_blobs WHERE hash = ?", (audio_hash,))
+                return None
+            self._conn.execute("UPDATE audio_blobs SET last_access = ? WHERE hash = ?", (time.time(), audio_hash))
+        return {'hash': audio_hash, 'mime_type': row[0], 'size_bytes': row[1], 'created_at': row[2], 'path': path}
+
+    def contains(self, audio_hash: str) -> bool:
+        return self.get_meta(audio_hash) is not None
+
+    def _evict(self) -> None:
+        """Delete least recently played blobs until within the size cap (caller holds the lock)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM audio_blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for audio_hash, mime_type, size in self._conn.execute(
+                "SELECT hash, mime_type, size_bytes FROM audio_blobs ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM audio_blobs WHERE hash = ?", (audio_hash,))
+            try:
+                os.remove(self.path_for(audio_hash, mime_type))
+            except OSError:
+                pass
+            total -= size
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM audio_blobs"
+            ).fetchone()
+        return {'blobs': count, 'size_bytes': total, 'max_bytes': self.max_bytes}
@@ -0,0 +1,54 @@
+"""Background job helpers for the AI service
+
+Small daemon-thread scheduler used for periodic maintenance work such as
+pre-generating insight reports. Jobs never raise into the scheduler loop.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+# Periodic jobs started in this process, keyed by name
+_periodic_jobs: Dict[str, threading.Thread] = {}
+
+def start_periodic_job(name: str, interval_seconds: float, job: Callable[[], None],
+                       initial_delay: Optional[float] = None) -> Optional[threading.Thread]:
+    """Run `job` every `interval_seconds` on a daemon thread (no-op if interval <= 0)"""
+    if interval_seconds <= 0:
+        log.info("⏸️ Background job disabled", job=name)
+        return None
+
+    existing = _periodic_jobs.get(name)
+    if existing and existing.is_alive():
+        return existing
+
+    def run():
+        time.sleep(interval_seconds if initial_delay is None else initial_delay)
+        while True:
+            started = time.time()
+            try:
+                job()
+            except Exception:
+                log.exception("Error in background job", job=name)
+            log.info("🔁 Background job finished", job=name, seconds=round(time.time() - started, 2))
+            time.sleep(interval_seconds)
+
+    thread = threading.Thread(target=run, name=f"job-{name}", daemon=True)
+    thread.start()
+    _periodic_jobs[name] = thread
+    return thread
+
+def start_background_task(name: str, task: Callable[[], None]) -> threading.Thread:
+    """Run a one-off task on a daemon thread"""
+    def run():
+        try:
+            task()
+        except Exception:
+            log.exception("Error in background task", task=name)
+
+    thread = threading.Thread(target=run, name=f"task-{name}", daemon=True)
+    thread.start()
+    return thread
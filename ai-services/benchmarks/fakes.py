@@ -0,0 +1,195 @@
+"""Deterministic stand-ins for Gemini and the embedding model
+
+FakeLLM answers every prompt the service sends (emotion, crisis, proactive,
+care agent analysis/activity/intervention/insight report, chat reply) with
+canned responses in the shape the callers parse, after a configurable
+latency. FakeEmbeddingModel returns hashed bag-of-words vectors, so texts
+that share words are similar and results are stable across runs.
+
+install_fakes() imports the service from the current directory (or a given
+tree) and swaps both in, so benchmarks exercise the real request path with
+no network and no API keys.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import types
+from typing import Optional
+
+import numpy as np
+
+EMBEDDING_DIMENSION = 384  # Same as all-MiniLM-L6-v2
+
+EMOTION_RESPONSE = {
+    "primary_emotion": "anxiety", "secondary_emotions": ["stress", "overwhelm"], "intensity": 3,
+    "emotional_context": "exam pressure and poor sleep", "avatar_emotion": "concerned"
+}
+CRISIS_RESPONSE = {
+    "crisis_indicators": [], "severity_level": 0, "immediate_action_required": False,
+    "reasoning": "No crisis indicators in the conversation"
+}
+PATTERN_ANALYSIS_RESPONSE = {
+    "identified_patterns": [{
+        "pattern_type": "emotional", "description": "Recurring exam-related anxiety", "confidence": 0.8,
+        "suggested_intervention": "activity", "urgency_level": 2
+    }],
+    "recommended_actions": [{
+        "action_type": "activity", "description": "Suggest a breathing exercise", "timing": "next_session", "priority": 2
+    }],
+    "wellness_trends": {"emotional_trajectory": "stable", "engagement_quality": "moderate", "risk_trajectory": "stable"}
+}
+ACTIVITY_RESPONSE = {
+    "activity_name": "Box breathing", "description": "A four-count breathing exercise before study sessions",
+    "duration": "5 minutes", "difficulty": "easy", "benefits": ["calm", "focus"],
+    "steps": ["Inhale for four counts", "Hold for four", "Exhale for four", "Hold for four"],
+    "cultural_elements": ["pranayama"], "progress_tracking": {"metrics": ["stress level"], "milestones": ["daily practice"]}
+}
+INTERVENTION_RESPONSE = {
+    "intervention_type": "check_in", "urgency_level": 2, "message": "How did the breathing exercise feel today?",
+    "suggested_actions": ["Try box breathing"], "resources": ["Campus counselling"],
+    "follow_up": {"timing": "2 days", "type": "check_in", "metrics": ["mood"]}
+}
+INSIGHT_REPORT_RESPONSE = {
+    "summary": {"overall_status": "Stable with exam-related stress", "key_concerns": ["sleep"],
+                "progress_indicators": ["engagement"]},
+    "detailed_analysis": {
+        "behavioral_patterns": ["late-night study"],
+        "risk_assessment": {"trend": "stable", "contributing_factors": ["exams"]},
+        "intervention_effectiveness": {"successful_strategies": ["breathing"], "areas_for_adjustment": ["sleep routine"]}
+    },
+    "recommendations": {"immediate_actions": ["sleep hygiene"], "long_term_strategies": ["study planning"],
+                        "suggested_resources": ["counselling"]},
+    "next_steps": {"priorities": ["sleep"], "monitoring_focus": ["mood"], "follow_up_timing": "one week"}
+}
+PROACTIVE_RESPONSE = "Namaste! Last time exams were weighing on you - how are you feeling about them today?"
+CHAT_RESPONSE = ("I hear how heavy the exams feel right now. **Let's take one slow breath together.** "
+                 "What part of the preparation worries you the most?")
+
+# First matching prompt marker wins; the chat reply is the default
+CANNED_RESPONSES = [
+    ('crisis assessment expert', json.dumps(CRISIS_RESPONSE)),
+    ('Analyze the emotional content', json.dumps(EMOTION_RESPONSE)),
+    ('analyzing user patterns', json.dumps(PATTERN_ANALYSIS_RESPONSE)),
+    ('Personalize this wellness activity', json.dumps({"description": ACTIVITY_RESPONSE['description'],
+                                                        "steps": ACTIVITY_RESPONSE['steps']})),
+    ('Generate a personalized wellness activity', json.dumps(ACTIVITY_RESPONSE)),
+    ('Generate an AI care agent intervention', json.dumps(INTERVENTION_RESPONSE)),
+    ('weekly mental health insight report', json.dumps(INSIGHT_REPORT_RESPONSE)),
+    ('proactive, empathetic message', PROACTIVE_RESPONSE),
+]
+
+class FakeLLM:
+    """LangChain-style chat model with canned responses and configurable latency"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            failed = self._random.random() < self.error_rate
+        return delay, failed
+
+    def invoke(self, prompt, *args, **kwargs):
+        text = prompt if isinstance(prompt, str) else str(prompt)
+        delay, failed = self._draw()
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise RuntimeError("fake LLM error")
+        content = next((response for marker, response in CANNED_RESPONSES if marker in text), CHAT_RESPONSE)
+        return types.SimpleNamespace(content=content, usage_metadata={
+            'input_tokens': len(text) // 4, 'output_tokens': len(content) // 4,
+            'total_tokens': (len(text) + len(content)) // 4
+        })
+
+class FakeEmbeddingModel:
+    """SentenceTransformer.encode stand-in: normalized hashed bag of words"""
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION):
+        self.dimension = dimension
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in re.findall(r'\w+', text.lower()):
+            vector[int(hashlib.md5(word.encode('utf-8')).hexdigest()[:8], 16) % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, **kwargs):
+        if isinstance(sentences, str):
+            return self._encode_one(sentences)
+        return np.stack([self._encode_one(text) for text in sentences]) if sentences else \
+            np.zeros((0, self.dimension), dtype=np.float32)
+
+BENCHMARK_ENV = {
+    'GEMINI_API_KEY': 'benchmark',  # main refuses to import without one; the LLM is replaced
+    'HF_HUB_OFFLINE': '1',  # The real embedding model fails fast instead of downloading
+    'TRANSFORMERS_OFFLINE': '1',
+    'TTS_WARMUP_ON_START': 'false',
+    'PROACTIVE_IDLE_SCAN_INTERVAL': '0',
+    'INSIGHT_REPORT_WARM_INTERVAL': '0',
+}
+
+def install_fakes(llm: Optional[FakeLLM] = None, embedding_model: Optional[FakeEmbeddingModel] = None,
+                  tree: Optional[str] = None, workdir: Optional[str] = None, ready_timeout: float = 120):
+    """Import main with fakes in place of Gemini and the embedding model; returns the module
+
+    State files (sessions, SQLite stores, caches) go to `workdir`, a fresh
+    temporary directory by default, so runs never touch the service's own.
+    """
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    tree = os.path.abspath(tree or os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if tree not in sys.path:
+        sys.path.insert(0, tree)
+    os.chdir(workdir or tempfile.mkdtemp(prefix='mindcare-bench-'))
+
+    import main
+
+    # Importing main starts nothing; begin component loading and jobs like the dev server does
+    # (trees that still start them on import just find everything already running)
+    start_jobs = getattr(main, 'start_background_jobs', None)
+    if start_jobs is not None:
+        start_jobs()
+    registry = getattr(main, 'component_registry', None)
+    deadline = time.time() + ready_timeout
+    while registry is not None and not registry.is_ready() and time.time() < deadline:
+        time.sleep(0.05)
+
+    llm = llm or FakeLLM()
+    embedding_model = embedding_model or FakeEmbeddingModel()
+    # Go through usage accounting like the real model does, where this tree has it
+    accountant = getattr(main, 'llm_accountant', None)
+    if accountant is not None:
+        from llm_accounting import AccountedLLM
+        main.geminiLlm = AccountedLLM(llm, accountant, main.GEMINI_MODEL)
+    else:
+        main.geminiLlm = llm
+    main.embedding_model = embedding_model
+
+    try:
+        from care_agent import AICareAgent
+        from activity_catalog import ActivityCatalog
+        main.care_agent = AICareAgent(llm=main.geminiLlm, embedding_model=embedding_model,
+                                      activity_catalog=ActivityCatalog(embedding_model))
+    except Exception:
+        pass  # Older trees build the care agent differently; chat falls back without it
+
+    import preference_mapping
+    preference_mapping.get_user_preferences = lambda user_id: None  # No database
+    main.RATE_LIMIT_INTERVAL = 0  # Benchmarks send turns back to back
+    return main
@@ -0,0 +1,100 @@
+"""Import-time benchmark for the AI service
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and reports
+the total import time plus the slowest modules, so regressions in startup
+(an eager heavy import creeping back in) are easy to spot.
+
+Usage:
+    python benchmarks/import_time.py                 # report
+    python benchmarks/import_time.py --record        # also append to benchmarks/results/import_time.jsonl
+    python benchmarks/import_time.py --max-ms 1000   # exit non-zero if importing main takes longer
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(SERVICE_DIR, 'benchmarks', 'results', 'import_time.jsonl')
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def run_import(module: str = 'main') -> Dict:
+    """Import the module in a fresh interpreter and parse the -X importtime output"""
+    started = time.time()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SERVICE_DIR, capture_output=True, text=True
+    )
+    wall_ms = (time.time() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    modules: List[Dict] = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append({
+                'module': match.group(4),
+                'self_ms': int(match.group(1)) / 1000,
+                'cumulative_ms': int(match.group(2)) / 1000,
+                'depth': (len(match.group(3)) - 1) // 2
+            })
+
+    target = next((m for m in modules if m['module'] == module), None)
+    return {
+        'module': module,
+        'wall_ms': round(wall_ms, 1),
+        'import_ms': target['cumulative_ms'] if target else None,
+        'modules': modules
+    }
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVICE_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='main')
+    parser.add_argument('--top', type=int, default=15, help='number of slowest modules to show')
+    parser.add_argument('--record', action='store_true', help='append the result to the results history')
+    parser.add_argument('--max-ms', type=float, help='fail if importing the module takes longer than this')
+    args = parser.parse_args()
+
+    result = run_import(args.module)
+    print(f"⏱️ import {result['module']}: {result['import_ms']:.1f} ms (interpreter wall time {result['wall_ms']:.1f} ms)")
+
+    print(f"\nSlowest direct imports of {args.module} (cumulative):")
+    direct = [m for m in result['modules'] if m['depth'] == 1]
+    for entry in sorted(direct, key=lambda m: m['cumulative_ms'], reverse=True)[:args.top]:
+        print(f"  {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+
+    print("\nSlowest modules (self time):")
+    for entry in sorted(result['modules'], key=lambda m: m['self_ms'], reverse=True)[:args.top]:
+        print(f"  {entry['self_ms']:9.1f} ms  {entry['module']}")
+
+    if args.record:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'timestamp': time.time(),
+                'revision': git_revision(),
+                'module': result['module'],
+                'import_ms': result['import_ms'],
+                'wall_ms': result['wall_ms']
+            }) + '\n')
+        print(f"\n📝 Recorded to {RESULTS_PATH}")
+
+    if args.max_ms is not None and result['import_ms'] is not None and result['import_ms'] > args.max_ms:
+        print(f"❌ import {result['module']} took {result['import_ms']:.1f} ms, budget is {args.max_ms:.1f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
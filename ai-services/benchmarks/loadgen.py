@@ -0,0 +1,318 @@
+"""Load generator for the AI service
+
+Simulates concurrent users holding realistic multi-turn sessions: a session
+may open with /proactive_chat, then sends several /chat turns with think
+time in between (carrying up to 20 earlier session messages as
+sessionHistory, like the Node backend does), and has some replies spoken
+through /generate_speech. Each virtual user keeps one user id across its
+sessions, so per-user state builds up as it does in production.
+
+By default the script starts benchmarks/standin_server.py and the service
+under gunicorn (gunicorn.conf.py) pointed at the stand-in, so no network or
+API keys are needed. Pass --target to drive a service that is already
+running; configure that service with GEMINI_API_ENDPOINT and MURF_BASE_URL
+yourself.
+
+Reports p50/p95/p99 latency, throughput and error rate per endpoint.
+
+Usage:
+    python benchmarks/loadgen.py --users 200 --duration 120
+    python benchmarks/loadgen.py --users 300 --workers 4 --threads 16 --gemini-latency lognormal:1200,0.5 --record
+    python benchmarks/loadgen.py --target http://127.0.0.1:5010 --users 50 --duration 60
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(SERVICE_DIR, 'benchmarks', 'results', 'loadgen.jsonl')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from standin_server import parse_latency  # noqa: E402
+
+READY_TIMEOUT = 300  # Seconds for the spawned service to load its components
+ENDPOINTS = ('/proactive_chat', '/chat', '/generate_speech')
+SESSION_HISTORY_LIMIT = 20  # Messages the backend forwards as sessionHistory
+
+# (context, turns) scripts; sessions replay a random one
+SESSIONS = [
+    ('academic', [
+        "I have my semester exams starting next week",
+        "I can't focus for more than twenty minutes before my mind wanders",
+        "My parents keep comparing my marks with my cousin's",
+        "I stayed up till 3am and still didn't finish the syllabus",
+        "Maybe I should make a timetable, can you help me plan?",
+        "Thanks, I'll try the pomodoro thing tomorrow",
+    ]),
+    ('family', [
+        "There was a big fight at home again last night",
+        "My father wants me to do engineering but I want to study design",
+        "I feel guilty because they spent so much on my coaching",
+        "I don't know how to talk to them without it becoming an argument",
+        "Okay, I could try talking to my mother first",
+    ]),
+    ('general', [
+        "Hi, I've been feeling low for a few days",
+        "Nothing specific happened, I just feel tired all the time",
+        "I stopped going to the gym and I barely talk to my friends",
+        "I guess I miss how things were before college",
+        "A walk in the evening sounds doable",
+    ]),
+    ('academic', [
+        "I didn't get selected in the campus placement interview",
+        "Everyone in my hostel got an offer except me",
+        "Sometimes I feel hopeless about my future",
+        "I have another interview on Friday",
+    ]),
+]
+
+class EndpointStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {endpoint: [] for endpoint in ENDPOINTS}
+        self.errors: Dict[str, Dict[str, int]] = {endpoint: {} for endpoint in ENDPOINTS}
+
+    def add(self, endpoint: str, latency: float, error: Optional[str]) -> None:
+        with self._lock:
+            self.latencies[endpoint].append(latency)
+            if error:
+                self.errors[endpoint][error] = self.errors[endpoint].get(error, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Dict]:
+        def percentile(values: List[float], fraction: float) -> Optional[float]:
+            return round(values[min(len(values) - 1, int(len(values) * fraction))] * 1000, 1) if values else None
+
+        result = {}
+        with self._lock:
+            for endpoint in ENDPOINTS:
+                values = sorted(self.latencies[endpoint])
+                errors = sum(self.errors[endpoint].values())
+                result[endpoint] = {
+                    'requests': len(values),
+                    'requests_per_second': round(len(values) / elapsed, 2) if elapsed else None,
+                    'errors': errors,
+                    'error_rate': round(errors / len(values), 4) if values else None,
+                    'errors_by_kind': dict(self.errors[endpoint]),
+                    'p50_ms': percentile(values, 0.50),
+                    'p95_ms': percentile(values, 0.95),
+                    'p99_ms': percentile(values, 0.99),
+                    'max_ms': round(values[-1] * 1000, 1) if values else None
+                }
+        return result
+
+def classify(endpoint: str, response: requests.Response) -> Optional[str]:
+    """Error kind for a response, None when it succeeded"""
+    if response.status_code >= 400:
+        return f"http_{response.status_code}"
+    try:
+        body = response.json()
+    except ValueError:
+        return 'invalid_json'
+    if endpoint == '/generate_speech' and not body.get('success'):
+        return 'speech_failed'
+    if endpoint == '/chat' and not body.get('response'):
+        return 'empty_reply'
+    return None
+
+class VirtualUser(threading.Thread):
+    """Replays sessions for one user id until the deadline"""
+
+    def __init__(self, index: int, args, stats: EndpointStats, deadline: float, start_delay: float):
+        super().__init__(name=f"vu-{index}", daemon=True)
+        self.user_id = f"load-{index}"
+        self.args = args
+        self.stats = stats
+        self.deadline = deadline
+        self.start_delay = start_delay
+        self.think_time = parse_latency(args.think_time)
+        self.random = random.Random(args.seed * 100003 + index if args.seed is not None else None)
+        self.session = requests.Session()
+
+    def post(self, endpoint: str, payload: Dict) -> Optional[Dict]:
+        started = time.perf_counter()
+        try:
+            response = self.session.post(self.args.target + endpoint, json=payload, timeout=self.args.timeout)
+        except requests.RequestException as e:
+            self.stats.add(endpoint, time.perf_counter() - started, type(e).__name__)
+            return None
+        error = classify(endpoint, response)
+        self.stats.add(endpoint, time.perf_counter() - started, error)
+        return None if error else response.json()
+
+    def pause(self) -> bool:
+        """Think time before the next action; False once the run is over"""
+        delay = self.think_time(self.random)
+        if time.time() + delay >= self.deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def run(self):
+        time.sleep(self.start_delay)  # Ramp-up
+        while time.time() < self.deadline:
+            context, script = self.random.choice(SESSIONS)
+            history: List[Dict] = []
+            if self.random.random() < self.args.proactive_rate:
+                self.post('/proactive_chat', {'userId': self.user_id, 'context': context})
+            turns = script[:self.random.randint(max(1, len(script) // 2), len(script))]
+            for message in turns:
+                if not self.pause():
+                    return
+                reply = self.post('/chat', {'message': message, 'userId': self.user_id, 'context': context,
+                                            'sessionHistory': history[-SESSION_HISTORY_LIMIT:]})
+                history.append({'role': 'user', 'content': message})
+                if reply is None:
+                    continue
+                history.append({'role': 'assistant', 'content': reply['response']})
+                if self.random.random() < self.args.tts_rate:
+                    self.post('/generate_speech', {'text': reply['response'], 'userId': self.user_id})
+            if not self.pause():  # Gap between sessions
+                return
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for(url: str, timeout: float, process: subprocess.Popen) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before becoming ready")
+        try:
+            if requests.get(url, timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+def start_stack(args, workdir: str) -> Tuple[List[subprocess.Popen], str, str]:
+    """Start the stand-in and the service pointed at it; returns (processes, service URL, stand-in URL)"""
+    standin_port, service_port = free_port(), free_port()
+    standin_url = f"http://127.0.0.1:{standin_port}"
+    standin = subprocess.Popen(
+        [sys.executable, os.path.join(SERVICE_DIR, 'benchmarks', 'standin_server.py'), '--port', str(standin_port),
+         '--gemini-latency', args.gemini_latency, '--gemini-error-rate', str(args.gemini_error_rate),
+         '--murf-latency', args.murf_latency, '--murf-error-rate', str(args.murf_error_rate)]
+        + (['--repeat-replies'] if args.repeat_replies else []),
+        stdout=subprocess.DEVNULL, stderr=open(os.path.join(workdir, 'standin.log'), 'wb'))
+    wait_for(f"{standin_url}/stats", 30, standin)
+
+    env = dict(os.environ,
+               GEMINI_API_KEY='standin', MURF_API_KEY='standin',  # Set so a local .env cannot supply real keys
+               GEMINI_API_ENDPOINT=standin_url, MURF_BASE_URL=standin_url, MURF_BACKEND='murf',
+               GUNICORN_BIND=f"127.0.0.1:{service_port}", GUNICORN_WORKERS=str(args.workers),
+               GUNICORN_THREADS=str(args.threads), TTS_WARMUP_ON_START='false',
+               LOG_LEVEL=args.log_level, PYTHONPATH=SERVICE_DIR)
+    env.setdefault('HF_HUB_OFFLINE', '1')  # Use the cached embedding model, never download mid-benchmark
+    env.setdefault('TRANSFORMERS_OFFLINE', '1')
+    service_log = os.path.join(workdir, 'service.log')
+    service = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(SERVICE_DIR, 'gunicorn.conf.py')],
+        cwd=workdir, env=env, stdout=open(service_log, 'wb'), stderr=subprocess.STDOUT)
+    service_url = f"http://127.0.0.1:{service_port}"
+    try:
+        wait_for(f"{service_url}/readyz", READY_TIMEOUT, service)
+    except RuntimeError:
+        standin.terminate()
+        service.terminate()
+        raise RuntimeError(f"Service did not start, see {service_log}")
+    return [service, standin], service_url, standin_url
+
+def print_report(report: Dict[str, Dict], elapsed: float, users: int) -> None:
+    print(f"\n{users} users for {elapsed:.0f}s")
+    print(f"{'endpoint':<18}{'requests':>9}{'req/s':>9}{'errors':>8}{'err %':>8}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for endpoint, row in report.items():
+        if not row['requests']:
+            continue
+        print(f"{endpoint:<18}{row['requests']:>9}{row['requests_per_second']:>9.1f}{row['errors']:>8}"
+              f"{row['error_rate'] * 100:>7.2f}%{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+              f"{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}")
+        if row['errors_by_kind']:
+            print(f"{'':<18}errors: " + ', '.join(f"{kind} x{count}" for kind, count in row['errors_by_kind'].items()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', help='URL of a running service (default: start the stand-in and the service)')
+    parser.add_argument('--users', type=int, default=100, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds of load after ramp-up starts')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Seconds over which users start')
+    parser.add_argument('--think-time', default='lognormal:4000,0.5', help='Pause between a user\'s actions (ms distribution)')
+    parser.add_argument('--proactive-rate', type=float, default=0.5, help='Share of sessions opening with /proactive_chat')
+    parser.add_argument('--tts-rate', type=float, default=0.3, help='Share of replies sent to /generate_speech')
+    parser.add_argument('--timeout', type=float, default=60, help='Client timeout per request (seconds)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers of the spawned service')
+    parser.add_argument('--threads', type=int, default=16, help='gunicorn threads per worker of the spawned service')
+    parser.add_argument('--log-level', default='WARNING', help='Log level of the spawned service')
+    parser.add_argument('--gemini-latency', default='lognormal:800,0.4')
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0)
+    parser.add_argument('--murf-latency', default='lognormal:700,0.3')
+    parser.add_argument('--murf-error-rate', type=float, default=0.0)
+    parser.add_argument('--repeat-replies', action='store_true', help='Stand-in repeats chat replies, so speech is cached')
+    parser.add_argument('--record', action='store_true', help=f"Append the report to {RESULTS_PATH}")
+    args = parser.parse_args()
+    parse_latency(args.think_time)  # Fail on a bad spec before starting anything
+
+    processes: List[subprocess.Popen] = []
+    standin_url = None
+    if not args.target:
+        workdir = tempfile.mkdtemp(prefix='loadgen-')
+        print(f"Starting stand-in and service (state and logs in {workdir})...")
+        processes, args.target, standin_url = start_stack(args, workdir)
+    args.target = args.target.rstrip('/')
+
+    stats = EndpointStats()
+    started = time.time()
+    deadline = started + args.duration
+    users = [VirtualUser(index, args, stats, deadline, args.ramp_up * index / max(args.users, 1))
+             for index in range(args.users)]
+    try:
+        for user in users:
+            user.start()
+        for user in users:
+            user.join(timeout=max(0.0, deadline - time.time()) + args.timeout)
+        elapsed = time.time() - started
+        report = stats.report(elapsed)
+        print_report(report, elapsed, args.users)
+
+        standin_stats = None
+        if standin_url:
+            try:
+                standin_stats = requests.get(f"{standin_url}/stats", timeout=5).json()['apis']
+                print("\nStand-in calls: " + ', '.join(f"{api} {row['requests']} ({row['errors']} injected errors)"
+                                                       for api, row in standin_stats.items()))
+            except (requests.RequestException, ValueError, KeyError):
+                pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    if args.record:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        params = {key: value for key, value in vars(args).items() if key not in ('record', 'target')}
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'timestamp': time.time(), 'params': params, 'seconds': round(elapsed, 1),
+                                'endpoints': report, 'standin': standin_stats}) + '\n')
+        print(f"\nRecorded to {RESULTS_PATH}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Request throughput before and after a logging change
+
+Drives /chat through the Flask test client in a fresh interpreter, with the
+LLM and embedding model replaced by instant fakes so request handling and
+logging dominate the time. The worker's stdout is a pipe drained by this
+process (like a container log collector), a pipe drained at a limited rate
+(a slow terminal or remote collector, where a blocking print stalls the
+request thread) or a file.
+
+The baseline runs against a temporary git worktree of another revision, the
+candidate against this working tree. Rounds alternate between the two and the
+median of each is reported, as single runs vary by 10-20% on a busy machine.
+
+Usage:
+    python benchmarks/logging_throughput.py                          # baseline HEAD vs working tree
+    python benchmarks/logging_throughput.py --baseline f8921a6 --threads 8 --requests 2000
+    python benchmarks/logging_throughput.py --sink slow --sink-kbps 128 --record
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(SERVICE_DIR)
+RESULTS_PATH = os.path.join(SERVICE_DIR, 'benchmarks', 'results', 'logging_throughput.jsonl')
+READY_TIMEOUT = 120  # Seconds for background component loading in the worker
+
+WORKER_ENV = {
+    'GEMINI_API_KEY': 'benchmark',  # main refuses to import without one; fakes.py replaces the LLM
+    'HF_HUB_OFFLINE': '1',  # Fail the real embedding model fast, the fake replaces it
+    'TRANSFORMERS_OFFLINE': '1',
+    'TTS_WARMUP_ON_START': 'false',
+    'MURF_API_KEY': ''
+}
+
+def run_worker(tree: str, requests_count: int, threads: int, result_path: str) -> None:
+    """Runs in the child interpreter: import the service from `tree` and time /chat"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from fakes import install_fakes
+    main = install_fakes(tree=tree, workdir=os.getcwd(), ready_timeout=READY_TIMEOUT)
+
+    def send(index: int) -> float:
+        client = main.app.test_client()
+        started = time.perf_counter()
+        response = client.post('/chat', json={
+            'message': f"I have exams next week and I can't sleep, my email is student{index}@example.com",
+            'userId': f"bench-{os.getpid()}-{index}",  # Unique ids keep the rate limiter out of the way
+            'context': 'academic'
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"/chat returned {response.status_code}")
+        return time.perf_counter() - started
+
+    for index in range(20):  # Warm up lazy imports and caches
+        send(-index - 1)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(send, range(requests_count)))
+    elapsed = time.perf_counter() - started
+
+    # Records still queued in the new logging layer are not on the request path, but report the drain
+    drain_started = time.perf_counter()
+    try:
+        from service_logging import flush_logging
+        flush_logging()
+    except ImportError:
+        pass
+    sys.stdout.flush()
+
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'requests': requests_count,
+            'threads': threads,
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(requests_count / elapsed, 1),
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+            'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+            'log_drain_ms': round((time.perf_counter() - drain_started) * 1000, 1)
+        }, f)
+
+def measure(tree: str, requests_count: int, threads: int, sink: str, sink_kbps: float) -> Dict:
+    """Run one worker against `tree` and collect its result and log volume"""
+    workdir = tempfile.mkdtemp(prefix='logbench-')  # Sessions and caches land here, not in the tree
+    result_path = os.path.join(workdir, 'result.json')
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--tree', tree,
+               '--requests', str(requests_count), '--threads', str(threads), '--result', result_path]
+    env = dict(os.environ, **WORKER_ENV)
+
+    log_bytes = 0
+    stderr_path = os.path.join(workdir, 'stderr.log')
+    if sink == 'file':
+        log_path = os.path.join(workdir, 'service.log')
+        with open(log_path, 'wb') as log_file, open(stderr_path, 'wb') as stderr_file:
+            process = subprocess.run(command, cwd=workdir, env=env, stdout=log_file, stderr=stderr_file)
+        log_bytes = os.path.getsize(log_path)
+    else:
+        with open(stderr_path, 'wb') as stderr_file:
+            process = subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.PIPE, stderr=stderr_file)
+
+        def drain():
+            nonlocal log_bytes
+            chunk_size = 4096 if sink == 'slow' else 65536
+            for chunk in iter(lambda: process.stdout.read(chunk_size), b''):
+                log_bytes += len(chunk)
+                if sink == 'slow':
+                    time.sleep(len(chunk) / (sink_kbps * 1024))
+
+        drainer = threading.Thread(target=drain, daemon=True)
+        drainer.start()
+        process.wait()
+        drainer.join()
+
+    if process.returncode != 0:
+        with open(stderr_path, encoding='utf-8', errors='replace') as f:
+            raise RuntimeError(f"benchmark worker failed for {tree}:\n{f.read()[-3000:]}")
+    with open(result_path, encoding='utf-8') as f:
+        result = json.load(f)
+    result['log_kb'] = round(log_bytes / 1024, 1)
+    return result
+
+def median_result(runs: List[Dict]) -> Dict:
+    """Per-field median over rounds"""
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+def print_report(results: Dict[str, Dict]) -> None:
+    print(f"\n{'tree (median)':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'log KB':>10}{'drain ms':>10}")
+    for label, result in results.items():
+        print(f"{label:<28}{result['requests_per_second']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['log_kb']:>10.1f}{result['log_drain_ms']:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', default='HEAD', help='git revision to compare against')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=3, help='alternating runs per tree')
+    parser.add_argument('--sink', choices=('pipe', 'slow', 'file'), default='pipe', help='where the worker stdout goes')
+    parser.add_argument('--sink-kbps', type=float, default=256, help='drain rate of the slow sink')
+    parser.add_argument('--record', action='store_true', help='append the result to the results history')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--tree', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.tree, args.requests, args.threads, args.result)
+        return
+
+    worktree = tempfile.mkdtemp(prefix='logbench-baseline-')
+    subprocess.run(['git', 'worktree', 'add', '--detach', worktree, args.baseline],
+                   cwd=REPO_DIR, check=True, capture_output=True)
+    trees = {f"baseline ({args.baseline})": os.path.join(worktree, 'ai-services'), 'working tree': SERVICE_DIR}
+    runs: Dict[str, List[Dict]] = {label: [] for label in trees}
+    try:
+        for round_number in range(args.rounds):
+            for label, tree in trees.items():
+                runs[label].append(measure(tree, args.requests, args.threads, args.sink, args.sink_kbps))
+                print(f"round {round_number + 1}/{args.rounds} {label}: {runs[label][-1]['requests_per_second']} req/s")
+    finally:
+        subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=REPO_DIR, capture_output=True)
+
+    results = {label: median_result(label_runs) for label, label_runs in runs.items()}
+    print_report(results)
+    baseline, candidate = results.values()
+    change = (candidate['requests_per_second'] / baseline['requests_per_second'] - 1) * 100
+    print(f"\n📈 Throughput change: {change:+.1f}% ({args.threads} threads, {args.sink} sink)")
+
+    if args.record:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'timestamp': time.time(), 'baseline': args.baseline,
+                                'sink': args.sink, 'rounds': args.rounds, 'results': results,
+                                'runs': runs}) + '\n')
+        print(f"\n📝 Recorded to {RESULTS_PATH}")
+
+if __name__ == "__main__":
+    main()
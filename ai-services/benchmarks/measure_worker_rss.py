@@ -0,0 +1,146 @@
+"""Per-worker memory of the pre-fork server
+
+Reads /proc for a gunicorn master and its workers and reports RSS, PSS
+(proportional set size: shared pages divided among the processes mapping
+them) and private memory per process, plus totals. Summed RSS counts shared
+copy-on-write pages once per worker; summed PSS is the real footprint.
+
+Usage:
+    python benchmarks/measure_worker_rss.py --pid <gunicorn master pid>
+    python benchmarks/measure_worker_rss.py --launch --workers 4            # start, wait for readiness, measure, stop
+    python benchmarks/measure_worker_rss.py --launch --workers 4 --compare  # also measure without preload
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import requests
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(SERVICE_DIR, 'benchmarks', 'results', 'worker_rss.jsonl')
+READY_TIMEOUT = 600  # Seconds; each worker may load the model itself when preload is off
+
+def read_memory(pid: int) -> Dict:
+    """RSS, PSS and private memory of one process in MB"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    private_kb = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {
+        'pid': pid,
+        'rss_mb': round(fields.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+        'private_mb': round(private_kb / 1024, 1),
+        'shared_mb': round((fields.get('Rss', 0) - private_kb) / 1024, 1)
+    }
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        try:
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return sorted(children)
+
+def measure(master_pid: int) -> Dict:
+    master = read_memory(master_pid)
+    workers = [read_memory(pid) for pid in child_pids(master_pid)]
+    processes = [master] + workers
+    return {
+        'master': master,
+        'workers': workers,
+        'total_rss_mb': round(sum(p['rss_mb'] for p in processes), 1),
+        'total_pss_mb': round(sum(p['pss_mb'] for p in processes), 1)
+    }
+
+def print_report(label: str, report: Dict) -> None:
+    print(f"\n{label}")
+    print(f"  {'process':<16}{'RSS MB':>10}{'PSS MB':>10}{'private':>10}{'shared':>10}")
+    rows = [('master', report['master'])] + [(f"worker {w['pid']}", w) for w in report['workers']]
+    for name, entry in rows:
+        print(f"  {name:<16}{entry['rss_mb']:>10.1f}{entry['pss_mb']:>10.1f}{entry['private_mb']:>10.1f}{entry['shared_mb']:>10.1f}")
+    print(f"  {'total':<16}{report['total_rss_mb']:>10.1f}{report['total_pss_mb']:>10.1f}")
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, worker_count: int) -> None:
+    """Poll /readyz until several answers in a row are ready (requests land on arbitrary workers)"""
+    deadline = time.time() + READY_TIMEOUT
+    consecutive = 0
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            response = requests.get(f"{base_url}/readyz", timeout=5)
+            consecutive = consecutive + 1 if response.status_code == 200 else 0
+            if consecutive >= worker_count * 2:
+                return
+        except requests.RequestException:
+            consecutive = 0
+        time.sleep(0.2)
+    raise TimeoutError("service did not become ready in time")
+
+def launch_and_measure(workers: int, preload: bool, port: int, settle: float) -> Dict:
+    env = dict(os.environ, GUNICORN_WORKERS=str(workers), GUNICORN_PRELOAD='1' if preload else '0',
+               GUNICORN_BIND=f'127.0.0.1:{port}', TTS_WARMUP_ON_START='false')
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+                               cwd=SERVICE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(f"http://127.0.0.1:{port}", process, workers)
+        time.sleep(settle)  # Let background loaders finish in every worker
+        return measure(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pid', type=int, help='gunicorn master pid to inspect')
+    parser.add_argument('--launch', action='store_true', help='start gunicorn with gunicorn.conf.py and measure it')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--settle', type=float, default=5.0, help='seconds to wait after readiness before measuring')
+    parser.add_argument('--compare', action='store_true', help='with --launch, also measure with preload disabled')
+    parser.add_argument('--record', action='store_true', help='append the result to the results history')
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("❌ /proc/<pid>/smaps_rollup is required (Linux 4.14+)")
+        sys.exit(1)
+
+    reports = {}
+    if args.pid:
+        reports['running'] = measure(args.pid)
+    elif args.launch:
+        reports['preload'] = launch_and_measure(args.workers, True, args.port, args.settle)
+        if args.compare:
+            reports['no_preload'] = launch_and_measure(args.workers, False, args.port, args.settle)
+    else:
+        parser.error('pass --pid or --launch')
+
+    for label, report in reports.items():
+        print_report(f"{label}: {len(report['workers'])} workers", report)
+    if 'preload' in reports and 'no_preload' in reports:
+        saved = reports['no_preload']['total_pss_mb'] - reports['preload']['total_pss_mb']
+        print(f"\n📉 Preloading saves {saved:.1f} MB PSS across {args.workers} workers")
+
+    if args.record:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'timestamp': time.time(), 'workers': args.workers, 'reports': reports}) + '\n')
+        print(f"\n📝 Recorded to {RESULTS_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Replay captured /chat traffic against a build, with recorded LLM responses
+
+Reads files written by traffic_capture.py (plain or .gz JSON lines) and
+re-sends each request through Flask's test client in capture order. Every
+LLM call is answered with the response recorded for the same caller (the
+tracing span, e.g. llm.emotion) in that request, and recorded errors are
+raised again, so the build does the same work it did in production while the
+time measured is only this code: prompt building, response parsing, state
+updates. Calls with no recorded response get the canned fakes and are
+counted as misses; recorded responses whose prompt length differs are
+counted as prompt changes, a sign that prompt building changed. Captured
+text is filler of the original length (see traffic_capture.py), so prompts
+keep their size but not their wording.
+
+Each run uses a fresh interpreter. With --baseline, runs alternate between a
+temporary git worktree of that revision and this working tree, and the
+median of each is compared.
+
+Usage:
+    python benchmarks/replay.py traffic_capture.jsonl.*
+    python benchmarks/replay.py traffic_capture.jsonl.* --baseline HEAD~1 --rounds 3
+    python benchmarks/replay.py capture.jsonl.gz --limit 2000 --record
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from typing import Dict, Iterator, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(SERVICE_DIR)
+RESULTS_PATH = os.path.join(SERVICE_DIR, 'benchmarks', 'results', 'replay.jsonl')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def read_records(paths: List[str], limit: int = 0) -> Iterator[Dict]:
+    count = 0
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Truncated last line of a capture that was being written
+                if record.get('request', {}).get('endpoint') != 'chat':
+                    continue
+                yield record
+                count += 1
+                if limit and count >= limit:
+                    return
+
+class ReplayLLM:
+    """Serves the LLM responses recorded for the request being replayed"""
+
+    def __init__(self, fallback, span_name=None):
+        self.fallback = fallback
+        self.span_name = span_name
+        self.pending: List[Dict] = []
+        self.owner = None
+        self.stats = {'served': 0, 'missed': 0, 'prompt_changed': 0, 'errors_replayed': 0}
+
+    def load(self, calls: List[Dict]) -> None:
+        self.pending = list(calls)
+        self.owner = threading.get_ident()
+
+    def invoke(self, prompt, *args, **kwargs):
+        if threading.get_ident() != self.owner:
+            return self.fallback.invoke(prompt)  # Background work that was not part of the request
+        caller = self.span_name() if self.span_name else None
+        prompt_chars = len(str(prompt))
+        match = next((call for call in self.pending if call.get('caller') == caller), None) or \
+            next((call for call in self.pending if call.get('prompt_chars') == prompt_chars), None)
+        if match is None:
+            self.stats['missed'] += 1
+            return self.fallback.invoke(prompt)
+        self.pending.remove(match)
+        if match.get('prompt_chars') != prompt_chars:
+            self.stats['prompt_changed'] += 1
+        if 'error' in match:
+            self.stats['errors_replayed'] += 1
+            raise RuntimeError(f"replayed LLM error: {match['error']}")
+        self.stats['served'] += 1
+        return types.SimpleNamespace(content=match.get('output', ''), usage_metadata=None)
+
+def run_worker(tree: str, capture_paths: List[str], limit: int, result_path: str) -> None:
+    """Runs in the child interpreter: import the service from `tree` and replay the capture"""
+    from fakes import FakeLLM, install_fakes
+
+    replay_llm = ReplayLLM(FakeLLM())
+    main = install_fakes(llm=replay_llm, tree=tree, workdir=os.getcwd())
+    try:
+        from tracing import current_span_name
+        replay_llm.span_name = current_span_name
+    except ImportError:
+        pass  # Trees without spans match recorded calls by prompt length only
+
+    client = main.app.test_client()
+    latencies: List[float] = []
+    status_changed = 0
+    cpu_started = time.process_time()
+    for record in read_records(capture_paths, limit):
+        request = record['request']
+        payload = {'message': request.get('message', ''), 'userId': request.get('user', 'anonymous'),
+                   'context': request.get('context', 'general'), 'sessionHistory': request.get('sessionHistory', [])}
+        replay_llm.load(record.get('llm_calls', []))
+        started = time.perf_counter()
+        response = client.post('/chat', json=payload)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != record.get('response', {}).get('status', 200):
+            status_changed += 1
+    cpu_seconds = time.process_time() - cpu_started
+
+    latencies.sort()
+    count = len(latencies)
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'requests': count,
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 3) if count else None,
+            'p50_ms': round(latencies[count // 2] * 1000, 3) if count else None,
+            'p95_ms': round(latencies[int(count * 0.95)] * 1000, 3) if count else None,
+            'p99_ms': round(latencies[int(count * 0.99)] * 1000, 3) if count else None,
+            'cpu_ms_per_request': round(cpu_seconds * 1000 / count, 3) if count else None,
+            'status_changed': status_changed,
+            **replay_llm.stats
+        }, f)
+    sys.stdout.flush()
+    os._exit(0)  # Skip joining the service's background threads
+
+def measure(tree: str, capture_paths: List[str], limit: int) -> Dict:
+    workdir = tempfile.mkdtemp(prefix='replay-')  # Sessions and stores land here, not in the tree
+    result_path = os.path.join(workdir, 'result.json')
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--tree', tree, '--limit', str(limit),
+               '--result', result_path, *capture_paths]
+    env = dict(os.environ, LOG_LEVEL=os.environ.get('LOG_LEVEL', 'ERROR'), MURF_API_KEY='')
+    stderr_path = os.path.join(workdir, 'stderr.log')
+    with open(stderr_path, 'wb') as stderr_file:
+        process = subprocess.run(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=stderr_file)
+    if process.returncode != 0 or not os.path.exists(result_path):
+        with open(stderr_path, encoding='utf-8', errors='replace') as f:
+            raise RuntimeError(f"replay worker failed for {tree}:\n{f.read()[-3000:]}")
+    with open(result_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def median_result(runs: List[Dict]) -> Dict:
+    return {key: statistics.median(run[key] for run in runs) if runs[0][key] is not None else None for key in runs[0]}
+
+def print_report(results: Dict[str, Dict]) -> None:
+    print(f"\n{'tree (median)':<28}{'requests':>9}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'cpu ms/req':>11}{'missed':>8}{'prompt Δ':>9}{'status Δ':>9}")
+    for label, result in results.items():
+        print(f"{label:<28}{result['requests']:>9.0f}{result['mean_ms']:>9.2f}{result['p50_ms']:>9.2f}"
+              f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['cpu_ms_per_request']:>11.2f}"
+              f"{result['missed']:>8.0f}{result['prompt_changed']:>9.0f}{result['status_changed']:>9.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('captures', nargs='+', help='Capture files (JSON lines, optionally .gz)')
+    parser.add_argument('--baseline', help='git revision to compare against (default: working tree only)')
+    parser.add_argument('--limit', type=int, default=0, help='Replay at most this many requests')
+    parser.add_argument('--rounds', type=int, default=1, help='Runs per tree (alternating), median reported')
+    parser.add_argument('--record', action='store_true', help=f"Append the result to {RESULTS_PATH}")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--tree', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    capture_paths = [os.path.abspath(path) for path in args.captures]
+
+    if args.worker:
+        run_worker(args.tree, capture_paths, args.limit, args.result)
+        return
+
+    if not any(True for _ in read_records(capture_paths, 1)):
+        parser.error("no /chat records in the capture files")
+
+    trees = {'working tree': SERVICE_DIR}
+    worktree = None
+    if args.baseline:
+        worktree = tempfile.mkdtemp(prefix='replay-baseline-')
+        subprocess.run(['git', 'worktree', 'add', '--detach', worktree, args.baseline],
+                       cwd=REPO_DIR, check=True, capture_output=True)
+        trees = {f"baseline ({args.baseline})": os.path.join(worktree, 'ai-services'), **trees}
+    runs: Dict[str, List[Dict]] = {label: [] for label in trees}
+    try:
+        for round_number in range(args.rounds):
+            for label, tree in trees.items():
+                runs[label].append(measure(tree, capture_paths, args.limit))
+                print(f"round {round_number + 1}/{args.rounds} {label}: "
+                      f"{runs[label][-1]['cpu_ms_per_request']} cpu ms/request")
+    finally:
+        if worktree:
+            subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=REPO_DIR, capture_output=True)
+
+    results = {label: median_result(label_runs) for label, label_runs in runs.items()}
+    print_report(results)
+    if args.baseline:
+        baseline, candidate = results.values()
+        change = (candidate['cpu_ms_per_request'] / baseline['cpu_ms_per_request'] - 1) * 100
+        print(f"\n📈 CPU per request: {change:+.1f}% vs {args.baseline}")
+
+    if args.record:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'timestamp': time.time(), 'captures': args.captures, 'baseline': args.baseline,
+                                'limit': args.limit, 'rounds': args.rounds, 'results': results}) + '\n')
+        print(f"\n📝 Recorded to {RESULTS_PATH}")
+
+if __name__ == "__main__":
+    main()
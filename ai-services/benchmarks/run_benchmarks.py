@@ -0,0 +1,239 @@
+"""Offline benchmark suite for the AI service
+
+Runs the service in-process with the fake LLM and embedding model from
+benchmarks/fakes.py, so no API key, network or model download is needed and
+results only reflect this code. Measures prompt building, vector retrieval,
+the fallback detectors, therapist context generation and end-to-end /chat
+throughput through Flask's test client.
+
+Results can be appended to benchmarks/results/suite.jsonl and compared with
+the last recorded run that used the same parameters; --compare exits
+non-zero when a case got slower by more than --max-regression percent.
+
+Usage:
+    python benchmarks/run_benchmarks.py                        # report
+    python benchmarks/run_benchmarks.py --record               # also append to benchmarks/results/suite.jsonl
+    python benchmarks/run_benchmarks.py --compare --max-regression 15
+    python benchmarks/run_benchmarks.py --only chat --llm-latency-ms 300 --threads 16
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(SERVICE_DIR, 'benchmarks', 'results', 'suite.jsonl')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeEmbeddingModel, FakeLLM, install_fakes  # noqa: E402
+
+SEED_USER = 'bench-seeded-user'
+MESSAGES = [
+    "I have exams next week and I can't sleep at night",
+    "My parents expect me to top the class and I feel so much pressure",
+    "I had a fight with my best friend and now I feel lonely at college",
+    "Today was actually good, I finished my assignment early",
+    "I keep procrastinating and then I panic before deadlines",
+    "Sometimes I feel hopeless about my placement and my future",
+    "I tried the breathing exercise and it helped a little",
+    "Hostel food is bad and I miss home a lot",
+]
+CRISIS_MESSAGES = [
+    "I feel like there is no point in living anymore",
+    "I want to hurt myself when the pressure gets too much",
+]
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVICE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def time_calls(function: Callable[[int], object], iterations: int, repeat: int) -> Dict:
+    """Per-call latency over `repeat` rounds of `iterations` calls (after one warm-up round)"""
+    for index in range(min(iterations, 20)):
+        function(index)
+    samples: List[float] = []
+    for _ in range(repeat):
+        for index in range(iterations):
+            started = time.perf_counter()
+            function(index)
+            samples.append(time.perf_counter() - started)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        'calls': len(samples),
+        'mean_us': round(mean * 1e6, 1),
+        'p50_us': round(samples[len(samples) // 2] * 1e6, 1),
+        'p95_us': round(samples[int(len(samples) * 0.95)] * 1e6, 1),
+        'ops_per_second': round(1 / mean, 1) if mean else None
+    }
+
+def seed_conversations(main, user_id: str, turns: int) -> None:
+    """Give a user realistic history: conversation turns, emotion states and stored vectors"""
+    client = main.app.test_client()
+    for index in range(turns):
+        response = client.post('/chat', json={'message': MESSAGES[index % len(MESSAGES)], 'userId': user_id,
+                                              'context': 'academic'})
+        if response.status_code != 200:
+            raise RuntimeError(f"Seeding /chat returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+def micro_benchmarks(main, iterations: int, repeat: int, only: Optional[List[str]] = None) -> Dict[str, Dict]:
+    from langchain_core.messages import HumanMessage
+    from crisis_detection import analyze_crisis_indicators_fallback, generate_therapist_context
+
+    history = [{'content': msg.content, 'type': 'human' if isinstance(msg, HumanMessage) else 'ai'}
+               for msg in main.get_conversation_history(SEED_USER)]
+    emotion_history = main.user_emotional_states.get(SEED_USER, {}).get('emotion_history', [])
+    profile = main.user_conversation_context.get(SEED_USER, {})
+    all_messages = MESSAGES + CRISIS_MESSAGES
+    crisis_analysis = analyze_crisis_indicators_fallback(CRISIS_MESSAGES[0], SEED_USER, history, emotion_history)
+
+    cases = {
+        'create_conversation_prompt': lambda i: main.create_conversation_prompt(
+            SEED_USER, MESSAGES[i % len(MESSAGES)], 'academic'),
+        'find_similar_conversations': lambda i: main.find_similar_conversations(
+            SEED_USER, MESSAGES[i % len(MESSAGES)]),
+        'analyze_emotions_fallback': lambda i: main.analyze_emotions_fallback(all_messages[i % len(all_messages)]),
+        'analyze_crisis_indicators_fallback': lambda i: analyze_crisis_indicators_fallback(
+            all_messages[i % len(all_messages)], SEED_USER, history, emotion_history),
+        'generate_therapist_context': lambda i: generate_therapist_context(
+            SEED_USER, crisis_analysis, history, emotion_history, profile),
+    }
+    results = {}
+    for name, function in cases.items():
+        if only and name not in only:
+            continue
+        results[name] = time_calls(function, iterations, repeat)
+        print(f"  {name:<36} p50 {results[name]['p50_us']:>10.1f}µs  p95 {results[name]['p95_us']:>10.1f}µs  "
+              f"{results[name]['ops_per_second']:>10.1f}/s")
+    return results
+
+def chat_benchmark(main, requests_count: int, threads: int) -> Dict:
+    """/chat throughput with concurrent clients spread over a pool of users"""
+    def send(index: int) -> float:
+        client = main.app.test_client()
+        started = time.perf_counter()
+        response = client.post('/chat', json={
+            'message': MESSAGES[index % len(MESSAGES)],
+            'userId': f"bench-chat-{index % max(threads * 4, 1)}",
+            'context': 'academic'
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"/chat returned {response.status_code}")
+        return time.perf_counter() - started
+
+    for index in range(min(20, requests_count)):
+        send(index)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(send, range(requests_count)))
+    elapsed = time.perf_counter() - started
+    result = {
+        'requests': requests_count,
+        'threads': threads,
+        'requests_per_second': round(requests_count / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 2)
+    }
+    print(f"  {'chat':<36} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+          f"{result['requests_per_second']:>10.1f}/s")
+    return result
+
+def previous_run(params: Dict, path: str = RESULTS_PATH) -> Optional[Dict]:
+    """Last recorded run with the same parameters"""
+    if not os.path.exists(path):
+        return None
+    match = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if run.get('params') == params:
+                match = run
+    return match
+
+def compare(current: Dict, previous: Dict, max_regression: float) -> List[str]:
+    """Print the change per case and return the cases slower than allowed"""
+    print(f"\nCompared with {previous.get('revision') or 'unknown'} recorded "
+          f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(previous['recorded_at']))}:")
+    regressions = []
+    for name, result in current['cases'].items():
+        before = previous['cases'].get(name)
+        if not before:
+            continue
+        if 'requests_per_second' in result:
+            # Throughput: lower is worse
+            change = (before['requests_per_second'] - result['requests_per_second']) / before['requests_per_second'] * 100
+        else:
+            change = (result['p50_us'] - before['p50_us']) / before['p50_us'] * 100
+        flag = '  REGRESSION' if change > max_regression else ''
+        print(f"  {name:<36} {change:+7.1f}% slower{flag}" if change >= 0 else
+              f"  {name:<36} {-change:7.1f}% faster")
+        if change > max_regression:
+            regressions.append(name)
+    return regressions
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='*', help='Case names to run (default: all); "chat" for the /chat benchmark')
+    parser.add_argument('--iterations', type=int, default=200, help='Calls per round for function benchmarks')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed-turns', type=int, default=20, help='Conversation turns seeded for the benchmark user')
+    parser.add_argument('--chat-requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--llm-latency-ms', type=float, default=0, help='Fake LLM latency during the /chat benchmark')
+    parser.add_argument('--llm-jitter-ms', type=float, default=0)
+    parser.add_argument('--log-level', default='ERROR', help='Service log level while benchmarking')
+    parser.add_argument('--record', action='store_true', help=f"Append results to {RESULTS_PATH}")
+    parser.add_argument('--compare', action='store_true', help='Compare with the last recorded run with the same parameters')
+    parser.add_argument('--max-regression', type=float, default=20.0, help='Percent slowdown that fails --compare')
+    args = parser.parse_args()
+
+    os.environ.setdefault('LOG_LEVEL', args.log_level)
+    llm = FakeLLM(seed=1)
+    main = install_fakes(llm=llm, embedding_model=FakeEmbeddingModel())
+    seed_conversations(main, SEED_USER, args.seed_turns)
+
+    print(f"Benchmarks ({args.iterations} calls x {args.repeat} rounds, {args.seed_turns} seeded turns):")
+    cases = micro_benchmarks(main, args.iterations, args.repeat, args.only)
+    if not args.only or 'chat' in args.only:
+        llm.latency_ms, llm.jitter_ms = args.llm_latency_ms, args.llm_jitter_ms
+        cases['chat'] = chat_benchmark(main, args.chat_requests, args.threads)
+
+    params = {key: getattr(args, key) for key in
+              ('iterations', 'repeat', 'seed_turns', 'chat_requests', 'threads', 'llm_latency_ms', 'llm_jitter_ms')}
+    run = {
+        'recorded_at': time.time(),
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'params': params,
+        'cases': cases
+    }
+
+    exit_code = 0
+    if args.compare:
+        previous = previous_run(params)
+        if previous is None:
+            print("\nNo recorded run with these parameters to compare with")
+        elif compare(run, previous, args.max_regression):
+            exit_code = 1
+    if args.record:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run) + '\n')
+        print(f"\nRecorded to {RESULTS_PATH}")
+    sys.stdout.flush()
+    os._exit(exit_code)  # Skip joining the service's background threads
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,211 @@
+"""Memory soak test for the AI service
+
+Drives a long stream of simulated /chat messages (a million by default)
+from a fixed population of synthetic users through the app, in-process with
+the fake LLM and embedding model from benchmarks/fakes.py. Each user keeps a
+client-side session and sends it as sessionHistory, like the Node backend,
+and a share of LLM calls fail so the error paths run too. Care agent
+interventions and risk assessments are recorded for the same users (the
+chat path does not trigger them), and /insight_report is polled.
+
+Every --sample-every messages it records RSS and the bytes held by each
+structure tracked in main.memory_accountant, plus entry counts of the
+caches. With a fixed user population, every structure should level off once
+each user has reached its caps. The test fails when a structure or RSS is
+still growing after the warm-up share of the run, or when a user's stored
+history holds the same turn twice (sessionHistory merged into it again).
+
+Usage:
+    python benchmarks/soak.py                                  # 1M messages, 2000 users
+    python benchmarks/soak.py --messages 100000 --users 500 --sample-every 5000
+    python benchmarks/soak.py --max-growth-pct 5 --record
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(SERVICE_DIR, 'benchmarks', 'results', 'soak.jsonl')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeEmbeddingModel, FakeLLM, install_fakes  # noqa: E402
+
+SESSION_HISTORY_LIMIT = 20  # Messages the backend forwards as sessionHistory
+SESSION_TURNS = 8  # Turns before a simulated user starts a new session
+CONTEXTS = ('general', 'academic', 'family')
+SUBJECTS = ['my exams', 'my parents', 'my roommate', 'placements', 'my thesis', 'the hostel', 'my friends',
+            'my sleep', 'my coach', 'my results', 'the deadline', 'my sister', 'my internship', 'money']
+FEELINGS = ['anxious', 'tired', 'lonely', 'hopeful', 'angry', 'stressed', 'sad', 'okay', 'overwhelmed', 'calm']
+
+def synthetic_message(rng: random.Random, number: int) -> str:
+    # The number keeps every message of a user distinct, so a repeated turn in history is a bug
+    return (f"I feel {rng.choice(FEELINGS)} about {rng.choice(SUBJECTS)} and {rng.choice(SUBJECTS)}, "
+            f"it has been {rng.randint(1, 30)} days like this (message {number})")
+
+class SyntheticUser:
+    def __init__(self, index: int, seed: int):
+        self.user_id = f"soak-{index}"
+        self.random = random.Random(seed * 1_000_003 + index)
+        self.context = self.random.choice(CONTEXTS)
+        self.session: List[Dict] = []
+        self.turns = 0
+        self.sent = 0
+
+    def next_payload(self) -> Dict:
+        if self.turns >= SESSION_TURNS:
+            self.session, self.turns, self.context = [], 0, self.random.choice(CONTEXTS)
+        self.turns += 1
+        self.sent += 1
+        return {'message': synthetic_message(self.random, self.sent), 'userId': self.user_id, 'context': self.context,
+                'sessionHistory': self.session[-SESSION_HISTORY_LIMIT:]}
+
+def repeated_turns(main) -> int:
+    """User messages stored more than once in a user's server-side history"""
+    repeated = 0
+    for history in list(main.user_conversations.values()):
+        contents = [msg.content for msg in list(history) if msg.type == 'human']
+        repeated += len(contents) - len(set(contents))
+    return repeated
+
+def sample(main, messages: int, started: float) -> Dict:
+    """RSS, bytes per tracked structure and cache entry counts"""
+    from memory_accounting import process_rss_bytes
+
+    gc.collect()
+    report = main.memory_accountant.report(top=0, max_age=0)
+    structures = dict(report['per_user_structures'], **report['shared_structures'])
+    agent = main.care_agent
+    counts = {
+        'conversation_messages': sum(len(history) for history in list(main.user_conversations.values())),
+        'analysis_cache_entries': len(main.analysis_cache),
+        'intervention_entries': sum(len(entry.get('history', []))
+                                    for entry in list(agent.intervention_history.values())) if agent else 0,
+        'users': report['user_count'],
+        'repeated_turns': repeated_turns(main)
+    }
+    return {
+        'messages': messages,
+        'seconds': round(time.time() - started, 1),
+        'rss_bytes': process_rss_bytes() or 0,
+        'tracked_bytes': report['tracked_bytes'],
+        'structures': structures,
+        'counts': counts
+    }
+
+def growth_failures(samples: List[Dict], warmup: float, max_growth_pct: float, min_growth_kb: float) -> List[str]:
+    """Structures (and RSS) that grew more than allowed between the end of warm-up and the end"""
+    reference = next(entry for entry in samples if entry['messages'] >= samples[-1]['messages'] * warmup)
+    final = samples[-1]
+    series = {'rss': (reference['rss_bytes'], final['rss_bytes']),
+              'tracked': (reference['tracked_bytes'], final['tracked_bytes'])}
+    for name, size in final['structures'].items():
+        series[name] = (reference['structures'].get(name, 0), size)
+    for name, count in final['counts'].items():
+        series[name] = (reference['counts'].get(name, 0), count)
+
+    failures = []
+    for name, (before, after) in series.items():
+        grown = after - before
+        relative = grown / before * 100 if before else float('inf')
+        is_bytes = name in ('rss', 'tracked') or name in final['structures']
+        significant = grown > min_growth_kb * 1024 if is_bytes else grown > 0
+        if relative > max_growth_pct and significant:
+            failures.append(f"{name}: {before:,} -> {after:,} ({relative:+.1f}%) after "
+                            f"{reference['messages']:,} of {final['messages']:,} messages")
+    return failures
+
+def print_sample(entry: Dict) -> None:
+    counts = entry['counts']
+    print(f"{entry['messages']:>10,} msgs {entry['seconds']:>8.0f}s  rss {entry['rss_bytes'] / 2**20:>7.1f} MB  "
+          f"tracked {entry['tracked_bytes'] / 2**20:>7.2f} MB  history {counts['conversation_messages']:>7,}  "
+          f"analysis cache {counts['analysis_cache_entries']:>6,}  interventions {counts['intervention_entries']:>7,}",
+          flush=True)
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=2000, help='Synthetic user population')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--sample-every', type=int, default=50_000, help='Messages between memory samples')
+    parser.add_argument('--llm-error-rate', type=float, default=0.02, help='Share of fake LLM calls that fail')
+    parser.add_argument('--agent-rate', type=float, default=1.0,
+                        help='Care agent interventions and risk assessments per message')
+    parser.add_argument('--insight-every', type=int, default=1000, help='Messages between /insight_report polls')
+    parser.add_argument('--warmup', type=float, default=0.5,
+                        help='Share of the run in which structures may still grow towards their caps')
+    parser.add_argument('--max-growth-pct', type=float, default=10.0, help='Allowed growth after warm-up')
+    parser.add_argument('--min-growth-kb', type=float, default=512,
+                        help='Byte growth below this is never a failure (allocator noise)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--log-level', default='CRITICAL',
+                        help='Service log level during the run (injected LLM errors log at ERROR)')
+    parser.add_argument('--record', action='store_true', help=f"Append the samples and verdict to {RESULTS_PATH}")
+    args = parser.parse_args()
+
+    os.environ.setdefault('LOG_LEVEL', args.log_level)
+    main = install_fakes(llm=FakeLLM(error_rate=args.llm_error_rate, seed=args.seed),
+                         embedding_model=FakeEmbeddingModel())
+    client_rng = random.Random(args.seed)
+    users = [SyntheticUser(index, args.seed) for index in range(args.users)]
+    agent = main.care_agent
+
+    def send(message_index: int) -> None:
+        user = users[message_index % len(users)]
+        client = main.app.test_client()
+        payload = user.next_payload()
+        response = client.post('/chat', json=payload)
+        reply = (response.get_json(silent=True) or {}).get('response')
+        user.session.append({'role': 'user', 'content': payload['message']})
+        if reply:
+            user.session.append({'role': 'assistant', 'content': reply})
+        if agent and client_rng.random() < args.agent_rate:
+            agent.generate_intervention(user.user_id, 'soak', client_rng.randint(1, 5), user.context)
+            agent.track_risk_trends(user.user_id, client_rng.uniform(0, 5))
+        if args.insight_every and message_index % args.insight_every == 0:
+            client.get('/insight_report', query_string={'userId': user.user_id})
+
+    print(f"Soak: {args.messages:,} messages from {args.users:,} users, {args.threads} threads", flush=True)
+    started = time.time()
+    samples = [sample(main, 0, started)]
+    print_sample(samples[-1])
+    sent = 0
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        while sent < args.messages:
+            batch = min(args.sample_every, args.messages - sent)
+            # Users are assigned round-robin in chunks, so concurrent requests rarely share a user
+            for _ in pool.map(send, range(sent, sent + batch), chunksize=max(1, min(64, args.users // args.threads))):
+                pass
+            sent += batch
+            samples.append(sample(main, sent, started))
+            print_sample(samples[-1])
+
+    failures = growth_failures(samples, args.warmup, args.max_growth_pct, args.min_growth_kb)
+    repeated = max(entry['counts']['repeated_turns'] for entry in samples)
+    if repeated:
+        failures.append(f"repeated_turns: up to {repeated:,} user messages stored twice in server history")
+    if failures:
+        print("\n❌ Unbounded growth after warm-up or repeated turns:")
+        for failure in failures:
+            print(f"  {failure}")
+    else:
+        print(f"\n✅ Memory levelled off after {args.warmup:.0%} of the run")
+
+    if args.record:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        params = {key: value for key, value in vars(args).items() if key != 'record'}
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'timestamp': time.time(), 'params': params, 'passed': not failures,
+                                'failures': failures, 'samples': samples}) + '\n')
+        print(f"\n📝 Recorded to {RESULTS_PATH}")
+    sys.stdout.flush()
+    os._exit(1 if failures else 0)  # Skip joining the service's background threads
+
+if __name__ == '__main__':
+    main_cli()
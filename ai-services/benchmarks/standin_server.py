@@ -0,0 +1,269 @@
+"""Local HTTP stand-in for the Gemini and Murf APIs
+
+Answers the two external calls the service makes, with latency drawn from a
+configurable distribution and a configurable share of failed requests, so
+load tests can run at hundreds of concurrent users without network access,
+API keys or cost:
+
+    POST /v1beta/models/<model>:generateContent   Gemini (REST transport)
+    POST /v1/speech/generate                       Murf text to speech
+    GET  /audio/<clip>.wav                         audio files referenced by Murf responses
+    GET  /stats                                    request, error and latency counts
+
+Gemini replies are the canned responses from benchmarks/fakes.py, picked by
+the same prompt markers, so the service parses them like real ones. Chat
+replies get a numbered suffix so each one is new to the TTS cache, as real
+replies are (--repeat-replies turns that off).
+
+Point the service at the stand-in with:
+
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8089 MURF_BASE_URL=http://127.0.0.1:8089
+
+Latency distributions are given as "fixed:MS", "uniform:LOW-HIGH",
+"normal:MEAN,STDDEV" or "lognormal:MEDIAN,SIGMA" (all in milliseconds).
+
+Usage:
+    python benchmarks/standin_server.py
+    python benchmarks/standin_server.py --port 8089 --gemini-latency lognormal:900,0.4 --gemini-error-rate 0.02
+    python benchmarks/standin_server.py --murf-latency uniform:400-1500 --murf-error-rate 0.01 --murf-error-status 429
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import CANNED_RESPONSES, CHAT_RESPONSE  # noqa: E402
+
+GEMINI_PATH = re.compile(r'^/v1(?:beta)?/models/(?P<model>[^/:]+):generateContent$')
+AUDIO_PATH = re.compile(r'^/audio/(?P<seconds>\d+)\.wav$')
+AUDIO_SAMPLE_RATE = 8000
+CHARS_PER_SECOND = 15  # Rough speaking rate used for audio length
+ERROR_STATUS_NAMES = {429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE', 504: 'DEADLINE_EXCEEDED'}
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a distribution spec into a function drawing a delay in seconds"""
+    kind, _, values = spec.partition(':')
+    try:
+        if kind == 'fixed' or not values:
+            delay = float(values or kind) / 1000
+            return lambda rng: delay
+        if kind == 'uniform':
+            low, high = (float(v) / 1000 for v in values.split('-'))
+            return lambda rng: rng.uniform(low, high)
+        if kind == 'normal':
+            mean, stddev = (float(v) / 1000 for v in values.split(','))
+            return lambda rng: max(0.0, rng.gauss(mean, stddev))
+        if kind == 'lognormal':
+            median, sigma = values.split(',')
+            mu, sigma = math.log(float(median) / 1000), float(sigma)
+            return lambda rng: rng.lognormvariate(mu, sigma)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"Invalid latency distribution: {spec}")
+
+def _silent_wav(seconds: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(1)
+        wav.setframerate(AUDIO_SAMPLE_RATE)
+        wav.writeframes(b'\x80' * (seconds * AUDIO_SAMPLE_RATE))
+    return buffer.getvalue()
+
+class StandInState:
+    """Configuration and counters shared by the handler threads"""
+
+    def __init__(self, args):
+        self.gemini_latency = parse_latency(args.gemini_latency)
+        self.gemini_error_rate = args.gemini_error_rate
+        self.gemini_error_status = args.gemini_error_status
+        self.murf_latency = parse_latency(args.murf_latency)
+        self.murf_error_rate = args.murf_error_rate
+        self.murf_error_status = args.murf_error_status
+        self.murf_quota = args.murf_quota
+        self.repeat_replies = args.repeat_replies
+        self.replies = 0
+        self._random = random.Random(args.seed)
+        self._lock = threading.Lock()
+        self._clips: Dict[int, bytes] = {}
+        self.started_at = time.time()
+        self.stats = {api: {'requests': 0, 'errors': 0, 'delay_seconds': 0.0} for api in ('gemini', 'murf', 'audio')}
+
+    def draw(self, api: str, latency: Callable[[random.Random], float], error_rate: float):
+        """Delay and whether to fail this request, counted under `api`"""
+        with self._lock:
+            delay = latency(self._random)
+            failed = self._random.random() < error_rate
+            stats = self.stats[api]
+            stats['requests'] += 1
+            stats['errors'] += failed
+            stats['delay_seconds'] += delay
+        return delay, failed
+
+    def next_reply(self) -> int:
+        with self._lock:
+            self.replies += 1
+            return self.replies
+
+    def consume_characters(self, count: int) -> int:
+        with self._lock:
+            self.murf_quota = max(0, self.murf_quota - count)
+            return self.murf_quota
+
+    def clip(self, seconds: int) -> bytes:
+        with self._lock:
+            if seconds not in self._clips:
+                self._clips[seconds] = _silent_wav(seconds)
+            return self._clips[seconds]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'murf_remaining_characters': self.murf_quota,
+                'apis': {api: dict(stats, mean_delay_ms=round(stats['delay_seconds'] / stats['requests'] * 1000, 1)
+                                   if stats['requests'] else None)
+                         for api, stats in self.stats.items()}
+            }
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real APIs
+    state: StandInState = None
+
+    def log_message(self, format, *args):
+        pass  # Hundreds of requests per second; /stats has the counts
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json') -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        self._send(status, json.dumps(payload).encode('utf-8'))
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/stats':
+            return self._send_json(200, self.state.snapshot())
+        match = AUDIO_PATH.match(path)
+        if match:
+            self.state.draw('audio', lambda rng: 0.0, 0.0)
+            return self._send(200, self.state.clip(int(match.group('seconds'))), 'audio/wav')
+        self._send_json(404, {'error': f"Unknown path {path}"})
+
+    def do_POST(self):
+        path = self.path.split('?', 1)[0]
+        match = GEMINI_PATH.match(path)
+        if match:
+            return self._gemini(match.group('model'))
+        if path == '/v1/speech/generate':
+            return self._murf()
+        self._read_json()
+        self._send_json(404, {'error': f"Unknown path {path}"})
+
+    def _gemini(self, model: str) -> None:
+        request = self._read_json()
+        delay, failed = self.state.draw('gemini', self.state.gemini_latency, self.state.gemini_error_rate)
+        time.sleep(delay)
+        if failed:
+            status = self.state.gemini_error_status
+            return self._send_json(status, {'error': {'code': status, 'message': 'Stand-in injected error',
+                                                      'status': ERROR_STATUS_NAMES.get(status, 'UNKNOWN')}})
+
+        prompt = '\n'.join(part.get('text', '') for content in request.get('contents', [])
+                           for part in content.get('parts', []))
+        text = next((response for marker, response in CANNED_RESPONSES if marker in prompt), None)
+        if text is None:
+            text = CHAT_RESPONSE if self.state.repeat_replies else \
+                f"{CHAT_RESPONSE} I'm here with you (reply {self.state.next_reply()})."
+        prompt_tokens, reply_tokens = len(prompt) // 4, len(text) // 4
+        self._send_json(200, {
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0,
+                'safetyRatings': []
+            }],
+            'usageMetadata': {'promptTokenCount': prompt_tokens, 'candidatesTokenCount': reply_tokens,
+                              'totalTokenCount': prompt_tokens + reply_tokens},
+            'modelVersion': model
+        })
+
+    def _murf(self) -> None:
+        request = self._read_json()
+        delay, failed = self.state.draw('murf', self.state.murf_latency, self.state.murf_error_rate)
+        time.sleep(delay)
+        if failed:
+            return self._send_json(self.state.murf_error_status, {'errorMessage': 'Stand-in injected error',
+                                                                  'errorCode': self.state.murf_error_status})
+
+        text = request.get('text', '')
+        remaining = self.state.consume_characters(len(text))
+        seconds = max(1, round(len(text) / CHARS_PER_SECOND))
+        host = self.headers.get('Host') or f"{self.server.server_address[0]}:{self.server.server_address[1]}"
+        self._send_json(200, {
+            'audioFile': f"http://{host}/audio/{seconds}.wav",
+            'audioLengthInSeconds': seconds,
+            'consumedCharacterCount': len(text),
+            'remainingCharacterCount': remaining,
+            'encodedAudio': None,
+            'warning': None,
+            'wordDurations': []
+        })
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Hundreds of concurrent connections from several workers
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--gemini-latency', default='lognormal:800,0.4', help='Delay per Gemini call')
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0)
+    parser.add_argument('--gemini-error-status', type=int, default=503)
+    parser.add_argument('--murf-latency', default='lognormal:700,0.3', help='Delay per Murf synthesis')
+    parser.add_argument('--murf-error-rate', type=float, default=0.0)
+    parser.add_argument('--murf-error-status', type=int, default=500)
+    parser.add_argument('--murf-quota', type=int, default=10_000_000, help='Characters before Murf reports none left')
+    parser.add_argument('--repeat-replies', action='store_true', help='Same chat reply every time (TTS cache hits)')
+    parser.add_argument('--seed', type=int, default=None, help='Seed the latency and error draws')
+    return parser
+
+def serve(args) -> StandInServer:
+    """Start the stand-in on a background thread and return the server"""
+    StandInHandler.state = StandInState(args)
+    server = StandInServer((args.host, args.port), StandInHandler)
+    threading.Thread(target=server.serve_forever, name='standin-server', daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    args = build_parser().parse_args()
+    server = serve(args)
+    print(f"🧪 Gemini/Murf stand-in listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
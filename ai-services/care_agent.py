@@ -4,16 +4,171 @@ import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import json
+import hashlib
+import itertools
+import threading
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from activity_catalog import ActivityCatalog
+from care_agent_store import CareAgentStore, EVENT_PATTERNS, EVENT_INTERVENTION, EVENT_RISK, SNAPSHOT_EVERY_EVENTS
+from tracing import span
+from llm_accounting import attributed
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+INSIGHT_REPORT_PERIOD = 7 * 86400  # Weekly reports
+INSIGHT_REPORT_CACHE_MAX_ENTRIES = 2000  # In-memory narratives; older ones are reloaded from the store
+INTERVENTION_HISTORY_LIMIT = 200  # More than a week of interventions at the one-per-hour maximum
 
 class AICareAgent:
-    def __init__(self, llm, embedding_model):
+    def __init__(self, llm, embedding_model, store: Optional[CareAgentStore] = None,
+                 activity_catalog: Optional[ActivityCatalog] = None):
         self.llm = llm
         self.embedding_model = embedding_model
+        self.store = store  # Optional durable event log
+        self.activity_catalog = activity_catalog  # Precomputed wellness activities
         self.user_patterns = {}  # Store user behavior patterns
         self.intervention_history = {}  # Track past interventions
         self.risk_trends = {}  # Track risk level trends
+        self.insight_reports = {}  # Cached report narratives keyed by user
+        self._loaded_users = set()
+        self._log_positions = {}  # user -> [snapshot event id, last event id, events applied since snapshot]
+        self._load_lock = threading.Lock()
+        self._state_versions = {}  # user -> sequence number of the last change to their in-memory state
+        self._version_sequence = itertools.count(1)
+    
+    def state_version(self, user_id: str) -> int:
+        """Changes whenever the user's in-memory state does (used to skip re-measuring unchanged users)"""
+        return self._state_versions.get(user_id, 0)
+    
+    def _state_changed(self, user_id: str) -> None:
+        self._state_versions[user_id] = next(self._version_sequence)
+    
+    def _ensure_user_loaded(self, user_id: str) -> None:
+        """Lazily replay a user's stored events on first access"""
+        if self.store is None or user_id in self._loaded_users:
+            return
+        
+        with self._load_lock:
+            if user_id in self._loaded_users:
+                return
+            try:
+                self._replay_user(user_id)
+                self._compact_user_log(user_id)
+            except Exception as e:
+                log.error("Error loading care agent state", user_id=user_id, error=str(e))
+            self._loaded_users.add(user_id)
+    
+    def _replay_user(self, user_id: str) -> None:
+        """Rebuild a user's state from their snapshot and later events (caller holds _load_lock)"""
+        snapshot, base_event_id, events = self.store.load_user(user_id)
+        if snapshot:
+            self._restore_snapshot(user_id, snapshot)
+        for _, kind, payload, _ in events:
+            self._apply_event(user_id, kind, payload)
+        last_event_id = events[-1][0] if events else base_event_id
+        self._log_positions[user_id] = [base_event_id, last_event_id, len(events)]
+    
+    def forget_user(self, user_id: str) -> bool:
+        """Drop a user's in-memory state; it is replayed from the store on next access.
+        Returns False (and keeps the state) when there is no store to replay from."""
+        if self.store is None:
+            return False
+        with self._load_lock:
+            self._drop_user_state(user_id)
+        return True
+    
+    def _drop_user_state(self, user_id: str) -> None:
+        """Remove a user's in-memory state (caller holds _load_lock)"""
+        for state in (self.user_patterns, self.intervention_history, self.risk_trends, self.insight_reports,
+                      self._log_positions):
+            state.pop(user_id, None)
+        self._loaded_users.discard(user_id)
+        self._state_versions.pop(user_id, None)
+    
+    def _snapshot_state(self, user_id: str) -> Dict:
+        """The replayable state of a user, as stored in a snapshot"""
+        return {
+            'patterns': self.user_patterns.get(user_id),
+            'interventions': self.intervention_history.get(user_id),
+            'risk': self.risk_trends.get(user_id)
+        }
+    
+    def _restore_snapshot(self, user_id: str, snapshot: Dict) -> None:
+        """Load a user's state from a snapshot before replaying later events"""
+        self._state_changed(user_id)
+        for state, key in ((self.user_patterns, 'patterns'), (self.intervention_history, 'interventions'),
+                           (self.risk_trends, 'risk')):
+            if snapshot.get(key) is not None:
+                state[user_id] = snapshot[key]
+    
+    def _compact_user_log(self, user_id: str) -> None:
+        """Snapshot a user's state and prune the events it covers once enough have accumulated
+        (caller holds _load_lock)"""
+        position = self._log_positions.get(user_id)
+        if self.store is None or position is None or position[2] < SNAPSHOT_EVERY_EVENTS:
+            return
+        base_event_id, last_event_id, applied = position
+        if self.store.save_snapshot(user_id, self._snapshot_state(user_id), base_event_id, last_event_id, applied):
+            self._log_positions[user_id] = [last_event_id, last_event_id, 0]
+        else:
+            # Another process wrote events for this user; pick them up from the store
+            log.warning("⚠️ Care agent log changed by another process, reloading user", user_id=user_id)
+            self._drop_user_state(user_id)
+            self._replay_user(user_id)
+            self._loaded_users.add(user_id)
+    
+    def _apply_event(self, user_id: str, kind: str, payload: Dict) -> None:
+        """Apply a state event to the in-memory structures"""
+        self._state_changed(user_id)
+        if kind == EVENT_PATTERNS:
+            self.user_patterns[user_id] = payload
+            
+        elif kind == EVENT_INTERVENTION:
+            if user_id not in self.intervention_history:
+                self.intervention_history[user_id] = {
+                    'count': 0,
+                    'history': []
+                }
+            self.intervention_history[user_id]['count'] += 1
+            self.intervention_history[user_id]['last_time'] = payload['timestamp']
+            self.intervention_history[user_id]['history'].append(payload)
+            
+            # The count keeps the total; only recent entries are kept
+            if len(self.intervention_history[user_id]['history']) > INTERVENTION_HISTORY_LIMIT:
+                self.intervention_history[user_id]['history'] = \
+                    self.intervention_history[user_id]['history'][-INTERVENTION_HISTORY_LIMIT:]
+            
+        elif kind == EVENT_RISK:
+            if user_id not in self.risk_trends:
+                self.risk_trends[user_id] = {
+                    'history': [],
+                    'last_updated': None
+                }
+            self.risk_trends[user_id]['history'].append(payload)
+            
+            # Keep last 10 assessments
+            if len(self.risk_trends[user_id]['history']) > 10:
+                self.risk_trends[user_id]['history'] = self.risk_trends[user_id]['history'][-10:]
+    
+    def _record_event(self, user_id: str, kind: str, payload: Dict) -> None:
+        """Apply a state event and append it to the durable store"""
+        self._ensure_user_loaded(user_id)
+        if self.store is None:
+            self._apply_event(user_id, kind, payload)
+            return
+        
+        # Applying and appending together keeps snapshots consistent with the event ids they cover
+        with self._load_lock:
+            self._apply_event(user_id, kind, payload)
+            try:
+                event_id = self.store.append(user_id, kind, payload)
+                position = self._log_positions.get(user_id)
+                if position is not None:
+                    position[1], position[2] = event_id, position[2] + 1
+                    self._compact_user_log(user_id)
+            except Exception as e:
+                log.error("Error persisting care agent state", user_id=user_id, error=str(e))
         
     def analyze_user_patterns(self, user_id: str, 
                             conversation_history: List[Dict],
@@ -67,7 +222,8 @@ Analyze patterns and return a JSON object with this exact structure:
 
         try:
             # Get response from LLM
-            response = self.llm.invoke(analysis_prompt)
+            with span('llm.care_agent.analysis', prompt_chars=len(analysis_prompt)):
+                response = self.llm.invoke(analysis_prompt)
             response_text = response.content if hasattr(response, 'content') else str(response)
             
             # Clean up response text
@@ -103,21 +259,20 @@ Analyze patterns and return a JSON object with this exact structure:
                         raise ValueError(f"Missing required trend: {trend}")
                 
                 # Store in user patterns
-                self.user_patterns[user_id] = {
+                self._record_event(user_id, EVENT_PATTERNS, {
                     'last_analysis': time.time(),
                     'patterns': pattern_analysis
-                }
+                })
                 
-                print(f"✅ Successfully analyzed patterns for user {user_id}")
+                log.info("✅ Analyzed patterns", user_id=user_id)
                 return pattern_analysis
                 
             except json.JSONDecodeError as je:
-                print(f"JSON parsing error: {je}")
-                print(f"Response text was: {response_text[:200]}...")
+                log.warning("Pattern analysis returned invalid JSON", error=str(je), response=response_text)
                 raise
                 
         except Exception as e:
-            print(f"Error in pattern analysis: {e}")
+            log.error("Error in pattern analysis", user_id=user_id, error=str(e))
             fallback_response = {
                 'identified_patterns': [],
                 'recommended_actions': [],
@@ -129,16 +284,83 @@ Analyze patterns and return a JSON object with this exact structure:
             }
             
             # Store fallback in user patterns
-            self.user_patterns[user_id] = {
+            self._record_event(user_id, EVENT_PATTERNS, {
                 'last_analysis': time.time(),
                 'patterns': fallback_response,
                 'is_fallback': True
-            }
+            })
             
             return fallback_response
     
-    def generate_wellness_activity(self, user_id: str, context: str = 'general') -> Dict:
-        """Generate personalized wellness activity based on user patterns"""
+    def summarize_patterns(self, user_id: str, context: str = 'general', extra_context: str = '') -> str:
+        """Plain-text summary of a user's patterns used as a retrieval query"""
+        self._ensure_user_loaded(user_id)
+        patterns = self.user_patterns.get(user_id, {}).get('patterns', {})
+        
+        parts = [f"{context} support"]
+        for pattern in patterns.get('identified_patterns', []):
+            parts.append(pattern.get('description', ''))
+            parts.append(pattern.get('suggested_intervention', ''))
+        for action in patterns.get('recommended_actions', []):
+            parts.append(action.get('description', ''))
+        trends = patterns.get('wellness_trends', {})
+        if trends:
+            parts.append(f"emotional trajectory {trends.get('emotional_trajectory')}, "
+                         f"risk trajectory {trends.get('risk_trajectory')}")
+        if extra_context:
+            parts.append(extra_context)
+        
+        return ". ".join(part for part in parts if part)
+    
+    def generate_wellness_activity(self, user_id: str, context: str = 'general',
+                                   extra_context: str = '', personalize: bool = False) -> Dict:
+        """Recommend a wellness activity from the catalog, optionally personalized by the LLM"""
+        
+        self._ensure_user_loaded(user_id)
+        if self.activity_catalog is not None:
+            try:
+                query = self.summarize_patterns(user_id, context, extra_context)
+                matches = self.activity_catalog.retrieve(query, context=context, top_k=3)
+                if matches:
+                    activity = matches[0]
+                    activity['alternatives'] = [match['id'] for match in matches[1:]]
+                    if personalize and self.llm:
+                        activity = self._personalize_activity(activity, query)
+                    return activity
+            except Exception as e:
+                log.error("Error retrieving wellness activity from catalog", error=str(e))
+        
+        return self._generate_wellness_activity_with_llm(user_id, context)
+    
+    def _personalize_activity(self, activity: Dict, pattern_summary: str) -> Dict:
+        """Light LLM pass that rewords a catalog activity for the user"""
+        personalize_prompt = f"""Personalize this wellness activity for a user. Keep the same activity and steps, only adjust the wording of "description" and "steps" to fit the user's situation.
+
+User Situation: {pattern_summary}
+Activity: {json.dumps({'description': activity['description'], 'steps': activity['steps']}, ensure_ascii=False)}
+
+Return ONLY a JSON object: {{"description": "...", "steps": ["..."]}}"""
+        
+        try:
+            with span('llm.care_agent.personalize_activity', prompt_chars=len(personalize_prompt)):
+                response = self.llm.invoke(personalize_prompt)
+            response_text = response.content if hasattr(response, 'content') else str(response)
+            response_text = response_text.strip()
+            if response_text.startswith('```json'):
+                response_text = response_text[7:]
+            if response_text.endswith('```'):
+                response_text = response_text[:-3]
+            personalized = json.loads(response_text.strip())
+            
+            if isinstance(personalized.get('description'), str) and isinstance(personalized.get('steps'), list):
+                activity = dict(activity, description=personalized['description'],
+                                steps=personalized['steps'], personalized=True)
+        except Exception as e:
+            log.warning("Error personalizing wellness activity, using catalog version", error=str(e))
+        return activity
+    
+    def _generate_wellness_activity_with_llm(self, user_id: str, context: str = 'general') -> Dict:
+        """Generate a wellness activity from scratch when no catalog is available"""
         
         user_patterns = self.user_patterns.get(user_id, {})
         activity_prompt = f"""Generate a personalized wellness activity for a user.
@@ -169,16 +391,18 @@ Return a JSON activity plan:
 }}"""
 
         try:
-            response = self.llm.invoke(activity_prompt)
+            with span('llm.care_agent.activity', prompt_chars=len(activity_prompt)):
+                response = self.llm.invoke(activity_prompt)
             return json.loads(response.content if hasattr(response, 'content') else response)
         except Exception as e:
-            print(f"Error generating wellness activity: {e}")
+            log.error("Error generating wellness activity", error=str(e))
             return None
     
     def should_intervene(self, user_id: str, current_patterns: Dict) -> Tuple[bool, str, int]:
         """Determine if and how the agent should intervene"""
         
         # Check intervention history
+        self._ensure_user_loaded(user_id)
         last_intervention = self.intervention_history.get(user_id, {}).get('last_time', 0)
         intervention_count = self.intervention_history.get(user_id, {}).get('count', 0)
         
@@ -217,6 +441,7 @@ Return a JSON activity plan:
                             context: str = 'general') -> Dict:
         """Generate an appropriate intervention based on user patterns and context"""
         
+        self._ensure_user_loaded(user_id)
         user_patterns = self.user_patterns.get(user_id, {})
         
         intervention_prompt = f"""Generate an AI care agent intervention for a user.
@@ -248,19 +473,12 @@ Return a JSON intervention plan:
 }}"""
 
         try:
-            response = self.llm.invoke(intervention_prompt)
+            with span('llm.care_agent.intervention', prompt_chars=len(intervention_prompt)):
+                response = self.llm.invoke(intervention_prompt)
             intervention_plan = json.loads(response.content if hasattr(response, 'content') else response)
             
             # Update intervention history
-            if user_id not in self.intervention_history:
-                self.intervention_history[user_id] = {
-                    'count': 0,
-                    'history': []
-                }
-            
-            self.intervention_history[user_id]['count'] += 1
-            self.intervention_history[user_id]['last_time'] = time.time()
-            self.intervention_history[user_id]['history'].append({
+            self._record_event(user_id, EVENT_INTERVENTION, {
                 'timestamp': time.time(),
                 'reason': intervention_reason,
                 'urgency': urgency_level,
@@ -270,43 +488,21 @@ Return a JSON intervention plan:
             return intervention_plan
             
         except Exception as e:
-            print(f"Error generating intervention: {e}")
+            log.error("Error generating intervention", error=str(e))
             return None
             
     def track_risk_trends(self, user_id: str, current_risk: float) -> Dict:
         """Track and analyze risk level trends over time"""
         
-        if user_id not in self.risk_trends:
-            self.risk_trends[user_id] = {
-                'history': [],
-                'last_updated': None
-            }
-            
         # Add new risk assessment
-        self.risk_trends[user_id]['history'].append({
+        self._record_event(user_id, EVENT_RISK, {
             'risk_level': current_risk,
             'timestamp': time.time()
         })
-        
-        # Keep last 10 assessments
-        if len(self.risk_trends[user_id]['history']) > 10:
-            self.risk_trends[user_id]['history'] = self.risk_trends[user_id]['history'][-10:]
             
         # Calculate trend
         risk_levels = [entry['risk_level'] for entry in self.risk_trends[user_id]['history']]
-        
-        if len(risk_levels) >= 3:
-            recent_avg = np.mean(risk_levels[-3:])
-            older_avg = np.mean(risk_levels[:-3])
-            
-            if recent_avg > older_avg + 0.5:
-                trend = "increasing"
-            elif recent_avg < older_avg - 0.5:
-                trend = "decreasing"
-            else:
-                trend = "stable"
-        else:
-            trend = "insufficient_data"
+        trend = self._calculate_risk_trend(risk_levels)
             
         return {
             'current_risk': current_risk,
@@ -315,20 +511,97 @@ Return a JSON intervention plan:
             'requires_attention': trend == "increasing" and current_risk >= 3
         }
     
-    def generate_weekly_insight_report(self, user_id: str) -> Dict:
-        """Generate a comprehensive weekly insight report for therapists or mental health professionals"""
+    def _calculate_risk_trend(self, risk_levels: List[float]) -> str:
+        """Classify a series of risk levels as increasing, decreasing or stable"""
+        if len(risk_levels) >= 3:
+            recent_avg = np.mean(risk_levels[-3:])
+            older_avg = np.mean(risk_levels[:-3])
+            
+            if recent_avg > older_avg + 0.5:
+                return "increasing"
+            elif recent_avg < older_avg - 0.5:
+                return "decreasing"
+            return "stable"
+        return "insufficient_data"
+    
+    def compute_insight_metrics(self, user_id: str, emotion_history: Optional[List[Dict]] = None) -> Dict:
+        """Compute the numeric sections of the insight report from stored series"""
+        self._ensure_user_loaded(user_id)
+        interventions = self.intervention_history.get(user_id, {})
+        risk_history = self.risk_trends.get(user_id, {}).get('history', [])
+        week_ago = time.time() - INSIGHT_REPORT_PERIOD
+        
+        # Risk trajectory
+        risk_levels = [entry['risk_level'] for entry in risk_history]
+        risk_trajectory = {
+            'current_level': risk_levels[-1] if risk_levels else None,
+            'average_level': round(float(np.mean(risk_levels)), 2) if risk_levels else None,
+            'peak_level': max(risk_levels) if risk_levels else None,
+            'trend': self._calculate_risk_trend(risk_levels),
+            'series': risk_history
+        }
         
+        # Emotion distribution
+        emotion_counts = {}
+        for state in emotion_history or []:
+            for emotion in state.get('emotions', []):
+                emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
+        total_emotions = sum(emotion_counts.values())
+        emotion_distribution = {
+            'counts': emotion_counts,
+            'proportions': {
+                emotion: round(count / total_emotions, 3)
+                for emotion, count in emotion_counts.items()
+            } if total_emotions else {},
+            'samples': len(emotion_history or [])
+        }
+        
+        # Intervention counts
+        history = interventions.get('history', [])
+        by_reason = {}
+        by_urgency = {}
+        for entry in history:
+            by_reason[entry.get('reason')] = by_reason.get(entry.get('reason'), 0) + 1
+            by_urgency[str(entry.get('urgency'))] = by_urgency.get(str(entry.get('urgency')), 0) + 1
+        intervention_counts = {
+            'total': interventions.get('count', 0),
+            'this_week': sum(1 for entry in history if entry.get('timestamp', 0) >= week_ago),
+            'by_reason': by_reason,
+            'by_urgency': by_urgency,
+            'last_intervention': interventions.get('last_time')
+        }
+        
+        return {
+            'risk_trajectory': risk_trajectory,
+            'emotion_distribution': emotion_distribution,
+            'intervention_counts': intervention_counts
+        }
+    
+    def insight_report_digest(self, user_id: str) -> str:
+        """Digest of the state the report narrative is generated from"""
+        self._ensure_user_loaded(user_id)
+        state = {
+            'patterns': self.user_patterns.get(user_id, {}).get('patterns', {}),
+            'interventions': self.intervention_history.get(user_id, {}).get('history', []),
+            'risk': self.risk_trends.get(user_id, {}).get('history', [])
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    
+    def _generate_insight_narrative(self, user_id: str, metrics: Dict) -> Optional[Dict]:
+        """Ask the LLM for the narrative sections of the insight report"""
         patterns = self.user_patterns.get(user_id, {})
         interventions = self.intervention_history.get(user_id, {})
-        risk_data = self.risk_trends.get(user_id, {})
         
         report_prompt = f"""Generate a weekly mental health insight report for healthcare professionals.
 
 User Patterns: {json.dumps(patterns.get('patterns', {}), indent=2)}
 Recent Interventions: {json.dumps(interventions.get('history', [])[-3:], indent=2)}
-Risk Trends: {json.dumps(risk_data, indent=2)}
+Risk Trajectory: {json.dumps({k: v for k, v in metrics['risk_trajectory'].items() if k != 'series'}, indent=2)}
+Intervention Counts: {json.dumps(metrics['intervention_counts'], indent=2)}
 
-Generate a comprehensive report in JSON format:
+The numeric metrics above are already computed - do not restate them, interpret them.
+
+Generate the narrative sections of the report in JSON format:
 {{
     "summary": {{
         "overall_status": "status description",
@@ -338,7 +611,6 @@ Generate a comprehensive report in JSON format:
     "detailed_analysis": {{
         "behavioral_patterns": ["pattern1", "pattern2"],
         "risk_assessment": {{
-            "current_level": 1-5,
             "trend": "trend description",
             "contributing_factors": ["factor1", "factor2"]
         }},
@@ -360,8 +632,109 @@ Generate a comprehensive report in JSON format:
 }}"""
 
         try:
-            response = self.llm.invoke(report_prompt)
-            return json.loads(response.content if hasattr(response, 'content') else response)
+            with span('llm.care_agent.insight_report', prompt_chars=len(report_prompt)):
+                response = self.llm.invoke(report_prompt)
+            response_text = response.content if hasattr(response, 'content') else str(response)
+            
+            # Remove markdown code blocks if present
+            response_text = response_text.strip()
+            if response_text.startswith('```json'):
+                response_text = response_text[7:]
+            if response_text.endswith('```'):
+                response_text = response_text[:-3]
+            return json.loads(response_text.strip())
         except Exception as e:
-            print(f"Error generating insight report: {e}")
-            return None
\ No newline at end of file
+            log.error("Error generating insight report narrative", error=str(e))
+            return None
+    
+    def generate_weekly_insight_report(self, user_id: str,
+                                       emotion_history: Optional[List[Dict]] = None,
+                                       force_refresh: bool = False) -> Dict:
+        """Generate a comprehensive weekly insight report for therapists or mental health professionals"""
+        
+        self._ensure_user_loaded(user_id)
+        metrics = self.compute_insight_metrics(user_id, emotion_history)
+        digest = self.insight_report_digest(user_id)
+        
+        # Reuse the cached narrative while the underlying state is unchanged
+        cached = None if force_refresh else self._load_cached_report(user_id)
+        if cached and cached['digest'] == digest:
+            narrative = cached['narrative']
+            generated_at = cached['generated_at']
+            cache_hit = True
+        else:
+            narrative = self._generate_insight_narrative(user_id, metrics) if self.llm else None
+            if narrative is None:
+                return None
+            generated_at = time.time()
+            cache_hit = False
+            self._save_cached_report(user_id, digest, narrative, generated_at)
+        
+        report = json.loads(json.dumps(narrative))
+        report.setdefault('detailed_analysis', {}).setdefault('risk_assessment', {})
+        report['detailed_analysis']['risk_assessment']['current_level'] = metrics['risk_trajectory']['current_level']
+        report['metrics'] = metrics
+        report['report_meta'] = {
+            'digest': digest,
+            'narrative_generated_at': generated_at,
+            'cached': cache_hit
+        }
+        return report
+    
+    def _load_cached_report(self, user_id: str) -> Optional[Dict]:
+        """Get the cached report narrative from memory or the durable store"""
+        cached = self.insight_reports.pop(user_id, None)
+        if cached is not None:
+            self._remember_report(user_id, cached)
+            return cached
+        
+        if self.store is not None:
+            try:
+                cached = self.store.load_report(user_id)
+                if cached:
+                    self._remember_report(user_id, cached)
+                return cached
+            except Exception as e:
+                log.error("Error loading cached insight report", user_id=user_id, error=str(e))
+        return None
+    
+    def _save_cached_report(self, user_id: str, digest: str, narrative: Dict, generated_at: float) -> None:
+        """Cache a report narrative in memory and in the durable store"""
+        self.insight_reports.pop(user_id, None)
+        self._remember_report(user_id, {
+            'digest': digest,
+            'narrative': narrative,
+            'generated_at': generated_at
+        })
+        
+        if self.store is not None:
+            try:
+                self.store.save_report(user_id, digest, narrative, generated_at)
+            except Exception as e:
+                log.error("Error persisting insight report", user_id=user_id, error=str(e))
+    
+    def _remember_report(self, user_id: str, report: Dict) -> None:
+        """Keep a narrative in memory as most recently used, dropping the oldest over the cap"""
+        if self.insight_reports.get(user_id) is not report:
+            self._state_changed(user_id)
+        self.insight_reports[user_id] = report
+        while len(self.insight_reports) > INSIGHT_REPORT_CACHE_MAX_ENTRIES:
+            evicted = next(iter(self.insight_reports))
+            self.insight_reports.pop(evicted, None)
+            self._state_changed(evicted)
+    
+    def warm_insight_reports(self, user_ids: List[str]) -> int:
+        """Pre-generate insight reports so clinician views are served from cache"""
+        warmed = 0
+        for user_id in user_ids:
+            try:
+                cached = self._load_cached_report(user_id)
+                if cached and cached['digest'] == self.insight_report_digest(user_id):
+                    continue
+                with attributed(user_id, 'insight_report_warmup', caller='llm.care_agent.insight_report'):
+                    report = self.generate_weekly_insight_report(user_id)
+                if report:
+                    warmed += 1
+            except Exception as e:
+                log.error("Error warming insight report", user_id=user_id, error=str(e))
+        return warmed
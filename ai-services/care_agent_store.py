@@ -0,0 +1,153 @@
+"""AI Care Agent - Durable State Storage
+
+Append-only SQLite event log backing AICareAgent state (pattern analyses,
+interventions and risk assessments) so cooldowns and trends survive restarts.
+Events are replayed per user on first access; nothing is scanned at startup.
+Each user's log is compacted into a snapshot once it grows past
+SNAPSHOT_EVERY_EVENTS, so replay cost and disk use stay bounded. Also caches generated insight report narratives keyed on a state digest.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.environ.get('CARE_AGENT_DB_PATH', 'care_agent_state.db')
+
+# Event kinds written by AICareAgent
+EVENT_PATTERNS = 'patterns'
+EVENT_INTERVENTION = 'intervention'
+EVENT_RISK = 'risk'
+
+SNAPSHOT_EVERY_EVENTS = int(os.environ.get('CARE_AGENT_SNAPSHOT_EVERY', 100))  # Events before a user's log is compacted
+
+class CareAgentStore:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the event log and make sure the schema exists"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS care_agent_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_care_agent_events_user
+            ON care_agent_events (user_id, id)
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS care_agent_snapshots (
+                user_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                last_event_id INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS insight_reports (
+                user_id TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                narrative TEXT NOT NULL,
+                generated_at REAL NOT NULL
+            )
+        """)
+        return conn
+
+    def append(self, user_id: str, kind: str, payload: Dict) -> int:
+        """Append a single state event for a user; returns its event id"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO care_agent_events (user_id, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (user_id, kind, json.dumps(payload, default=str), time.time())
+            )
+            return cursor.lastrowid
+
+    def load_user(self, user_id: str) -> Tuple[Optional[Dict], int, List[Tuple[int, str, Dict, float]]]:
+        """Return a user's latest snapshot (or None), the event id it covers and the events after it"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, last_event_id FROM care_agent_snapshots WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+            snapshot, last_event_id = (json.loads(row[0]), row[1]) if row else (None, 0)
+            rows = self._conn.execute(
+                "SELECT id, kind, payload, created_at FROM care_agent_events "
+                "WHERE user_id = ? AND id > ? ORDER BY id",
+                (user_id, last_event_id)
+            ).fetchall()
+        events = [(event_id, kind, json.loads(payload), created_at) for event_id, kind, payload, created_at in rows]
+        return snapshot, last_event_id, events
+
+    def load_events(self, user_id: str) -> List[Tuple[str, Dict, float]]:
+        """Return the events recorded after a user's snapshot in insertion order"""
+        _, _, events = self.load_user(user_id)
+        return [(kind, payload, created_at) for _, kind, payload, created_at in events]
+
+    def save_snapshot(self, user_id: str, state: Dict, base_event_id: int,
+                      last_event_id: int, applied_events: int) -> bool:
+        """Replace a user's snapshot with `state` and delete the events it covers.
+
+        `state` must reflect the previous snapshot (`base_event_id`) plus exactly
+        `applied_events` events up to `last_event_id`. If another process appended
+        events for the user in that range, nothing is written and False is returned.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (logged,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM care_agent_events WHERE user_id = ? AND id > ? AND id <= ?",
+                    (user_id, base_event_id, last_event_id)
+                ).fetchone()
+                if logged != applied_events:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO care_agent_snapshots (user_id, state, last_event_id, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (user_id, json.dumps(state, default=str), last_event_id, time.time())
+                )
+                self._conn.execute(
+                    "DELETE FROM care_agent_events WHERE user_id = ? AND id <= ?",
+                    (user_id, last_event_id)
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def load_report(self, user_id: str) -> Optional[Dict]:
+        """Return the cached insight report narrative for a user, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, narrative, generated_at FROM insight_reports WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'digest': row[0], 'narrative': json.loads(row[1]), 'generated_at': row[2]}
+
+    def save_report(self, user_id: str, digest: str, narrative: Dict, generated_at: float) -> None:
+        """Replace the cached insight report narrative for a user"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO insight_reports (user_id, digest, narrative, generated_at) VALUES (?, ?, ?, ?)",
+                (user_id, digest, json.dumps(narrative, default=str), generated_at)
+            )
+
+    def close(self) -> None:
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,102 @@
+"""Lazily loaded service components
+
+Heavy dependencies (the Gemini client, the sentence-transformers model and
+everything built on them) are registered here with a loader function instead
+of being created at import time. The HTTP server can bind immediately while a
+background thread loads them in order; liveness/readiness endpoints read each
+component's state from this registry.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+STATE_PENDING = 'pending'
+STATE_LOADING = 'loading'
+STATE_READY = 'ready'
+STATE_FAILED = 'failed'
+
+class Component:
+    def __init__(self, name: str, loader: Callable[[], Any], required: bool = True):
+        self.name = name
+        self.loader = loader
+        self.required = required  # Readiness waits for required components only
+        self.state = STATE_PENDING
+        self.value = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+
+    def load(self) -> Any:
+        """Run the loader once; concurrent callers wait for the first one"""
+        with self._lock:
+            if self._loaded.is_set():
+                return self.value
+            self.state = STATE_LOADING
+            started = time.time()
+            try:
+                self.value = self.loader()
+                self.state = STATE_READY
+                log.info("✅ Component loaded", component=self.name, seconds=round(time.time() - started, 2))
+            except Exception as e:
+                self.error = str(e)
+                self.state = STATE_FAILED
+                log.warning("⚠️ Could not load component", component=self.name, error=str(e))
+            self.load_seconds = round(time.time() - started, 3)
+            self._loaded.set()
+            return self.value
+
+class ComponentRegistry:
+    def __init__(self):
+        self._components: Dict[str, Component] = {}
+        self._started_at = time.time()
+
+    def register(self, name: str, loader: Callable[[], Any], required: bool = True) -> Component:
+        component = Component(name, loader, required)
+        self._components[name] = component
+        return component
+
+    def get(self, name: str, timeout: Optional[float] = 0) -> Any:
+        """Component value; loads it inline if nobody has started, or waits up to timeout for the loader"""
+        component = self._components[name]
+        if component.state == STATE_PENDING:
+            return component.load()
+        if timeout != 0:
+            component._loaded.wait(timeout)
+        return component.value
+
+    def start_background_loading(self, names: Optional[List[str]] = None) -> threading.Thread:
+        """Load components in registration order on a daemon thread"""
+        names = names or list(self._components)
+
+        def run():
+            for name in names:
+                self._components[name].load()
+
+        thread = threading.Thread(target=run, name='component-loader', daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self) -> bool:
+        """Every required component has finished loading (a failed load still counts as settled)"""
+        return all(c.state in (STATE_READY, STATE_FAILED) for c in self._components.values() if c.required)
+
+    def status(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                'state': component.state,
+                'required': component.required,
+                'load_seconds': component.load_seconds,
+                'error': component.error
+            }
+            for name, component in self._components.items()
+        }
+
+    def uptime(self) -> float:
+        return time.time() - self._started_at
+
+registry = ComponentRegistry()
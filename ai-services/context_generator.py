@@ -4,19 +4,39 @@ Generates personalized AI contexts based on user onboarding data.
 
 import os
 import json
+import threading
+import time
 from typing import Dict, List, Optional, Union
-from langchain_google_genai import ChatGoogleGenerativeAI
 from context_prompts import CONTEXT_PROMPTS, get_context_prompt
+from service_logging import get_logger
 
-# Initialize the LLM
+log = get_logger(__name__)
+
+# The LLM is created on first use so importing this module stays cheap
 geminiLlm = None
-try:
-    geminiLlm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=0.7
-    )
-except Exception as e:
-    print(f"Warning: Could not initialize Gemini LLM for context generation: {e}")
+_llm_lock = threading.Lock()
+_llm_failed_at: Optional[float] = None  # Last failed attempt; no retry before LLM_RETRY_AFTER has passed
+LLM_RETRY_AFTER = 300  # Seconds
+
+def get_llm():
+    """Gemini LLM for context generation, created on first call (None if unavailable)"""
+    global geminiLlm, _llm_failed_at
+    if geminiLlm is not None:
+        return geminiLlm
+    with _llm_lock:
+        if geminiLlm is None and (_llm_failed_at is None or time.time() - _llm_failed_at >= LLM_RETRY_AFTER):
+            try:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                geminiLlm = ChatGoogleGenerativeAI(
+                    model="gemini-2.0-flash",
+                    temperature=0.7
+                )
+                _llm_failed_at = None
+            except Exception as e:
+                _llm_failed_at = time.time()
+                log.warning("Could not initialize Gemini LLM for context generation, will retry later",
+                            error=str(e), retry_after_seconds=LLM_RETRY_AFTER)
+        return geminiLlm
 
 def analyze_risk_level(onboarding_data: Dict[str, Union[str, int, bool, List[str], Dict]]) -> Dict[str, Union[str, int, List[str], bool]]:
     """Analyze risk level from onboarding data for appropriate support level"""
@@ -1,10 +1,17 @@
 """Crisis detection and therapist referral system"""
 
+import re
 import time
 from typing import Dict, List, Tuple, Optional
 import json
 from datetime import datetime, timedelta
 
+from metrics import FALLBACKS
+from service_logging import get_logger
+from tracing import span
+
+log = get_logger(__name__)
+
 # Crisis keywords and patterns with severity levels
 CRISIS_PATTERNS = {
     'suicidal_ideation': {
@@ -59,6 +66,14 @@ CRISIS_PATTERNS = {
     }
 }
 
+# Keyword lists compiled once into alternation regexes: a single scan rejects the
+# common no-crisis message, and the per-type pattern narrows the keyword loop
+CRISIS_TYPE_PATTERNS = {
+    crisis_type: re.compile('|'.join(re.escape(k.lower()) for k in data['keywords']))
+    for crisis_type, data in CRISIS_PATTERNS.items()
+}
+CRISIS_KEYWORD_PATTERN = re.compile('|'.join(p.pattern for p in CRISIS_TYPE_PATTERNS.values()))
+
 # Immediate response templates for different crisis levels
 CRISIS_RESPONSES = {
     5: {  # Severe Crisis (Suicidal ideation)
@@ -161,7 +176,8 @@ DO NOT include any text before or after the JSON object. Return ONLY the JSON.""
     
     try:
         # Get LLM analysis
-        response = llm.invoke(analysis_prompt)
+        with span('llm.crisis_detection', prompt_chars=len(analysis_prompt)):
+            response = llm.invoke(analysis_prompt)
         response_text = response.content if hasattr(response, 'content') else str(response)
         
         # Clean up the response text to ensure valid JSON
@@ -185,11 +201,10 @@ DO NOT include any text before or after the JSON object. Return ONLY the JSON.""
             
             for field, field_type in required_fields.items():
                 if field not in result:
-                    print(f"Missing required field: {field}")
                     raise ValueError(f"Missing required field: {field}")
                 if not isinstance(result[field], field_type):
-                    print(f"Invalid type for field {field}: expected {field_type}, got {type(result[field])}")
-                    raise ValueError(f"Invalid type for field {field}")
+                    raise ValueError(f"Invalid type for field {field}: expected {field_type.__name__}, "
+                                     f"got {type(result[field]).__name__}")
             
             # Add metadata and timestamps
             current_time = time.time()
@@ -202,24 +217,25 @@ DO NOT include any text before or after the JSON object. Return ONLY the JSON.""
                 if 'timestamp' not in indicator:
                     indicator['timestamp'] = current_time
             
-            # Log analysis
-            print(f"🚨 Crisis Analysis for {user_id}:", json.dumps(result, indent=2))
+            log.debug("🚨 Crisis analysis complete", user_id=user_id, severity_level=result['severity_level'],
+                      indicators=len(result.get('crisis_indicators', [])),
+                      immediate_action_required=result['immediate_action_required'])
             
             return result
             
         except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}")
-            print(f"Response text: {response_text}")
+            log.warning("Crisis analysis returned invalid JSON, using keyword fallback", error=str(e),
+                        response=response_text)
             return analyze_crisis_indicators_fallback(message, user_id, conversation_history, emotion_history)
         except ValueError as e:
-            print(f"Validation error: {e}")
+            log.warning("Crisis analysis failed validation, using keyword fallback", error=str(e))
             return analyze_crisis_indicators_fallback(message, user_id, conversation_history, emotion_history)
-        except Exception as e:
-            print(f"Unexpected error: {e}")
+        except Exception:
+            log.exception("Unexpected error in crisis analysis, using keyword fallback")
             return analyze_crisis_indicators_fallback(message, user_id, conversation_history, emotion_history)
         
     except Exception as e:
-        print(f"Error in LLM crisis analysis: {e}")
+        log.error("Error in LLM crisis analysis, using keyword fallback", error=str(e))
         # Fallback to pattern matching
         return analyze_crisis_indicators_fallback(message, user_id, conversation_history, emotion_history)
 
@@ -230,13 +246,17 @@ def analyze_crisis_indicators_fallback(
     emotion_history: List[Dict]
 ) -> Dict:
     """Fallback pattern-based crisis detection"""
+    FALLBACKS.inc('crisis_keywords')
     message_lower = message.lower()
     crisis_indicators = []
     max_severity = 0
     immediate_action = False
     
     # Check current message for crisis keywords
-    for crisis_type, data in CRISIS_PATTERNS.items():
+    matched_types = CRISIS_PATTERNS if CRISIS_KEYWORD_PATTERN.search(message_lower) else {}
+    for crisis_type, data in matched_types.items():
+        if not CRISIS_TYPE_PATTERNS[crisis_type].search(message_lower):
+            continue
         for keyword in data['keywords']:
             if keyword.lower() in message_lower:
                 crisis_indicators.append({
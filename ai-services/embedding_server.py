@@ -0,0 +1,279 @@
+"""Shared embedding sidecar
+
+Runs the SentenceTransformer model in one process with a fixed torch thread
+count and serves embeddings to every service worker over a Unix socket, so the
+model and torch runtime are loaded once per machine instead of once per worker
+and the workers no longer oversubscribe the CPU with intra-op threads.
+
+Protocol (per request, on a persistent connection):
+    client -> server: 4-byte big-endian length + JSON {"op": "encode", "texts": [...]}
+    server -> client: 4-byte big-endian length + JSON {"shape": [n, d]} (or {"error": ...}),
+                      followed by n * d float32 values in native byte order
+
+Concurrent requests are merged into a single model.encode call. The client
+receives the vectors straight into a bytearray and wraps it with
+np.frombuffer, so no intermediate copies are made.
+
+Run alongside the service with:
+    python embedding_server.py --socket /tmp/mindcare-embeddings.sock --threads 2
+and start the workers with EMBEDDING_SERVER_SOCKET pointing at the same path.
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+EMBEDDING_MODEL_NAME = os.environ.get('EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+EMBEDDING_SERVER_SOCKET = os.environ.get('EMBEDDING_SERVER_SOCKET', '')
+EMBEDDING_SERVER_THREADS = int(os.environ.get('EMBEDDING_SERVER_THREADS', 2))
+EMBEDDING_MAX_BATCH = int(os.environ.get('EMBEDDING_MAX_BATCH', 64))  # Texts per model.encode call
+EMBEDDING_BATCH_WAIT = float(os.environ.get('EMBEDDING_BATCH_WAIT_MS', 5)) / 1000  # Wait to fill a batch
+EMBEDDING_CLIENT_TIMEOUT = 30  # Seconds per request
+FRAME_HEADER = struct.Struct('>I')
+
+def _recv_exactly(sock: socket.socket, view: memoryview) -> bool:
+    """Fill the view from the socket; False if the peer closed before any data arrived"""
+    received = 0
+    while received < len(view):
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            if received == 0:
+                return False
+            raise ConnectionError("Connection closed mid-frame")
+        received += count
+    return True
+
+def _send_json(sock: socket.socket, payload: Dict) -> None:
+    data = json.dumps(payload).encode('utf-8')
+    sock.sendall(FRAME_HEADER.pack(len(data)) + data)
+
+def _recv_json(sock: socket.socket) -> Optional[Dict]:
+    header = bytearray(FRAME_HEADER.size)
+    if not _recv_exactly(sock, memoryview(header)):
+        return None
+    body = bytearray(FRAME_HEADER.unpack(header)[0])
+    if body and not _recv_exactly(sock, memoryview(body)):
+        raise ConnectionError("Connection closed mid-frame")
+    return json.loads(body.decode('utf-8'))
+
+class _ThreadingUnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128  # Every worker thread holds its own connection
+
+class _PendingRequest:
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.vectors: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+class EmbeddingServer:
+    def __init__(self, socket_path: str, model_name: str = EMBEDDING_MODEL_NAME,
+                 num_threads: int = EMBEDDING_SERVER_THREADS, max_batch: int = EMBEDDING_MAX_BATCH,
+                 batch_wait: float = EMBEDDING_BATCH_WAIT):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.num_threads = num_threads
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.model = None
+        self.dimension = None
+        self._pending: queue.Queue = queue.Queue()
+        self.stats = {'requests': 0, 'texts': 0, 'batches': 0}
+
+    def load_model(self) -> None:
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        torch.set_num_threads(self.num_threads)
+        started = time.time()
+        self.model = SentenceTransformer(self.model_name)
+        log.info("✅ Loaded embedding model", model=self.model_name, seconds=round(time.time() - started, 2),
+                 torch_threads=self.num_threads)
+
+    def _batch_loop(self) -> None:
+        """Merge requests that arrive close together into one model.encode call"""
+        while True:
+            batch = [self._pending.get()]
+            count = len(batch[0].texts)
+            deadline = time.time() + self.batch_wait
+            while count < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item.texts)
+
+            texts = [text for item in batch for text in item.texts]
+            try:
+                vectors = np.ascontiguousarray(self.model.encode(texts), dtype=np.float32)
+                offset = 0
+                for item in batch:
+                    item.vectors = vectors[offset:offset + len(item.texts)]
+                    offset += len(item.texts)
+            except Exception as e:
+                for item in batch:
+                    item.error = str(e)
+            self.stats['batches'] += 1
+            for item in batch:
+                item.done.set()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        item = _PendingRequest(texts)
+        self._pending.put(item)
+        item.done.wait()
+        if item.error:
+            raise RuntimeError(item.error)
+        return item.vectors
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sock = self.request
+                while True:
+                    try:
+                        request = _recv_json(sock)
+                    except (ConnectionError, ValueError):
+                        return
+                    if request is None:
+                        return
+
+                    if request.get('op') == 'ping':
+                        _send_json(sock, {'ok': True, 'model': server.model_name,
+                                          'dimension': server.dimension, 'stats': server.stats})
+                        continue
+
+                    texts = [str(text) for text in request.get('texts', [])]
+                    server.stats['requests'] += 1
+                    server.stats['texts'] += len(texts)
+                    try:
+                        vectors = server.encode(texts) if texts else np.zeros((0, server.dimension), dtype=np.float32)
+                    except Exception as e:
+                        _send_json(sock, {'error': str(e)})
+                        continue
+                    _send_json(sock, {'shape': list(vectors.shape)})
+                    if vectors.size:
+                        sock.sendall(memoryview(np.ascontiguousarray(vectors)).cast('B'))
+
+        return Handler
+
+    def serve_forever(self) -> None:
+        if self.model is None:
+            self.load_model()
+        self.dimension = int(np.asarray(self.model.encode(['warm up'])).shape[1])
+        threading.Thread(target=self._batch_loop, name='embedding-batcher', daemon=True).start()
+
+        # Bind only once the model is loaded so clients that can connect can also encode
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        with _ThreadingUnixServer(self.socket_path, self._make_handler()) as server:
+            log.info("🚀 Embedding server listening", socket=self.socket_path)
+            server.serve_forever()
+
+class RemoteEmbeddingModel:
+    """Drop-in for SentenceTransformer.encode backed by the embedding sidecar"""
+
+    def __init__(self, socket_path: str = EMBEDDING_SERVER_SOCKET, timeout: float = EMBEDDING_CLIENT_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.dimension = None
+        self._local = threading.local()  # One connection per thread
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self) -> None:
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+            self._local.sock = None
+
+    def reset_connections(self) -> None:
+        """Forget inherited connections after fork; a socket shared by two processes interleaves frames"""
+        self._local = threading.local()
+
+    def _request(self, payload: Dict):
+        """Send a request, reconnecting once if the pooled connection went stale"""
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                _send_json(sock, payload)
+                header = _recv_json(sock)
+                if header is None:
+                    raise ConnectionError("Embedding server closed the connection")
+                return sock, header
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt:
+                    raise
+
+    def ping(self) -> Dict:
+        _, header = self._request({'op': 'ping'})
+        self.dimension = header.get('dimension')
+        return header
+
+    def wait_until_ready(self, timeout: float = 60) -> Dict:
+        """Ping until the sidecar answers (it binds only after loading the model)"""
+        deadline = time.time() + timeout
+        while True:
+            try:
+                return self.ping()
+            except (OSError, ConnectionError):
+                if time.time() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+    def encode(self, sentences, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        sock, header = self._request({'op': 'encode', 'texts': texts})
+        if 'error' in header:
+            raise RuntimeError(f"Embedding server error: {header['error']}")
+
+        rows, dimension = header['shape']
+        buffer = bytearray(rows * dimension * 4)
+        try:
+            if buffer and not _recv_exactly(sock, memoryview(buffer)):
+                raise ConnectionError("Embedding server closed the connection")
+        except (OSError, ConnectionError):
+            self._close()
+            raise
+        vectors = np.frombuffer(buffer, dtype=np.float32).reshape(rows, dimension)
+        return vectors[0] if single else vectors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared embedding server for the AI service")
+    parser.add_argument('--socket', default=EMBEDDING_SERVER_SOCKET or '/tmp/mindcare-embeddings.sock')
+    parser.add_argument('--model', default=EMBEDDING_MODEL_NAME)
+    parser.add_argument('--threads', type=int, default=EMBEDDING_SERVER_THREADS)
+    args = parser.parse_args()
+
+    EmbeddingServer(args.socket, model_name=args.model, num_threads=args.threads).serve_forever()
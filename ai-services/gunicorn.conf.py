@@ -0,0 +1,84 @@
+"""Pre-fork server configuration for the AI service
+
+Loads main.py once in the gunicorn master (embedding model, keyword patterns,
+prompt and preference modules) and forks workers that share those pages
+copy-on-write. An alternative to the embedding sidecar in embedding_server.py
+when one host runs several workers.
+
+    gunicorn -c gunicorn.conf.py
+
+The default is a single worker with request threads. Conversation history,
+the chat rate limit, speech jobs (/speech_jobs/<id>), proactive upgrades
+(/proactive_upgrade/<id>), the proactive message queue and the care agent's
+in-memory state all live in the worker process. Requests are spread across
+workers with no affinity, so with several workers a follow-up turn or poll
+can land on a worker that has never seen the user or the job. Only raise
+GUNICORN_WORKERS once that state is moved out of the process. Until then,
+scale out with more single-worker instances behind a proxy that keeps each
+user on one instance.
+
+Environment:
+    GUNICORN_WORKERS          worker processes (default 1, see above)
+    GUNICORN_THREADS          request threads per worker (default 16, SSE streams hold one each)
+    GUNICORN_BIND             listen address (default 0.0.0.0:5010)
+    GUNICORN_PRELOAD=0        import the app in each worker instead (for comparing memory)
+    TORCH_THREADS_PER_WORKER  torch/OpenMP threads per worker (default 1)
+"""
+
+import os
+
+wsgi_app = 'main:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5010')
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+timeout = 120  # LLM calls plus chunked synthesis can take a while
+graceful_timeout = 30
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+# Must be in the environment before torch, tokenizers or the app are imported.
+# OpenMP and MKL size their pools from these once per process, and the Rust
+# tokenizers pool is not fork-safe, so it is turned off.
+_torch_threads = os.environ.setdefault('TORCH_THREADS_PER_WORKER', '1')
+os.environ.setdefault('OMP_NUM_THREADS', _torch_threads)
+os.environ.setdefault('MKL_NUM_THREADS', _torch_threads)
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+if preload_app:
+    os.environ['MINDCARE_PREFORK'] = '1'  # main.py loads shared state and defers threads to after_fork
+
+# Age of the worker running one-off jobs such as the TTS warm-up (tracked in the master)
+_singleton_worker = None
+
+def when_ready(server):
+    server.log.info(f"MindCare AI service ready: {workers} workers x {threads} threads, preload={preload_app}")
+    if workers > 1:
+        server.log.warning("GUNICORN_WORKERS > 1: per-user state, speech jobs and proactive upgrades are per "
+                           "process, so requests landing on another worker lose them (see gunicorn.conf.py)")
+
+def pre_fork(server, worker):
+    # Runs in the master: hand the singleton jobs to this worker if no live worker has them,
+    # so a replacement for a crashed worker takes them over
+    global _singleton_worker
+    worker.run_singletons = _singleton_worker is None
+    if worker.run_singletons:
+        _singleton_worker = worker.age
+
+def child_exit(server, worker):
+    global _singleton_worker
+    if getattr(worker, 'run_singletons', False):
+        _singleton_worker = None
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+    import main
+
+    main.after_fork(run_singletons=worker.run_singletons)
+
+def post_worker_init(worker):
+    # Without preload the worker has just imported the app itself; nothing starts on import
+    if worker.cfg.preload_app:
+        return
+    import main
+
+    main.start_background_jobs(run_singletons=worker.run_singletons)
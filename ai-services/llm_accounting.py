@@ -0,0 +1,403 @@
+"""LLM token and cost accounting
+
+Every Gemini call goes through AccountedLLM, which records prompt and
+completion tokens (from the response's usage metadata, estimated from text
+length when the provider reports none), latency, estimated cost and the
+caller. Usage is aggregated per day, user, endpoint, model and caller in
+memory and flushed to a SQLite table shared by all workers every
+LLM_USAGE_FLUSH_INTERVAL seconds (or after LLM_USAGE_FLUSH_CALLS calls), so an
+LLM call costs no disk write; it is served at /llm_usage.
+
+The user and endpoint come from the request (bound in main.start_timer) or
+from attributed() in background jobs; the caller is the enclosing tracing
+span (llm.emotion, llm.care_agent.analysis, ...), or the name given to
+attributed() outside of a traced request.
+
+Optional per-user daily token budgets (LLM_DAILY_TOKEN_BUDGET, or per-user
+overrides via set_budget) send users who exceed them down cheaper paths:
+optional calls raise LLMBudgetExceeded, which the callers' existing fallbacks
+handle (keyword emotion detection, template proactive messages, rule-based
+care agent output). Crisis detection is never cut off, and the chat reply
+moves to LLM_BUDGET_FALLBACK_MODEL when one is configured. Budget overrides
+are cached in memory, so with no budget configured a call checks nothing on
+disk; a user with a budget costs one usage read per day per process, after
+which the process keeps a running total (usage from other workers is picked
+up when the user's budget is changed or the day rolls over). Overrides set
+through another worker are re-read on every flush.
+"""
+
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from metrics import FALLBACKS, LLM_TOKENS
+from tracing import current_span_name
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+LLM_USAGE_DB_PATH = os.environ.get('LLM_USAGE_DB_PATH', 'llm_usage.db')
+LLM_DAILY_TOKEN_BUDGET = int(os.environ.get('LLM_DAILY_TOKEN_BUDGET', 0))  # Per user per UTC day, 0 disables
+LLM_BUDGET_FALLBACK_MODEL = os.environ.get('LLM_BUDGET_FALLBACK_MODEL', '')  # e.g. gemini-2.0-flash-lite
+LLM_USAGE_RETENTION_DAYS = int(os.environ.get('LLM_USAGE_RETENTION_DAYS', 90))
+LLM_USAGE_FLUSH_INTERVAL = float(os.environ.get('LLM_USAGE_FLUSH_INTERVAL', 15))  # Seconds between usage writes
+LLM_USAGE_FLUSH_CALLS = int(os.environ.get('LLM_USAGE_FLUSH_CALLS', 500))  # Pending calls that force a write
+
+# USD per million tokens (input, output); unknown models are recorded at zero cost
+MODEL_PRICES = {
+    'gemini-2.0-flash': (0.10, 0.40),
+    'gemini-2.0-flash-lite': (0.075, 0.30),
+}
+
+# Callers that still run for users over budget: safety checks and the reply itself
+BUDGET_EXEMPT_CALLERS = {'llm.crisis_detection', 'llm.chat_reply'}
+
+class LLMBudgetExceeded(RuntimeError):
+    """Raised instead of calling the LLM for a user over their daily token budget"""
+
+# (user_id, endpoint, caller used when no span is open)
+_attribution: contextvars.ContextVar[Tuple[Optional[str], Optional[str], Optional[str]]] = \
+    contextvars.ContextVar('llm_attribution', default=(None, None, None))
+
+def bind(user_id: Optional[str], endpoint: Optional[str]):
+    """Attribute LLM usage in this context to a user and endpoint; returns a token for unbind"""
+    return _attribution.set((user_id, endpoint, None))
+
+def unbind(token) -> None:
+    try:
+        _attribution.reset(token)
+    except ValueError:
+        _attribution.set((None, None, None))  # Reset from a different context than it was bound in
+
+@contextmanager
+def attributed(user_id: Optional[str], endpoint: Optional[str] = None, caller: Optional[str] = None):
+    """Attribute LLM usage in a background job; keeps the surrounding endpoint unless one is given"""
+    _, outer_endpoint, outer_caller = _attribution.get()
+    token = _attribution.set((user_id, endpoint or outer_endpoint or 'background', caller or outer_caller))
+    try:
+        yield
+    finally:
+        _attribution.reset(token)
+
+def current_attribution() -> Tuple[Optional[str], str, Optional[str]]:
+    user_id, endpoint, caller = _attribution.get()
+    return user_id, endpoint or 'background', caller
+
+def utc_day(timestamp: Optional[float] = None) -> str:
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) when the provider reports none"""
+    return max(1, len(text) // 4) if text else 0
+
+def _prompt_text(prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, (list, tuple)):
+        return '\n'.join(str(getattr(message, 'content', message)) for message in prompt)
+    return str(prompt)
+
+def token_usage(prompt, response) -> Tuple[int, int, bool]:
+    """(prompt_tokens, completion_tokens, estimated) for one call"""
+    usage = getattr(response, 'usage_metadata', None) or {}
+    if usage.get('input_tokens') is not None:
+        return int(usage['input_tokens']), int(usage.get('output_tokens') or 0), False
+    content = response.content if hasattr(response, 'content') else str(response)
+    return estimate_tokens(_prompt_text(prompt)), estimate_tokens(str(content)), True
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+# Pending aggregates are keyed like the table: day, user_id, endpoint, model, caller
+UsageKey = Tuple[str, str, str, str, str]
+
+class LLMAccountant:
+    def __init__(self, db_path: str = LLM_USAGE_DB_PATH, daily_token_budget: int = LLM_DAILY_TOKEN_BUDGET,
+                 flush_calls: int = LLM_USAGE_FLUSH_CALLS):
+        self.db_path = db_path
+        self.daily_token_budget = daily_token_budget
+        self.flush_calls = flush_calls
+        self._lock = threading.Lock()
+        self._pending: Dict[UsageKey, List[float]] = {}  # Not yet written to SQLite
+        self._pending_calls = 0
+        self._used_today: Dict[str, int] = {}  # Running token totals of users with a budget
+        self._used_day = None
+        self._conn = self._connect()
+        self._budgets = self._load_budgets()
+        self._pruned_day = None
+        self.stats = {'calls': 0, 'errors': 0, 'estimated_calls': 0, 'budget_denied': 0, 'budget_downgraded': 0,
+                      'flushes': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                day TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                model TEXT NOT NULL,
+                caller TEXT NOT NULL,
+                calls INTEGER NOT NULL DEFAULT 0,
+                errors INTEGER NOT NULL DEFAULT 0,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                latency_ms REAL NOT NULL DEFAULT 0,
+                cost_usd REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, user_id, endpoint, model, caller)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_budgets (
+                user_id TEXT PRIMARY KEY,
+                daily_tokens INTEGER NOT NULL
+            )
+        """)
+        return conn
+
+    def _load_budgets(self) -> Dict[str, int]:
+        return dict(self._conn.execute("SELECT user_id, daily_tokens FROM llm_budgets").fetchall())
+
+    def reopen(self) -> None:
+        """Open a fresh connection in a forked worker (SQLite handles must not cross fork)"""
+        self._lock = threading.Lock()
+        self._pending, self._pending_calls = {}, 0  # The master's unflushed usage is flushed by the master
+        self._used_today, self._used_day = {}, None
+        self._conn = self._connect()
+        self._budgets = self._load_budgets()
+
+    def record(self, user_id: Optional[str], endpoint: str, model: str, caller: str, prompt_tokens: int,
+               completion_tokens: int, latency: float, error: bool = False) -> None:
+        """Add one call to the day's aggregates (written to SQLite by flush)"""
+        day = utc_day()
+        user_id = user_id or ''
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            counters = self._pending.setdefault((day, user_id, endpoint, model, caller), [0, 0, 0, 0, 0.0, 0.0])
+            counters[0] += 1
+            counters[1] += int(error)
+            counters[2] += prompt_tokens
+            counters[3] += completion_tokens
+            counters[4] += latency * 1000
+            counters[5] += cost
+            self._pending_calls += 1
+            if self._used_day == day and user_id in self._used_today:
+                self._used_today[user_id] += prompt_tokens + completion_tokens
+            self.stats['calls'] += 1
+            if error:
+                self.stats['errors'] += 1
+            flush_now = self._pending_calls >= self.flush_calls
+        LLM_TOKENS.inc(endpoint, model, 'prompt', amount=prompt_tokens)
+        LLM_TOKENS.inc(endpoint, model, 'completion', amount=completion_tokens)
+        if flush_now:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write the pending aggregates in one transaction and re-read budget overrides set by
+        other workers; returns the number of rows written"""
+        with self._lock:
+            pending, self._pending, self._pending_calls = self._pending, {}, 0
+            if pending:
+                try:
+                    self._conn.execute('BEGIN')
+                    self._conn.executemany("""
+                        INSERT INTO llm_usage (day, user_id, endpoint, model, caller, calls, errors,
+                                               prompt_tokens, completion_tokens, latency_ms, cost_usd)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (day, user_id, endpoint, model, caller) DO UPDATE SET
+                            calls = calls + excluded.calls,
+                            errors = errors + excluded.errors,
+                            prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                            completion_tokens = completion_tokens + excluded.completion_tokens,
+                            latency_ms = latency_ms + excluded.latency_ms,
+                            cost_usd = cost_usd + excluded.cost_usd
+                    """, [key + tuple(counters) for key, counters in pending.items()])
+                    self._conn.execute('COMMIT')
+                except Exception:
+                    if self._conn.in_transaction:
+                        self._conn.execute('ROLLBACK')
+                    self._merge_pending(pending)  # Keep the usage for the next flush
+                    raise
+                self.stats['flushes'] += 1
+            self._budgets = self._load_budgets()
+            today = utc_day()
+            if self._pruned_day != today:
+                self._pruned_day = today
+                self._prune(today)
+        return len(pending)
+
+    def _merge_pending(self, pending: Dict[UsageKey, List[float]]) -> None:
+        """Put back aggregates that could not be written (caller holds the lock)"""
+        for key, counters in pending.items():
+            current = self._pending.setdefault(key, [0, 0, 0, 0, 0.0, 0.0])
+            for index, value in enumerate(counters):
+                current[index] += value
+            self._pending_calls += int(counters[0])
+
+    def _prune(self, today: str) -> None:
+        """Drop aggregates past the retention window (caller holds the lock)"""
+        cutoff = utc_day(time.time() - LLM_USAGE_RETENTION_DAYS * 86400)
+        if cutoff < today:
+            self._conn.execute("DELETE FROM llm_usage WHERE day < ?", (cutoff,))
+
+    def set_budget(self, user_id: str, daily_tokens: Optional[int]) -> None:
+        """Override the default daily budget for a user (0 means unlimited, None restores the default)"""
+        with self._lock:
+            if daily_tokens is None:
+                self._conn.execute("DELETE FROM llm_budgets WHERE user_id = ?", (user_id,))
+                self._budgets.pop(user_id, None)
+            else:
+                self._conn.execute("INSERT OR REPLACE INTO llm_budgets (user_id, daily_tokens) VALUES (?, ?)",
+                                   (user_id, int(daily_tokens)))
+                self._budgets[user_id] = int(daily_tokens)
+            self._used_today.pop(user_id, None)  # Re-read, other workers' usage included
+
+    def budget_for(self, user_id: Optional[str]) -> int:
+        """Daily token budget for a user, 0 when unlimited"""
+        if not user_id:
+            return 0
+        return self._budgets.get(user_id, self.daily_token_budget)
+
+    def tokens_today(self, user_id: str) -> int:
+        """Tokens the user has used today: read once per day, then kept as a running total"""
+        day = utc_day()
+        with self._lock:
+            if self._used_day != day:
+                self._used_today, self._used_day = {}, day
+            used = self._used_today.get(user_id)
+            if used is None:
+                row = self._conn.execute(
+                    "SELECT COALESCE(SUM(prompt_tokens + completion_tokens), 0) FROM llm_usage "
+                    "WHERE day = ? AND user_id = ?", (day, user_id)
+                ).fetchone()
+                used = row[0] + sum(counters[2] + counters[3] for key, counters in self._pending.items()
+                                    if key[0] == day and key[1] == user_id)
+                self._used_today[user_id] = used
+        return used
+
+    def over_budget(self, user_id: Optional[str]) -> bool:
+        budget = self.budget_for(user_id)
+        return bool(budget) and self.tokens_today(user_id) >= budget
+
+    def user_usage(self, user_id: str, day: Optional[str] = None) -> Dict:
+        """A user's usage for one day, broken down by endpoint, model and caller"""
+        day = day or utc_day()
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT endpoint, model, caller, calls, errors, prompt_tokens, completion_tokens, latency_ms, cost_usd
+                FROM llm_usage WHERE day = ? AND user_id = ? ORDER BY endpoint, caller
+            """, (day, user_id)).fetchall()
+        breakdown = [self._row_dict(row[:3], row[3:]) for row in rows]
+        budget = self.budget_for(user_id)
+        used = sum(entry['prompt_tokens'] + entry['completion_tokens'] for entry in breakdown)
+        return {
+            'user_id': user_id,
+            'day': day,
+            'total_tokens': used,
+            'cost_usd': round(sum(entry['cost_usd'] for entry in breakdown), 6),
+            'daily_token_budget': budget or None,
+            'over_budget': bool(budget) and used >= budget,
+            'breakdown': breakdown
+        }
+
+    def summary(self, day: Optional[str] = None, top_users: int = 10) -> Dict:
+        """Usage across all users for one day: per endpoint, model and caller, plus the heaviest users"""
+        day = day or utc_day()
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT endpoint, model, caller, SUM(calls), SUM(errors), SUM(prompt_tokens), SUM(completion_tokens),
+                       SUM(latency_ms), SUM(cost_usd)
+                FROM llm_usage WHERE day = ? GROUP BY endpoint, model, caller ORDER BY endpoint, caller
+            """, (day,)).fetchall()
+            users = self._conn.execute("""
+                SELECT user_id, SUM(prompt_tokens + completion_tokens) AS tokens, SUM(cost_usd)
+                FROM llm_usage WHERE day = ? AND user_id != '' GROUP BY user_id ORDER BY tokens DESC LIMIT ?
+            """, (day, top_users)).fetchall()
+        breakdown = [self._row_dict(row[:3], row[3:]) for row in rows]
+        return {
+            'day': day,
+            'calls': sum(entry['calls'] for entry in breakdown),
+            'total_tokens': sum(entry['prompt_tokens'] + entry['completion_tokens'] for entry in breakdown),
+            'cost_usd': round(sum(entry['cost_usd'] for entry in breakdown), 6),
+            'breakdown': breakdown,
+            'top_users': [{'user_id': user_id, 'tokens': tokens, 'cost_usd': round(cost, 6)}
+                          for user_id, tokens, cost in users],
+            'daily_token_budget': self.daily_token_budget or None,
+            'process_stats': dict(self.stats)
+        }
+
+    @staticmethod
+    def _row_dict(keys: Tuple, values: Tuple) -> Dict:
+        endpoint, model, caller = keys
+        calls, errors, prompt_tokens, completion_tokens, latency_ms, cost = values
+        return {
+            'endpoint': endpoint,
+            'model': model,
+            'caller': caller,
+            'calls': calls,
+            'errors': errors,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'avg_latency_ms': round(latency_ms / calls, 1) if calls else 0,
+            'cost_usd': round(cost, 6)
+        }
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+class AccountedLLM:
+    """Wraps a LangChain chat model: records every invoke and applies daily budgets"""
+
+    def __init__(self, llm, accountant: LLMAccountant, model: str, fallback_llm=None, fallback_model: str = ''):
+        self.llm = llm
+        self.accountant = accountant
+        self.model = model
+        self.fallback_llm = fallback_llm
+        self.fallback_model = fallback_model
+
+    def invoke(self, prompt, *args, **kwargs):
+        user_id, endpoint, default_caller = current_attribution()
+        caller = current_span_name() or default_caller or 'unknown'
+        llm, model = self.llm, self.model
+
+        if self.accountant.over_budget(user_id):
+            if caller not in BUDGET_EXEMPT_CALLERS:
+                self.accountant.stats['budget_denied'] += 1
+                FALLBACKS.inc('llm_budget')
+                raise LLMBudgetExceeded(f"daily LLM token budget exceeded for {caller}")
+            if self.fallback_llm is not None and caller == 'llm.chat_reply':
+                self.accountant.stats['budget_downgraded'] += 1
+                llm, model = self.fallback_llm, self.fallback_model
+
+        started = time.perf_counter()
+        try:
+            response = llm.invoke(prompt, *args, **kwargs)
+        except Exception:
+            self._record(user_id, endpoint, model, caller, estimate_tokens(_prompt_text(prompt)), 0,
+                         time.perf_counter() - started, error=True)
+            raise
+        prompt_tokens, completion_tokens, estimated = token_usage(prompt, response)
+        if estimated:
+            self.accountant.stats['estimated_calls'] += 1
+        self._record(user_id, endpoint, model, caller, prompt_tokens, completion_tokens, time.perf_counter() - started)
+        return response
+
+    def _record(self, *args, **kwargs) -> None:
+        # Accounting must never fail the LLM call it measures
+        try:
+            self.accountant.record(*args, **kwargs)
+        except Exception as e:
+            log.warning("⚠️ Could not record LLM usage", error=str(e))
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
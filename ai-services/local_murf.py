@@ -0,0 +1,68 @@
+"""Local in-process stand-in for the Murf client
+
+Mimics `Murf(...).text_to_speech.generate(...)` closely enough for the TTS
+service, job queue and quota handling to be exercised offline: it simulates
+latency, counts down a character quota and returns short silent WAV clips.
+
+Enable with MURF_BACKEND=local (no API key needed).
+"""
+
+import base64
+import io
+import os
+import threading
+import time
+import wave
+from types import SimpleNamespace
+
+from murf.core.api_error import ApiError
+
+LOCAL_MURF_QUOTA = int(os.environ.get('LOCAL_MURF_QUOTA', 100000))
+LOCAL_MURF_LATENCY = float(os.environ.get('LOCAL_MURF_LATENCY', 0.8))  # Seconds per request
+LOCAL_MURF_CHARS_PER_SECOND = 15  # Rough speaking rate used for audio length
+LOCAL_MURF_SAMPLE_RATE = 8000
+
+def _silent_wav(seconds: float) -> bytes:
+    """A silent 8-bit mono WAV clip of the given length"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(1)
+        wav.setframerate(LOCAL_MURF_SAMPLE_RATE)
+        wav.writeframes(b'\x80' * int(seconds * LOCAL_MURF_SAMPLE_RATE))
+    return buffer.getvalue()
+
+class _LocalTextToSpeech:
+    def __init__(self, quota: int, latency: float):
+        self.remaining = quota
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def generate(self, text: str, voice_id: str, format: str = "MP3", sample_rate: float = 44100.0, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            if len(text) > self.remaining:
+                raise ApiError(status_code=402, body={'errorMessage': 'Character quota exhausted',
+                                                      'remaining_character_count': self.remaining})
+            self.remaining -= len(text)
+            remaining = self.remaining
+
+        seconds = max(len(text) / LOCAL_MURF_CHARS_PER_SECOND, 0.5)
+        audio = base64.b64encode(_silent_wav(seconds)).decode('ascii')
+        return SimpleNamespace(
+            audio_file=f"data:audio/wav;base64,{audio}",
+            audio_length_in_seconds=round(seconds, 2),
+            consumed_character_count=len(text),
+            remaining_character_count=remaining,
+            encoded_audio=None,
+            warning=None,
+            word_durations=None
+        )
+
+class LocalMurf:
+    """Drop-in replacement for the `murf.Murf` client"""
+
+    def __init__(self, quota: int = LOCAL_MURF_QUOTA, latency: float = LOCAL_MURF_LATENCY):
+        self.text_to_speech = _LocalTextToSpeech(quota, latency)
@@ -1,4 +1,8 @@
 import sys
+import atexit
+import functools
+import gc
+import hmac
 import json
 import os
 from dotenv import load_dotenv
@@ -8,47 +12,62 @@ import time
 import numpy as np
 import pickle
 from datetime import datetime, timedelta
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, request, jsonify, g, send_file
 from flask_cors import CORS
 from flask_session import Session
 from systemprompt import PROMPT
+from static_responses import (
+    PROACTIVE_STARTERS, PROACTIVE_FALLBACK_MESSAGES,
+    CHAT_FALLBACK_RESPONSES, CHAT_ERROR_FALLBACK_RESPONSES
+)
 from context_prompts import get_context_prompt, get_available_contexts
 from context_generator import generate_user_context, analyze_risk_level, get_context_with_preferences
 from crisis_detection import analyze_crisis_indicators, generate_therapist_context, get_crisis_resources
 from care_agent import AICareAgent
+from care_agent_store import CareAgentStore
+from activity_catalog import ActivityCatalog
+from background_jobs import start_periodic_job, start_background_task
+from proactive_queue import ProactiveMessageQueue, ProactiveUpgradeChannel
+from components import registry as component_registry
+from metrics import (registry as metrics_registry, stage, stage_timings, observe_request, stats_callback,
+                     FALLBACKS, PROACTIVE_TEMPLATES, RATE_LIMITED, CACHE_REQUESTS, MEMORY_EVICTIONS)
+from tracing import (span, start_trace, finish_trace, current_trace_id, new_trace_id, slow_traces,
+                     export_slow_traces, stats as trace_stats, TRACE_SLOW_MS)
+from embedding_server import RemoteEmbeddingModel, EMBEDDING_SERVER_SOCKET
+import profiling
+import traffic_capture
+from memory_accounting import MemoryAccountant, MEMORY_REPORT_TTL
+from llm_accounting import (LLMAccountant, AccountedLLM, LLMBudgetExceeded, attributed, LLM_BUDGET_FALLBACK_MODEL,
+                            LLM_USAGE_FLUSH_INTERVAL,
+                            bind as bind_llm_usage, unbind as unbind_llm_usage)
+from service_logging import get_logger
 import requests
 import time
 from datetime import datetime, timedelta
-import traceback
+
+log = get_logger(__name__)
 
 # Load environment variables from multiple possible locations
 load_dotenv()  # Load from current directory
 load_dotenv(dotenv_path='../.env')  # Load from parent directory (global .env)
 
-# Debug: Print environment variable status
-print("=== Environment Variable Debug ===")
-print(f"Current working directory: {os.getcwd()}")
-print(f"GEMINI_API_KEY configured: {bool(os.environ.get('GEMINI_API_KEY'))}")
-print(f"MURF_API_KEY configured: {bool(os.environ.get('MURF_API_KEY'))}")
-if os.environ.get('MURF_API_KEY'):
-    # Only show first 10 characters for security
-    murf_key = os.environ.get('MURF_API_KEY', '')
-    print(f"MURF_API_KEY value (first 10 chars): {murf_key[:10]}...")
-else:
-    print("MURF_API_KEY: Not found!")
-print("==================================")
+log.info("Environment loaded", cwd=os.getcwd(),
+         gemini_api_key_configured=bool(os.environ.get('GEMINI_API_KEY')),
+         murf_api_key_configured=bool(os.environ.get('MURF_API_KEY')))
 
 # Import TTS service after environment variables are loaded
 try:
     from murf_tts_service import MurfTTSService
+    from tts_cache import TTSCache
+    from audio_store import AudioStore
+    from tts_warmup import TTSWarmup
+    from tts_chunking import ChunkedSynthesizer, split_into_chunks
+    from tts_jobs import SpeechJobRegistry, PRIORITIES
+    from tts_backends import TTSRouter, MurfBackend, LocalEngineBackend
     MURF_AVAILABLE = True
 except ImportError as e:
-    print(f"Warning: Murf TTS not available - {e}")
-    print("Please install: pip install murf==2.1.0")
+    log.warning("Murf TTS not available, please install: pip install murf==2.1.0", error=str(e))
     MurfTTSService = None
     MURF_AVAILABLE = False
 
@@ -70,6 +89,41 @@ ANALYSIS_CACHE_TIME = 300  # 5 minutes
 CLEANUP_INTERVAL = 86400 * 7  # 7 days
 RATE_LIMIT_INTERVAL = 2  # 2 seconds between messages (reduced from 60s to allow natural conversation)
 SESSION_CHECK_INTERVAL = 3600  # 1 hour between session checks
+CONVERSATION_HISTORY_LIMIT = 20  # Messages kept per user for prompt context
+DEFAULT_TTS_VOICE = "en-US-natalie"
+TTS_MAX_CHARS = 1000  # Single-shot synthesis limit
+TTS_CHUNKED_MAX_CHARS = 5000  # Chunked synthesis limit
+SPEECH_JOB_MAX_WAIT = 30  # Longest a speech job status poll may block waiting for audio
+TTS_SYNC_WAIT = 60  # Longest /generate_speech waits for its queued job
+AUDIO_CACHE_MAX_AGE = 86400 * 365  # Stored audio is immutable
+TTS_WARMUP_ON_START = os.environ.get('TTS_WARMUP_ON_START', 'true').lower() == 'true'
+# Repeat the warm-up well within the 71 h life of cached Murf URLs; 0 runs it once at start
+TTS_WARMUP_INTERVAL = int(os.environ.get('TTS_WARMUP_INTERVAL', 86400))
+INSIGHT_REPORT_WARM_INTERVAL = int(os.environ.get('INSIGHT_REPORT_WARM_INTERVAL', 86400 * 7))  # Weekly, 0 disables
+# First warm-up soon after start, so a restart does not postpone it by a full interval
+INSIGHT_REPORT_WARM_DELAY = int(os.environ.get('INSIGHT_REPORT_WARM_DELAY', 300))
+ACTIVE_USER_WINDOW = 86400 * 7  # Users seen in the last 7 days count as active
+PROACTIVE_IDLE_SECONDS = int(os.environ.get('PROACTIVE_IDLE_SECONDS', 900))  # Precompute after 15 minutes idle
+PROACTIVE_IDLE_SCAN_INTERVAL = int(os.environ.get('PROACTIVE_IDLE_SCAN_INTERVAL', 60))  # 0 disables
+PROACTIVE_UPGRADE_TIMEOUT = 30  # Seconds an upgrade stream waits for the personalized message
+MEMORY_BUDGET_MB = int(os.environ.get('MEMORY_BUDGET_MB', 0))  # Per-user data cap per process, 0 disables
+MEMORY_CHECK_INTERVAL = int(os.environ.get('MEMORY_CHECK_INTERVAL', 60))
+MEMORY_EVICTION_MIN_IDLE = 900  # Users active in the last 15 minutes are never evicted
+SSE_KEEPALIVE_INTERVAL = 10  # Seconds between keep-alive comments on event streams
+# Token for /debug/* and /llm_usage* (X-Admin-Token header); those endpoints are off while unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN') or profiling.PROFILE_ADMIN_TOKEN
+ADMIN_HEADER = 'X-Admin-Token'
+
+def admin_required(view):
+    """Restrict an admin endpoint to requests carrying ADMIN_TOKEN"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Admin endpoints are disabled, set ADMIN_TOKEN"}), 403
+        if not hmac.compare_digest(request.headers.get(ADMIN_HEADER, ''), ADMIN_TOKEN):
+            return jsonify({"error": f"Missing or invalid {ADMIN_HEADER} header"}), 401
+        return view(*args, **kwargs)
+    return wrapper
 
 # Custom middleware for session management and rate limiting
 @app.before_request
@@ -77,7 +131,8 @@ def pre_request_middleware():
     """Pre-request middleware for session checks and rate limiting"""
     try:
         # Skip middleware for specific endpoints
-        if request.endpoint in ['health', 'static']:
+        if request.endpoint in ['health', 'health_check', 'livez', 'readyz', 'metrics', 'debug_traces',
+                                'export_debug_traces', 'debug_profiles', 'debug_profile', 'debug_memory', 'static']:
             return None
         
         # 1. Session Restoration
@@ -94,9 +149,11 @@ def pre_request_middleware():
                 user_id = data.get('userId', 'anonymous')
                 
                 if rate_limit_check(user_id):
+                    RATE_LIMITED.inc('chat')
                     last_interaction = user_conversation_context.get(user_id, {}).get('last_interaction', 0)
                     time_since_last = time.time() - last_interaction
-                    print(f"⚠️ [RATE LIMIT] User {user_id} hit rate limit - {time_since_last:.2f}s since last message (limit: {RATE_LIMIT_INTERVAL}s)")
+                    log.info("⚠️ Rate limit hit", user_id=user_id, seconds_since_last=round(time_since_last, 2),
+                             limit_seconds=RATE_LIMIT_INTERVAL)
                     return jsonify({
                         'error': 'Rate limit exceeded',
                         'message': f'Please wait {RATE_LIMIT_INTERVAL - time_since_last:.1f} more seconds before sending another message',
@@ -105,7 +162,7 @@ def pre_request_middleware():
                     }), 429
                     
             except Exception as e:
-                print(f"Error in rate limiting: {e}")
+                log.error("Error in rate limiting", error=str(e))
                 # Continue processing if rate limit check fails
                 
         # 3. Database Session Check
@@ -114,7 +171,7 @@ def pre_request_middleware():
         return None
         
     except Exception as e:
-        print(f"Error in pre-request middleware: {e}")
+        log.error("Error in pre-request middleware", error=str(e))
         # Continue processing even if middleware fails
         return None
 
@@ -128,17 +185,17 @@ def check_and_restore_database_session():
             try:
                 restore_conversation_vectors()
             except Exception as e:
-                print(f"Could not restore conversation vectors: {e}")
+                log.warning("Could not restore conversation vectors", error=str(e))
         
         # Restore conversation context if needed
         if not user_conversation_context:
             try:
                 restore_conversation_context()
             except Exception as e:
-                print(f"Could not restore conversation context: {e}")
+                log.warning("Could not restore conversation context", error=str(e))
                 
     except Exception as e:
-        print(f"Error checking database session: {e}")
+        log.error("Error checking database session", error=str(e))
 
 def restore_conversation_vectors():
     """Restore conversation vectors from disk if available"""
@@ -153,10 +210,10 @@ def restore_conversation_vectors():
             with open('conversation_metadata.pkl', 'rb') as f:
                 conversation_metadata = pickle.load(f)
                 
-        print("✅ Restored conversation vectors and metadata")
+        log.info("✅ Restored conversation vectors and metadata")
         
     except Exception as e:
-        print(f"Error restoring conversation data: {e}")
+        log.error("Error restoring conversation data", error=str(e))
         conversation_vectors = {}
         conversation_metadata = {}
 
@@ -169,25 +226,81 @@ def restore_conversation_context():
             with open('conversation_context.pkl', 'rb') as f:
                 user_conversation_context = pickle.load(f)
                 
-        print("✅ Restored conversation context")
+        log.info("✅ Restored conversation context")
         
     except Exception as e:
-        print(f"Error restoring conversation context: {e}")
+        log.error("Error restoring conversation context", error=str(e))
         user_conversation_context = {}
 
 # Performance monitoring
 @app.before_request
 def start_timer():
     g.start = time.time()
+    # Callers may pass their own id to correlate traces across services
+    trace_id = request.headers.get('X-Trace-Id') or None
+    if trace_id and (len(trace_id) > 64 or not re.fullmatch(r"[A-Za-z0-9_.-]+", trace_id)):
+        trace_id = None
+    g.trace, g.trace_token = start_trace(request.endpoint or 'unknown', trace_id=trace_id,
+                                         method=request.method, path=request.path)
+    # Attribute LLM usage in this request to its user
+    payload = request.get_json(silent=True) if request.is_json else None
+    user_id = (payload.get('userId') if isinstance(payload, dict) else None) or request.args.get('userId')
+    g.llm_usage_token = bind_llm_usage(user_id, request.endpoint or 'unknown')
+    # Sampled, redacted capture of the request and its LLM responses for offline replay
+    if traffic_capture.should_capture(request.endpoint):
+        g.capture_token = traffic_capture.begin(request.endpoint, payload)
+    # Opt-in cProfile of this request (admin header or sampling); see profiling.py
+    reason = profiling.should_profile(request.headers)
+    if reason and request.endpoint not in ('debug_profiles', 'debug_profile'):
+        try:
+            profiler = profiling.start(reason)
+        except Exception as e:
+            log.warning("⚠️ Could not start request profiler", error=str(e))
+            profiler = None
+        if profiler is not None:
+            g.profiler = profiler
 
 @app.after_request
 def log_request(response):
-    if hasattr(g, 'start'):
-        elapsed = time.time() - g.start
-        endpoint = request.endpoint or 'unknown'
-        print(f"⏱️ {endpoint} completed in {elapsed:.2f}s")
+    endpoint = request.endpoint or 'unknown'
+    # Requests rejected by the middleware (rate limit) never reached start_timer
+    elapsed = time.time() - g.start if hasattr(g, 'start') else None
+    observe_request(endpoint, request.method, response.status_code, elapsed)
+    if elapsed is not None:
+        log.info("⏱️ Request completed", endpoint=endpoint, status=response.status_code, seconds=round(elapsed, 3))
+    if 'profiler' in g:
+        profile_id = profiling.finish(g.pop('profiler'), endpoint, g.trace.trace_id if 'trace' in g else None,
+                                      elapsed or 0.0, response.status_code)
+        if profile_id:
+            response.headers['X-Profile-Id'] = profile_id
+    if 'capture_token' in g:
+        traffic_capture.finish(g.pop('capture_token'), response.status_code,
+                               response.get_json(silent=True) if response.is_json else None)
+    if 'trace' in g:
+        response.headers['X-Trace-Id'] = g.trace.trace_id
+        trace, token = g.trace, g.trace_token
+        outcome = 'error' if response.status_code >= 500 else 'ok'
+        if response.is_streamed:
+            # Event streams run after this hook returns; close the trace when the body is done
+            g.trace_streamed = True
+            response.call_on_close(lambda: finish_trace(trace, token, outcome, status=response.status_code,
+                                                        streamed=True))
+        else:
+            finish_trace(trace, token, outcome, status=response.status_code)
     return response
 
+@app.teardown_request
+def finish_request_trace(error=None):
+    """Close the trace of a request that raised before after_request ran"""
+    if 'trace' in g and g.trace.duration is None and not g.get('trace_streamed'):
+        finish_trace(g.trace, g.trace_token, 'error', error=str(error) if error else None)
+    if 'llm_usage_token' in g:
+        unbind_llm_usage(g.pop('llm_usage_token'))
+    if 'profiler' in g:
+        profiling.stop(g.pop('profiler'))
+    if 'capture_token' in g:
+        traffic_capture.discard(g.pop('capture_token'))
+
 # Data management utilities
 def cleanup_user_data(user_id):
     """Clean up old user data"""
@@ -202,24 +315,29 @@ def cleanup_user_data(user_id):
             del conversation_vectors[user_id]
         if user_id in conversation_metadata:
             del conversation_metadata[user_id]
-        print(f"🧹 Cleaned up data for user {user_id}")
+        proactive_queue.forget(user_id)
+        if care_agent:
+            care_agent.forget_user(user_id)  # Durable state only; reloaded from its store on return
+        log.info("🧹 Cleaned up user data", user_id=user_id)
     except Exception as e:
-        print(f"Error cleaning up user data: {e}")
+        log.error("Error cleaning up user data", user_id=user_id, error=str(e))
 
 def cleanup_old_data():
     """Cleanup old user data periodically"""
     try:
         current_time = time.time()
         cleaned = 0
-        for user_id in list(user_conversations.keys()):
+        prune_analysis_cache(current_time)
+        # Users who only ever got proactive messages have a context but no conversation
+        for user_id in set(user_conversations) | set(user_conversation_context):
             last_interaction = user_conversation_context.get(user_id, {}).get('last_interaction', 0)
             if current_time - last_interaction > CLEANUP_INTERVAL:
                 cleanup_user_data(user_id)
                 cleaned += 1
         if cleaned > 0:
-            print(f"🧹 Cleaned up data for {cleaned} inactive users")
+            log.info("🧹 Cleaned up inactive users", users=cleaned)
     except Exception as e:
-        print(f"Error in cleanup: {e}")
+        log.error("Error in cleanup", error=str(e))
 
 def validate_response_format(response_data):
     """Validate and normalize response format"""
@@ -241,55 +359,186 @@ def validate_response_format(response_data):
     return response_data
 
 # Analysis caching
-analysis_cache = {}
+analysis_cache = {}  # Insertion ordered, so the oldest entries come first
 ANALYSIS_CACHE_TIME = 300  # 5 minutes
+ANALYSIS_CACHE_MAX_ENTRIES = 10000
 CLEANUP_INTERVAL = 86400 * 7  # 7 days
 RATE_LIMIT_INTERVAL = 2  # 2 seconds between messages (reduced from 60s to allow natural conversation)
 
-# Initialize AI components with simpler approach
+# Heavy AI components are loaded on a background thread (see components.py) so the
+# server binds immediately; until they are ready the existing fallbacks apply
 geminiLlm = None
+embedding_model = None
+care_agent = None
+COMPONENT_WAIT_TIMEOUT = 10  # Seconds a request waits for the LLM while the service is starting
+EMBEDDING_SERVER_WAIT = 120  # Seconds to wait for the embedding sidecar to finish loading its model
+PREFORK_MODE = os.environ.get('MINDCARE_PREFORK') == '1'  # Set by gunicorn.conf.py when the app is preloaded
+TORCH_THREADS_PER_WORKER = int(os.environ.get('TORCH_THREADS_PER_WORKER', 1))
+GEMINI_MODEL = "gemini-2.0-flash"  # Using stable model
+# Alternative Gemini API host, e.g. http://127.0.0.1:8089 for benchmarks/standin_server.py
+GEMINI_API_ENDPOINT = os.environ.get('GEMINI_API_ENDPOINT', '')
+
+# Token usage per user, endpoint and model, shared by all workers (see llm_accounting.py)
 try:
-    # Check if GEMINI_API_KEY is configured
-    if os.environ.get("GEMINI_API_KEY"):
-        geminiLlm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",  # Using stable model
-            temperature=0.7,
-            convert_system_message_to_human=False  # Disable deprecating feature
-        )
-        
-        print("✅ Gemini LLM initialized successfully")
-    else:
-        print("⚠️ Warning: GEMINI_API_KEY not configured, LLM features will be limited")
+    llm_accountant = LLMAccountant()
+    atexit.register(llm_accountant.flush)  # Usage aggregated since the last periodic flush
 except Exception as e:
-    print(f"⚠️ Warning: Could not initialize Gemini LLM: {e}")
-    geminiLlm = None
+    log.warning("⚠️ Could not open LLM usage store, token usage will not be recorded", error=str(e))
+    llm_accountant = None
 
-# Initialize embedding model for vector similarity
-try:
+def load_gemini_llm():
+    """Create the Gemini chat model (None when GEMINI_API_KEY is not configured)"""
+    global geminiLlm
+    if not os.environ.get("GEMINI_API_KEY"):
+        log.warning("⚠️ GEMINI_API_KEY not configured, LLM features will be limited")
+        return None
+    
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    # The gRPC transport cannot reach a plain-HTTP stand-in, so an endpoint override uses REST
+    endpoint_options = {'transport': 'rest', 'client_options': {'api_endpoint': GEMINI_API_ENDPOINT}} \
+        if GEMINI_API_ENDPOINT else {}
+    llm = ChatGoogleGenerativeAI(
+        model=GEMINI_MODEL,
+        temperature=0.7,
+        convert_system_message_to_human=False,  # Disable deprecating feature
+        **endpoint_options
+    )
+    if llm_accountant:
+        # Cheaper model for chat replies of users over their daily token budget
+        fallback_llm = ChatGoogleGenerativeAI(
+            model=LLM_BUDGET_FALLBACK_MODEL,
+            temperature=0.7,
+            convert_system_message_to_human=False,
+            **endpoint_options
+        ) if LLM_BUDGET_FALLBACK_MODEL else None
+        llm = AccountedLLM(llm, llm_accountant, GEMINI_MODEL, fallback_llm, LLM_BUDGET_FALLBACK_MODEL)
+    if traffic_capture.TRAFFIC_CAPTURE_RATE > 0:
+        llm = traffic_capture.CapturingLLM(llm)  # Records responses for sampled requests (see traffic_capture.py)
+    geminiLlm = llm
+    log.info("✅ Gemini LLM initialized", model=GEMINI_MODEL, accounting=bool(llm_accountant),
+             endpoint=GEMINI_API_ENDPOINT or None)
+    return geminiLlm
+
+def llm_budget_exceeded(user_id):
+    """Whether the user has used up their daily LLM token budget (optional LLM calls are skipped)"""
+    if not llm_accountant:
+        return False
+    try:
+        exceeded = llm_accountant.over_budget(user_id)
+    except Exception as e:
+        log.warning("⚠️ Could not check LLM budget", user_id=user_id, error=str(e))
+        return False
+    if exceeded:
+        FALLBACKS.inc('llm_budget')
+    return exceeded
+
+def load_embedding_model():
+    """Load the sentence embedding model for vector similarity"""
+    global embedding_model
+    if EMBEDDING_SERVER_SOCKET:
+        # A shared sidecar owns the model, so this worker never loads torch
+        remote_model = RemoteEmbeddingModel(EMBEDDING_SERVER_SOCKET)
+        server_info = remote_model.wait_until_ready(EMBEDDING_SERVER_WAIT)
+        embedding_model = remote_model
+        log.info("Using shared embedding server", socket=EMBEDDING_SERVER_SOCKET, model=server_info['model'])
+        return embedding_model
+    
+    from sentence_transformers import SentenceTransformer
     embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    log.info("Embedding model initialized")
+    return embedding_model
+
+def load_care_agent():
+    """Build the AI Care Agent once the LLM and embedding model are available"""
+    global care_agent
+    llm = component_registry.get('llm', timeout=None)
+    model = component_registry.get('embedding_model', timeout=None)
+    if model is None:
+        raise RuntimeError("embedding model not available")
     
     try:
-        care_agent = AICareAgent(llm=geminiLlm, embedding_model=embedding_model)
-        print("✅ AI Care Agent initialized successfully")
+        care_agent_store = CareAgentStore(os.environ.get('CARE_AGENT_DB_PATH', 'care_agent_state.db'))
     except Exception as e:
-        print(f"⚠️ Warning: Could not initialize AI Care Agent: {e}")
-        care_agent = None
-    print("Embedding model initialized successfully")
-except Exception as e:
-    print(f"Warning: Could not initialize embedding model: {e}")
-    embedding_model = None
+        log.warning("⚠️ Could not open care agent state store, state will not persist", error=str(e))
+        care_agent_store = None
+    try:
+        activity_catalog = ActivityCatalog(model)
+    except Exception as e:
+        log.warning("⚠️ Could not load wellness activity catalog, activities will be LLM-generated", error=str(e))
+        activity_catalog = None
+    care_agent = AICareAgent(
+        llm=llm,
+        embedding_model=model,
+        store=care_agent_store,
+        activity_catalog=activity_catalog
+    )
+    log.info("✅ AI Care Agent initialized")
+    return care_agent
+
+component_registry.register('llm', load_gemini_llm)
+component_registry.register('embedding_model', load_embedding_model)
+component_registry.register('care_agent', load_care_agent)
 
 # Initialize Murf TTS service
 if MURF_AVAILABLE:
     try:
-        murf_tts_service = MurfTTSService()
-        print("Murf TTS service initialized successfully")
+        try:
+            tts_cache = TTSCache()
+        except Exception as e:
+            log.warning("Could not initialize TTS cache, every request will call Murf", error=str(e))
+            tts_cache = None
+        try:
+            audio_store = AudioStore()
+        except Exception as e:
+            log.warning("Could not initialize audio store, serving Murf URLs directly", error=str(e))
+            audio_store = None
+        murf_tts_service = MurfTTSService(cache=tts_cache, audio_store=audio_store)
+        # Murf first, on-box engine when Murf is slow, failing, out of quota or unconfigured
+        tts_router = TTSRouter([MurfBackend(murf_tts_service), LocalEngineBackend()])
+        speech_jobs = SpeechJobRegistry(tts_router)
+        chunked_synthesizer = ChunkedSynthesizer(speech_jobs)
+        log.info("Murf TTS service initialized")
     except Exception as e:
-        print(f"Warning: Could not initialize Murf TTS service: {e}")
+        log.warning("Could not initialize Murf TTS service", error=str(e))
         murf_tts_service = None
+        tts_cache = None
+        audio_store = None
+        tts_router = None
+        chunked_synthesizer = None
+        speech_jobs = None
 else:
-    print("Murf TTS service not available - please install murf package")
+    log.warning("Murf TTS service not available - please install murf package")
     murf_tts_service = None
+    tts_cache = None
+    audio_store = None
+    tts_router = None
+    chunked_synthesizer = None
+    speech_jobs = None
+
+# Pre-synthesizes static replies into the TTS cache
+tts_warmup = None
+
+def get_active_user_ids(window_seconds=ACTIVE_USER_WINDOW):
+    """Users who interacted within the given window"""
+    cutoff = time.time() - window_seconds
+    return [
+        user_id for user_id, ctx in list(user_conversation_context.items())
+        if ctx.get('last_interaction', 0) >= cutoff
+    ]
+
+def warm_insight_reports():
+    """Pre-generate weekly insight reports for active users"""
+    if not care_agent:
+        return
+    active_users = get_active_user_ids()
+    warmed = care_agent.warm_insight_reports(active_users)
+    log.info("📊 Warmed insight reports", warmed=warmed, active_users=len(active_users))
+
+def build_activity_index():
+    """Build the wellness activity embedding index if no current one exists (requests never build it)"""
+    agent = component_registry.get('care_agent', timeout=None)
+    if agent and agent.activity_catalog is not None:
+        agent.activity_catalog.ensure_index()
 
 # Global conversation history per user (simplified approach)
 user_conversations = {}
@@ -302,30 +551,52 @@ user_emotional_states = {}
 conversation_vectors = {}
 conversation_metadata = {}
 
-# Proactive conversation starters based on emotional context - DEPRECATED
-# These are now replaced by LLM-generated responses based on vector context
-PROACTIVE_STARTERS = {
-    'first_time': [
-        "नमस्ते! Welcome to MindCare. I'm here to listen and support you. How has your heart been feeling today?",
-        "Hello! I'm so glad you're here. Sometimes it takes courage to reach out. What's been on your mind lately?",
-        "Welcome! I'm here to create a safe space for you. Would you like to share what brought you here today?"
-    ],
-    'returning_positive': [
-        "It's wonderful to see you again! How are you feeling since our last conversation?",
-        "Welcome back! I've been thinking about our previous chat. How have things been unfolding for you?",
-        "Good to see you here again. What emotions have been visiting you since we last talked?"
-    ],
-    'returning_concerned': [
-        "I'm glad you came back. I was thinking about what you shared before. How are you processing everything?",
-        "It's really good that you're here again. How has your heart been since our last conversation?",
-        "I'm here for you. After what you shared last time, I wanted to check in - how are you feeling right now?"
-    ],
-    'check_in': [
-        "How are you feeling in this moment? Sometimes it helps to pause and notice what's happening inside.",
-        "I'd love to hear what's been in your heart lately. What emotions have been present for you?",
-        "Take a breath with me. What's been weighing on your mind or bringing you joy recently?"
-    ]
-}
+def last_interaction_of(user_id):
+    return user_conversation_context.get(user_id, {}).get('last_interaction', 0)
+
+# Bytes held per user across the in-memory structures (see memory_accounting.py). A user's
+# sizes are re-measured only when they have interacted, a turn was written (add_to_conversation)
+# or their care agent state changed since the last report.
+memory_accountant = MemoryAccountant(
+    version_of=lambda user_id: (last_interaction_of(user_id), care_agent.state_version(user_id) if care_agent else 0)
+)
+memory_accountant.register_per_user('user_conversations', lambda: user_conversations)
+memory_accountant.register_per_user('user_conversation_context', lambda: user_conversation_context)
+memory_accountant.register_per_user('user_emotional_states', lambda: user_emotional_states)
+memory_accountant.register_per_user('conversation_vectors', lambda: conversation_vectors)
+memory_accountant.register_per_user('conversation_metadata', lambda: conversation_metadata)
+memory_accountant.register_per_user('care_agent.user_patterns', lambda: care_agent.user_patterns if care_agent else {})
+memory_accountant.register_per_user('care_agent.intervention_history',
+                                    lambda: care_agent.intervention_history if care_agent else {})
+memory_accountant.register_per_user('care_agent.risk_trends', lambda: care_agent.risk_trends if care_agent else {})
+memory_accountant.register_per_user('care_agent.insight_reports', lambda: care_agent.insight_reports if care_agent else {})
+memory_accountant.register_shared('analysis_cache', lambda: analysis_cache)
+
+def enforce_memory_budget():
+    """Evict the least recently active users while tracked per-user data exceeds MEMORY_BUDGET_MB"""
+    if not MEMORY_BUDGET_MB:
+        return 0
+    budget = MEMORY_BUDGET_MB * 1024 * 1024
+    tracked, users = memory_accountant.user_bytes(max_age=0)
+    if tracked <= budget:
+        return 0
+    
+    # Evict down to 90% of the budget so the next check does not evict again straight away
+    target = budget * 0.9
+    now = time.time()
+    evicted = 0
+    for entry in sorted(users, key=lambda entry: last_interaction_of(entry['user_id'])):
+        if tracked <= target or now - last_interaction_of(entry['user_id']) < MEMORY_EVICTION_MIN_IDLE:
+            break
+        cleanup_user_data(entry['user_id'])
+        tracked -= entry['bytes']
+        evicted += 1
+    
+    memory_accountant.invalidate()
+    MEMORY_EVICTIONS.inc(amount=evicted)
+    log.warning("🧹 Memory budget exceeded, evicted least recently active users", evicted=evicted,
+                tracked_mb=round(tracked / 1024 / 1024, 1), budget_mb=MEMORY_BUDGET_MB)
+    return evicted
 
 def store_conversation_vector(user_id, message_text, ai_response, emotions, timestamp):
     """Store conversation in vector database for future context retrieval"""
@@ -366,7 +637,7 @@ def store_conversation_vector(user_id, message_text, ai_response, emotions, time
             del conversation_metadata[user_id][oldest_key]
             
     except Exception as e:
-        print(f"Error storing conversation vector: {e}")
+        log.error("Error storing conversation vector", error=str(e))
 
 def find_similar_conversations(user_id, query_text, top_k=3):
     """Find similar past conversations using vector similarity"""
@@ -386,8 +657,10 @@ def find_similar_conversations(user_id, query_text, top_k=3):
         
         # Calculate similarities
         similarities = []
+        query_norm = np.linalg.norm(query_embedding)
         for conv_key, conv_embedding in user_vectors.items():
-            similarity = cosine_similarity([query_embedding], [conv_embedding])[0][0]
+            denominator = query_norm * np.linalg.norm(conv_embedding)
+            similarity = float(np.dot(query_embedding, conv_embedding) / denominator) if denominator else 0.0
             similarities.append((conv_key, similarity, user_metadata[conv_key]))
         
         # Sort by similarity and return top k
@@ -396,14 +669,27 @@ def find_similar_conversations(user_id, query_text, top_k=3):
         return similarities[:top_k]
         
     except Exception as e:
-        print(f"Error finding similar conversations: {e}")
+        log.error("Error finding similar conversations", error=str(e))
         return []
 
 def generate_proactive_message_with_context(user_id, context_type, support_context='general'):
     """Generate intelligent proactive message using LLM and conversation context"""
-    if not geminiLlm:
-        # Fallback to simple proactive starters if LLM unavailable
-        return generate_fallback_proactive_message(context_type, support_context)
+    try:
+        message = generate_personalized_proactive_message(user_id, context_type, support_context)
+    except Exception as e:
+        log.error("Error generating proactive message with context", user_id=user_id, error=str(e))
+        message = None
+    # Fallback to simple proactive starters if LLM unavailable or the user's token budget is spent
+    return message or generate_fallback_proactive_message(context_type, support_context)
+
+def generate_personalized_proactive_message(user_id, context_type, support_context='general'):
+    """LLM proactive message, or None when the LLM is unavailable or the user's token budget is spent.
+
+    Raises when the LLM call fails. Background generation uses this directly, so a template is
+    never stored or pushed as if it were personalized, and failures reach the retry backoff.
+    """
+    if not geminiLlm or llm_budget_exceeded(user_id):
+        return None
     
     try:
         # Get recent conversation history
@@ -519,7 +805,10 @@ Generate only the proactive message, nothing else:
 """
         
         # Generate the proactive message
-        response = geminiLlm.invoke(context_prompt_text)
+        # Also runs on the proactive queue's threads, outside any request
+        with attributed(user_id, caller='llm.proactive_message'), \
+                span('llm.proactive_message', prompt_chars=len(context_prompt_text)):
+            response = geminiLlm.invoke(context_prompt_text)
         
         if hasattr(response, 'content'):
             proactive_message = response.content.strip()
@@ -529,38 +818,31 @@ Generate only the proactive message, nothing else:
         # Clean up the response
         proactive_message = proactive_message.replace('"', '').replace("'", "'")
         
-        return proactive_message
+        return proactive_message or None
         
-    except Exception as e:
-        print(f"Error generating proactive message with context: {e}")
-        return generate_fallback_proactive_message(context_type, support_context)
+    except LLMBudgetExceeded:
+        return None  # Budget spent since the check above
 
 def generate_fallback_proactive_message(context_type, support_context='general'):
     """Generate fallback proactive message when LLM is unavailable"""
-    fallback_messages = {
-        'general': {
-            'first_time': "नमस्ते! Welcome to MindCare. I'm here to listen and support you. How are you feeling today? 🌟",
-            'returning_positive': "It's wonderful to see you again! How have you been since we last talked? 💙",
-            'returning_concerned': "I'm glad you're here. I've been thinking about you - how are you feeling right now? 🤗",
-            'check_in': "How is your heart today? I'm here if you'd like to share what's on your mind. ✨"
-        },
-        'academic': {
-            'first_time': "नमस्ते! Welcome to Academic Support. I understand the unique pressures students face - how has your academic journey been feeling lately? 📚✨",
-            'returning_positive': "Great to see you back! How have your studies been progressing since we last talked? 🌟",
-            'returning_concerned': "I'm here for you. Academic pressure can be overwhelming - how are you managing your studies and stress right now? 💙",
-            'check_in': "How is your academic life treating you today? Any study stress or career thoughts you'd like to share? 📖"
-        },
-        'family': {
-            'first_time': "नमस्ते! Welcome to Family Support. I know family relationships can be complex - how has your दिल (heart) been with family matters? 🏠💙",
-            'returning_positive': "Good to see you again! How have things been with your family since our last conversation? 🌸",
-            'returning_concerned': "I'm glad you're back. Family situations can be challenging - how are you feeling about things at home? 🤗",
-            'check_in': "How are things in your family world today? Any relationship dynamics you'd like to talk through? 💕"
-        }
-    }
-    
-    context_messages = fallback_messages.get(support_context, fallback_messages['general'])
+    FALLBACKS.inc('proactive_template')
+    return proactive_template_message(context_type, support_context)
+
+def proactive_template_message(context_type, support_context='general'):
+    """Template proactive message for a starter type and support context"""
+    context_messages = PROACTIVE_FALLBACK_MESSAGES.get(support_context, PROACTIVE_FALLBACK_MESSAGES['general'])
     return context_messages.get(context_type, context_messages['check_in'])
 
+# Next proactive message per user, generated in the background while they are away
+proactive_queue = ProactiveMessageQueue(generate_personalized_proactive_message)
+
+# Personalized messages pushed after an instant template in progressive mode
+proactive_upgrades = ProactiveUpgradeChannel(generate_personalized_proactive_message)
+
+# Cache hit rates kept by the components themselves, read when /metrics is scraped
+CACHE_REQUESTS.add_callback(stats_callback(lambda: tts_cache.stats if tts_cache else None, 'tts'))
+CACHE_REQUESTS.add_callback(stats_callback(lambda: proactive_queue.stats, 'proactive_message'))
+
 # Emotional awareness patterns
 EMOTIONAL_PATTERNS = {
     'sadness': ['sad', 'down', 'depressed', 'empty', 'hopeless', 'low', 'upset', 'hurt'],
@@ -572,6 +854,10 @@ EMOTIONAL_PATTERNS = {
     'confusion': ['confused', 'lost', 'uncertain', 'unclear', 'mixed up'],
     'hope': ['hope', 'hopeful', 'optimistic', 'positive', 'better']
 }
+EMOTION_KEYWORD_PATTERNS = {
+    emotion: re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+    for emotion, keywords in EMOTIONAL_PATTERNS.items()
+}
 
 # Therapeutic response templates
 THERAPEUTIC_RESPONSES = {
@@ -603,6 +889,28 @@ def get_conversation_history(user_id):
         user_conversations[user_id] = []
     return user_conversations[user_id]
 
+def merge_session_history(server_history, session_history):
+    """Messages for this request's prompt: session messages the server has not stored, then the stored
+    history. The stored history is never modified, so session turns are not stored twice."""
+    if not session_history:
+        return server_history
+    known = {(type(msg), msg.content) for msg in server_history}
+    session_messages = []
+    for hist_msg in session_history[-CONVERSATION_HISTORY_LIMIT:]:
+        if not isinstance(hist_msg, dict):
+            continue
+        role = hist_msg.get('role', 'user')
+        content = hist_msg.get('content', '')
+        if role == 'user':
+            msg = HumanMessage(content=content)
+        elif role == 'assistant':
+            msg = AIMessage(content=content)
+        else:
+            continue
+        if (type(msg), msg.content) not in known:
+            session_messages.append(msg)
+    return session_messages + list(server_history)
+
 def add_to_conversation(user_id, human_message, ai_message, emotions=None):
     """Add messages to conversation history and store in vector database"""
     history = get_conversation_history(user_id)
@@ -612,15 +920,19 @@ def add_to_conversation(user_id, human_message, ai_message, emotions=None):
     # Store in vector database for future context retrieval
     store_conversation_vector(user_id, human_message, ai_message, emotions or [], time.time())
     
-    # Keep only last 20 messages to prevent context overflow
-    if len(history) > 20:
-        user_conversations[user_id] = history[-20:]
+    # Any precomputed proactive message is now stale
+    proactive_queue.invalidate(user_id)
+    
+    # Keep only the most recent messages to prevent context overflow
+    if len(history) > CONVERSATION_HISTORY_LIMIT:
+        user_conversations[user_id] = history[-CONVERSATION_HISTORY_LIMIT:]
+    memory_accountant.changed(user_id)
 
 def analyze_emotional_state(message_text, user_id):
     """Analyze emotional content of user message using Gemini AI and update emotional state"""
     try:
-        # Use Gemini AI for sophisticated emotion detection
-        if geminiLlm:
+        # Use Gemini AI for sophisticated emotion detection (keywords once the token budget is spent)
+        if geminiLlm and not llm_budget_exceeded(user_id):
             emotion_prompt = f"""Analyze the emotional content of this message, returning a strict JSON response. Input: "{message_text}"
 
 Return ONLY a single JSON object with EXACTLY this format:
@@ -643,7 +955,8 @@ Response must be valid JSON - no explanation text, ONLY the JSON object."""
 
             try:
                 # Get response from LLM
-                response = geminiLlm.invoke(emotion_prompt)
+                with span('llm.emotion', prompt_chars=len(emotion_prompt)):
+                    response = geminiLlm.invoke(emotion_prompt)
                 emotion_content = response.content if hasattr(response, 'content') else str(response)
                 
                 # Clean up response text
@@ -654,7 +967,7 @@ Response must be valid JSON - no explanation text, ONLY the JSON object."""
                     emotion_content = emotion_content[:-3]
                 emotion_content = emotion_content.strip()
                 
-                print(f"Raw emotion response: {emotion_content[:200]}...")
+                log.debug("Raw emotion response", response=emotion_content)
                 
                 # Parse JSON with validation
                 emotion_data = json.loads(emotion_content)
@@ -695,11 +1008,11 @@ Response must be valid JSON - no explanation text, ONLY the JSON object."""
                     'message': message_text[:100]
                 }
                 
-                print(f"✅ Emotion Analysis for user {user_id}: {emotion_analysis}")
+                log.debug("✅ Emotion analysis complete", user_id=user_id, emotions=detected_emotions,
+                          intensity=emotion_analysis['intensity'], avatar_emotion=emotion_analysis['avatar_emotion'])
                 
             except (json.JSONDecodeError, ValueError) as e:
-                print(f"Error parsing emotion analysis: {e}")
-                print("Falling back to keyword detection")
+                log.warning("Error parsing emotion analysis, falling back to keyword detection", error=str(e))
                 detected_emotions = analyze_emotions_fallback(message_text)
                 emotion_analysis = {
                     'emotions': detected_emotions,
@@ -744,20 +1057,19 @@ Response must be valid JSON - no explanation text, ONLY the JSON object."""
         return detected_emotions
         
     except Exception as e:
-        print(f"Error in emotion analysis: {e}")
+        log.error("Error in emotion analysis", user_id=user_id, error=str(e))
         return ["neutral"]
 
 def analyze_emotions_fallback(message_text):
     """Fallback keyword-based emotion detection"""
+    FALLBACKS.inc('emotion_keywords')
     message_lower = message_text.lower()
     detected_emotions = []
     
     # Detect emotions based on keywords
-    for emotion, keywords in EMOTIONAL_PATTERNS.items():
-        for keyword in keywords:
-            if keyword in message_lower:
-                detected_emotions.append(emotion)
-                break
+    for emotion, pattern in EMOTION_KEYWORD_PATTERNS.items():
+        if pattern.search(message_lower):
+            detected_emotions.append(emotion)
     
     return detected_emotions if detected_emotions else ["neutral"]
 
@@ -830,18 +1142,45 @@ def should_use_proactive_starter(user_id):
     
     # If returning after some time
     if time_since_last > 86400:  # 24 hours
-        emotional_state = user_emotional_states.get(user_id, {})
-        recent_emotions = emotional_state.get('current_emotions', [])
-        
-        # Check if user had concerning emotions in last session
-        concerning_emotions = ['sadness', 'anxiety', 'loneliness', 'confusion']
-        if any(emotion in concerning_emotions for emotion in recent_emotions):
-            return 'returning_concerned'
-        else:
-            return 'returning_positive'
+        return classify_returning_starter(user_id)
     
     return None
 
+def classify_returning_starter(user_id):
+    """Pick the starter for a returning user based on their last emotional state"""
+    emotional_state = user_emotional_states.get(user_id, {})
+    recent_emotions = emotional_state.get('current_emotions', [])
+    
+    # Check if user had concerning emotions in last session
+    concerning_emotions = ['sadness', 'anxiety', 'loneliness', 'confusion']
+    if any(emotion in concerning_emotions for emotion in recent_emotions):
+        return 'returning_concerned'
+    else:
+        return 'returning_positive'
+
+def predict_proactive_starter(user_id):
+    """Predict the starter type for the user's next visit without updating their context"""
+    context = user_conversation_context.get(user_id)
+    if context is None or context.get('first_interaction'):
+        return 'first_time'
+    return classify_returning_starter(user_id)
+
+def precompute_proactive_message(user_id):
+    """Queue generation of the message the user is most likely to see next"""
+    support_context = user_conversation_context.get(user_id, {}).get('support_context', 'general')
+    if support_context not in get_available_contexts():
+        support_context = 'general'
+    return proactive_queue.schedule(user_id, predict_proactive_starter(user_id), support_context)
+
+def precompute_idle_proactive_messages():
+    """Precompute proactive messages for users who have gone idle"""
+    if not geminiLlm:
+        return
+    cutoff = time.time() - PROACTIVE_IDLE_SECONDS
+    for user_id, ctx in list(user_conversation_context.items()):
+        if ctx.get('last_interaction', 0) <= cutoff and not proactive_queue.has_entry(user_id):
+            precompute_proactive_message(user_id)
+
 def enhance_conversation_with_therapeutic_elements(conversation_text, emotions, user_id, context='general'):
     """Enhance the conversation prompt with therapeutic guidance"""
     enhanced_prompt = conversation_text
@@ -896,8 +1235,11 @@ def enhance_conversation_with_therapeutic_elements(conversation_text, emotions,
     
     return enhanced_prompt
 
-def create_conversation_prompt(user_id, current_message, context='general'):
-    """Create a conversation prompt with personalized context, history, emotional awareness"""
+def create_conversation_prompt(user_id, current_message, context='general', history=None):
+    """Create a conversation prompt with personalized context, history, emotional awareness
+
+    `history` defaults to the user's stored conversation (chat passes it merged with the session history).
+    """
     from preference_mapping import get_style_modifiers, get_response_guidelines, get_user_preferences
     
     # Initialize user context if not exists
@@ -914,7 +1256,8 @@ def create_conversation_prompt(user_id, current_message, context='general'):
     starter_type = should_use_proactive_starter(user_id)
     
     # Analyze emotional state of current message
-    detected_emotions = analyze_emotional_state(current_message, user_id)
+    with stage('emotion'):
+        detected_emotions = analyze_emotional_state(current_message, user_id)
     
     # Update conversation context
     if user_id in user_conversation_context:
@@ -930,10 +1273,12 @@ def create_conversation_prompt(user_id, current_message, context='general'):
             'needs_check_in': False
         }
     
-    history = get_conversation_history(user_id)
+    if history is None:
+        history = get_conversation_history(user_id)
     
     # Find similar past conversations for additional context
-    similar_conversations = find_similar_conversations(user_id, current_message, top_k=2)
+    with stage('retrieval'):
+        similar_conversations = find_similar_conversations(user_id, current_message, top_k=2)
     
     # Get personalized context if available or fallback to base context
     user_ctx = user_conversation_context.get(user_id, {})
@@ -942,7 +1287,8 @@ def create_conversation_prompt(user_id, current_message, context='general'):
     risk_factors = user_ctx.get('risk_factors', [])
     
     # Fetch user preferences from database including condition_description
-    user_preferences = get_user_preferences(user_id)
+    with stage('preferences_db'):
+        user_preferences = get_user_preferences(user_id)
     
     # Get style modifiers and response guidelines from preferences
     preferences = user_ctx.get('preferences', {}) or user_preferences or {}
@@ -1082,7 +1428,8 @@ def create_user_context():
             })
 
         except Exception as e:
-            print(f"Error generating context: {e}")
+            log.error("Error generating context", user_id=user_id, error=str(e))
+            FALLBACKS.inc('context_generation')
             # Fallback to base context if generation fails
             fallback_context = get_context_with_preferences(onboarding_data)
             return jsonify({
@@ -1095,7 +1442,7 @@ def create_user_context():
             })
 
     except Exception as e:
-        print(f"Error in generate_user_context endpoint: {str(e)}")
+        log.exception("Error in generate_user_context endpoint")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -1111,6 +1458,133 @@ def health_check():
         "timestamp": time.time()
     })
 
+@app.route("/livez", methods=["GET"])
+def livez():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({
+        "status": "alive",
+        "uptime_seconds": round(component_registry.uptime(), 3),
+        "timestamp": time.time()
+    })
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness probe: 200 once every required component has finished loading"""
+    ready = component_registry.is_ready()
+    components = component_registry.status()
+    if not ready:
+        status = "starting"
+    elif any(component['state'] == 'failed' for component in components.values()):
+        status = "degraded"  # Serving with fallbacks for the components that failed to load
+    else:
+        status = "ready"
+    return jsonify({
+        "status": status,
+        "components": components,
+        "uptime_seconds": round(component_registry.uptime(), 3),
+        "timestamp": time.time()
+    }), 200 if ready else 503
+
+@app.route("/debug/traces", methods=["GET"])
+@admin_required
+def debug_traces():
+    """Recent slow request traces, newest first"""
+    limit = min(request.args.get('limit', default=50, type=int), 500)
+    min_ms = request.args.get('min_ms', default=0, type=float)
+    return jsonify({
+        "slow_threshold_ms": TRACE_SLOW_MS,
+        "stats": dict(trace_stats),
+        "traces": slow_traces(limit=limit, min_ms=min_ms),
+        "timestamp": time.time()
+    })
+
+@app.route("/debug/traces/export", methods=["POST"])
+@admin_required
+def export_debug_traces():
+    """Write the buffered slow traces to a JSON file"""
+    try:
+        return jsonify({"exported_to": export_slow_traces(), "timestamp": time.time()})
+    except OSError as e:
+        return jsonify({"export_error": str(e), "timestamp": time.time()}), 500
+
+@app.route("/debug/memory", methods=["GET"])
+@admin_required
+def debug_memory():
+    """Estimated bytes per in-memory structure and the heaviest users (?top=N, ?refresh=true)"""
+    top = min(request.args.get('top', default=20, type=int), 500)
+    max_age = 0 if request.args.get('refresh', '').lower() == 'true' else MEMORY_REPORT_TTL
+    report = memory_accountant.report(top=top, max_age=max_age)
+    report["memory_budget_mb"] = MEMORY_BUDGET_MB or None
+    report["timestamp"] = time.time()
+    return jsonify(report)
+
+@app.route("/debug/profiles", methods=["GET"])
+@admin_required
+def debug_profiles():
+    """Saved request profiles, newest first (profile with the X-Profile admin header or PROFILE_SAMPLE_RATE)"""
+    limit = min(request.args.get('limit', default=50, type=int), profiling.PROFILE_MAX_FILES)
+    return jsonify({
+        "header_enabled": bool(profiling.PROFILE_ADMIN_TOKEN),
+        "sample_rate": profiling.PROFILE_SAMPLE_RATE,
+        "stats": dict(profiling.stats),
+        "profiles": profiling.list_profiles(limit=limit),
+        "timestamp": time.time()
+    })
+
+@app.route("/debug/profiles/<profile_id>", methods=["GET"])
+@admin_required
+def debug_profile(profile_id):
+    """One profile: JSON summary, ?format=text for a pstats report, ?format=prof for the raw file"""
+    path = profiling.profile_path(profile_id)
+    if not path:
+        return jsonify({"error": "Profile not found"}), 404
+    output_format = request.args.get('format', 'json')
+    if output_format == 'prof':
+        return send_file(os.path.abspath(path), mimetype='application/octet-stream', as_attachment=True,
+                         download_name=f"{profile_id}.prof")
+    if output_format == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime', 'calls'):
+            return jsonify({"error": "sort must be cumulative, tottime or calls"}), 400
+        limit = min(request.args.get('limit', default=60, type=int), 500)
+        return Response(profiling.render_text(profile_id, sort=sort, limit=limit), content_type='text/plain; charset=utf-8')
+    return jsonify(profiling.load_summary(profile_id))
+
+@app.route("/llm_usage", methods=["GET"])
+@admin_required
+def llm_usage():
+    """LLM token usage and estimated cost for a day (?day=YYYY-MM-DD): one user with ?userId, else all users"""
+    if not llm_accountant:
+        return jsonify({"error": "LLM usage accounting is not available"}), 503
+    user_id = request.args.get('userId')
+    day = request.args.get('day')
+    if day and not re.fullmatch(r"\d{4}-\d{2}-\d{2}", day):
+        return jsonify({"error": "day must be YYYY-MM-DD"}), 400
+    usage = llm_accountant.user_usage(user_id, day) if user_id else llm_accountant.summary(day)
+    usage["timestamp"] = time.time()
+    return jsonify(usage)
+
+@app.route("/llm_usage/budget", methods=["POST"])
+@admin_required
+def set_llm_budget():
+    """Set a user's daily LLM token budget (dailyTokens: 0 for unlimited, null for the default)"""
+    if not llm_accountant:
+        return jsonify({"error": "LLM usage accounting is not available"}), 503
+    data = request.get_json() or {}
+    user_id = data.get("userId")
+    daily_tokens = data.get("dailyTokens")
+    if not user_id:
+        return jsonify({"error": "userId is required"}), 400
+    if daily_tokens is not None and (not isinstance(daily_tokens, int) or daily_tokens < 0):
+        return jsonify({"error": "dailyTokens must be a non-negative integer or null"}), 400
+    llm_accountant.set_budget(user_id, daily_tokens)
+    return jsonify(llm_accountant.user_usage(user_id))
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape endpoint: request and stage latency histograms, fallback, rate-limit and cache counters"""
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 def rate_limit_check(user_id):
     """Check if user has exceeded rate limit"""
     if user_id not in user_conversation_context:
@@ -1128,83 +1602,108 @@ def analyze_with_cache(message, user_id):
     if cache_key in analysis_cache:
         cached_result = analysis_cache[cache_key]
         if current_time - cached_result['timestamp'] < ANALYSIS_CACHE_TIME:
-            print(f"🎯 Cache hit for analysis of user {user_id}")
+            log.debug("🎯 Cache hit for analysis", user_id=user_id)
             return cached_result['result']
     
     # Perform analysis
     emotions = analyze_emotional_state(message, user_id)
     
-    # Cache result
+    # Cache result (re-inserted so an entry's position follows its timestamp)
+    analysis_cache.pop(cache_key, None)
     analysis_cache[cache_key] = {
         'result': emotions,
         'timestamp': current_time
     }
+    if len(analysis_cache) > ANALYSIS_CACHE_MAX_ENTRIES:
+        prune_analysis_cache(current_time)
     
     return emotions
 
+def prune_analysis_cache(current_time):
+    """Drop expired analyses, and the oldest ones while the cache is over its size cap"""
+    while analysis_cache:
+        oldest_key = next(iter(analysis_cache))
+        entry = analysis_cache.get(oldest_key)
+        if entry and len(analysis_cache) <= ANALYSIS_CACHE_MAX_ENTRIES and \
+                current_time - entry['timestamp'] < ANALYSIS_CACHE_TIME:
+            break
+        analysis_cache.pop(oldest_key, None)
+
+def start_speech_job(user_id, response_text, priority='normal'):
+    """Start background synthesis of a chat reply and return its job handle, or None if TTS is unavailable"""
+    if not speech_jobs:
+        return None
+    
+    # Speak the text the user reads, without formatting markup
+    speech_text = re.sub(r"<[^>]+>", "", response_text).strip()
+    if not speech_text:
+        return None
+    if len(speech_text) > TTS_MAX_CHARS:
+        speech_text = speech_text[:TTS_MAX_CHARS] + "..."
+    if not tts_router.can_synthesize(speech_text, DEFAULT_TTS_VOICE):
+        return None
+    
+    job_id = speech_jobs.submit(speech_text, DEFAULT_TTS_VOICE, user_id=user_id, priority=PRIORITIES[priority])
+    if job_id is None:
+        log.warning("⚠️ TTS job queue full, no speech job", user_id=user_id)
+        return None
+    return {
+        'job_id': job_id,
+        'status_url': f"/speech_jobs/{job_id}"
+    }
+
 @app.route("/chat", methods=["POST"])
 def chat():
     """Enhanced chat endpoint with performance monitoring, rate limiting and error handling"""
     
     start_time = time.time()
-    # Unique request id for tracing in logs
-    request_id = int(start_time * 1000)
-    response_data = {
-        'request_id': request_id,
-        'timestamp': start_time,
-        'performance_metrics': {}
-    }
-    print(f"[{request_id}] START chat request")
+    # Trace id of this request, shared by its log lines, spans and /debug/traces
+    request_id = current_trace_id() or new_trace_id()
     
     try:
         data = request.get_json()
-        print(f"[{request_id}] Received chat request:", data)
             
         message = data.get("message", "")
         user_id = data.get("userId", "anonymous")
         support_context = data.get("context", "general")  # New: support context
         session_history = data.get("sessionHistory", [])  # New: session history for context
+        want_tts = bool(data.get("tts", False))  # Start speech synthesis as soon as the reply is final
         
         if not message:
             return jsonify({"error": "Message is required"}), 400
         
-        print(f"📚 Received {len(session_history)} previous messages for context")
+        # The user has typed, so any pending progressive proactive upgrade is no longer wanted
+        proactive_upgrades.drop_user(user_id)
+        
+        # Right after startup the LLM may still be loading; wait briefly rather than fall back
+        component_registry.get('llm', timeout=COMPONENT_WAIT_TIMEOUT)
+        
+        log.info("Chat request received", user_id=user_id, context=support_context, message=message,
+                 session_history_messages=len(session_history), tts=want_tts)
         
         # Get conversation and emotion history
-        conversation_history = get_conversation_history(user_id)
-        
-        # If session history is provided, prepend it to conversation history for context
-        if session_history:
-            print(f"🔄 Integrating session history into conversation context")
-            # Convert session history to message format
-            for hist_msg in session_history:
-                role = hist_msg.get('role', 'user')
-                content = hist_msg.get('content', '')
-                if role == 'user':
-                    conversation_history.insert(0, HumanMessage(content=content))
-                elif role == 'assistant':
-                    conversation_history.insert(0, AIMessage(content=content))
+        conversation_history = merge_session_history(get_conversation_history(user_id), session_history)
         
         emotional_state = user_emotional_states.get(user_id, {})
         emotion_history = emotional_state.get('emotion_history', [])
             
         # First check for crisis indicators using LLM
-        print(f"[{user_id}] 🚨 Analyzing message for crisis indicators...")
-        crisis_analysis = analyze_crisis_indicators(
-            message=message,
-            user_id=user_id,
-            conversation_history=[
-                {'content': msg.content, 'type': 'human' if isinstance(msg, HumanMessage) else 'ai'}
-                for msg in conversation_history
-            ],
-            emotion_history=emotion_history,
-            llm=geminiLlm  # Pass LLM instance
-        )
+        with stage('crisis'):
+            crisis_analysis = analyze_crisis_indicators(
+                message=message,
+                user_id=user_id,
+                conversation_history=[
+                    {'content': msg.content, 'type': 'human' if isinstance(msg, HumanMessage) else 'ai'}
+                    for msg in conversation_history
+                ],
+                emotion_history=emotion_history,
+                llm=geminiLlm  # Pass LLM instance
+            )
         
         # If crisis detected, generate comprehensive therapist context
         if crisis_analysis.get('has_crisis_indicators'):
-            print(f"[{request_id}] ⚠️ Crisis indicators detected for user {user_id}")
-            print(f"[{request_id}] Severity Level: {crisis_analysis.get('severity_level')}")
+            log.warning("⚠️ Crisis indicators detected", user_id=user_id,
+                        severity_level=crisis_analysis.get('severity_level'))
             
             therapist_context = generate_therapist_context(
                 user_id=user_id,
@@ -1235,10 +1734,9 @@ def chat():
             
             
         # Now analyze emotional state for ongoing emotional tracking
-        print(f"[{request_id}] 🔍 Running emotional analysis")
-        detected_emotions = analyze_emotional_state(message, user_id)
+        with stage('emotion'):
+            detected_emotions = analyze_emotional_state(message, user_id)
         avatar_emotion = map_emotions_to_avatar(detected_emotions)
-        print(f"[{request_id}] 🔍 Emotional analysis complete: {detected_emotions}")
             
             # Validate context
         available_contexts = get_available_contexts()
@@ -1247,30 +1745,13 @@ def chat():
         
         # Check if GEMINI_API_KEY is configured
         if not os.environ.get("GEMINI_API_KEY") or not geminiLlm:
-            print(f"[{request_id}] Warning: GEMINI_API_KEY not configured or LLM not initialized, using fallback response")
-            fallback_responses = {
-                'general': [
-                    "Everything will be okay. 🌟 I'm here to support you through whatever you're going through.",
-                    "I hear you, and I want you to know that your feelings are valid. Take a deep breath with me. 💙",
-                    "You're not alone in this. सब कुछ ठीक हो जाएगा (Everything will be fine). 🌈",
-                    "Thank you for sharing with me. Your courage to reach out shows how strong you are. ✨"
-                ],
-                'academic': [
-                    "Academic pressure can be overwhelming, but you're not alone in this journey. 📚💙",
-                    "Your education is important, but so is your mental health. Take care of yourself. 🌟",
-                    "Every student faces challenges. You have the strength to overcome this. पढ़ाई का stress होना normal है. ✨"
-                ],
-                'family': [
-                    "Family relationships can be complex. Your feelings about this are completely valid. 🏠💙",
-                    "I understand family dynamics can be challenging. You're doing your best. 🌸",
-                    "Family matters touch our hearts deeply. Take time to process your emotions. 💕"
-                ]
-            }
-            
+            log.warning("GEMINI_API_KEY not configured or LLM not initialized, using fallback response")
             import random
-            context_fallbacks = fallback_responses.get(support_context, fallback_responses['general'])
+            context_fallbacks = CHAT_FALLBACK_RESPONSES.get(support_context, CHAT_FALLBACK_RESPONSES['general'])
+            fallback_text = random.choice(context_fallbacks)
+            FALLBACKS.inc('gemini_unavailable')
             fallback_body = {
-                "response": random.choice(context_fallbacks),
+                "response": fallback_text,
                 "userId": user_id,
                 "timestamp": time.time(),
                 "context": support_context,
@@ -1278,17 +1759,22 @@ def chat():
                 "fallback_source": "gemini_unavailable",
                 'request_id': request_id
             }
-            print(f"[{request_id}] Returning fallback response due to LLM unavailability")
+            if want_tts:
+                fallback_body['speech_job'] = start_speech_job(user_id, fallback_text)
+            fallback_body['performance_metrics'] = stage_timings(total_since=start_time)
             return jsonify(fallback_body)
         
         # Create conversation prompt with emotional intelligence and context
-        conversation_prompt = create_conversation_prompt(user_id, message, support_context)
+        with stage('prompt_build'):
+            conversation_prompt = create_conversation_prompt(user_id, message, support_context, conversation_history)
         
         # Analyze emotional state for this message (needed for conversation history)
-        detected_emotions = analyze_emotional_state(message, user_id)
+        with stage('emotion'):
+            detected_emotions = analyze_emotional_state(message, user_id)
         
         # Get AI response using invoke method
-        response = geminiLlm.invoke(conversation_prompt)
+        with stage('llm'), span('llm.chat_reply', prompt_chars=len(conversation_prompt)):
+            response = geminiLlm.invoke(conversation_prompt)
         
         # Extract the content from the response
         if hasattr(response, 'content'):
@@ -1296,16 +1782,20 @@ def chat():
         else:
             ai_response = str(response)
         
-        print(f"AI Response for user {user_id} in {support_context} context:", ai_response)
-        
-        # Add to conversation history with emotional context
-        add_to_conversation(user_id, message, ai_response, detected_emotions)
+        log.info("AI response generated", user_id=user_id, context=support_context, response=ai_response)
         
         # Format response: clean up any markdown formatting
         formatted_response = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", ai_response)
         formatted_response = formatted_response.replace("\\n", "\n")
         formatted_response = formatted_response.replace("\\*", "*")
         
+        # The reply is final: start synthesis now so it overlaps the remaining bookkeeping
+        speech_priority = 'high' if crisis_analysis.get('has_crisis_indicators') else 'normal'
+        speech_job = start_speech_job(user_id, formatted_response, speech_priority) if want_tts else None
+        
+        # Add to conversation history with emotional context
+        add_to_conversation(user_id, message, ai_response, detected_emotions)
+        
         # Get avatar emotion from emotional state
         user_state = user_emotional_states.get(user_id, {})
         current_analysis = user_state.get('current_analysis', {})
@@ -1323,7 +1813,7 @@ def chat():
                 'resources': user_conversation_context[user_id].get('crisis_resources', {}),
                 'needs_professional_help': user_conversation_context[user_id].get('needs_professional_help', False)
             }
-            print(f"[{request_id}] 🚨 Including crisis_info in response: severity={crisis_info['severity_level']}")
+            log.info("🚨 Including crisis_info in response", severity_level=crisis_info['severity_level'])
 
         return jsonify({
             "response": formatted_response,
@@ -1341,23 +1831,26 @@ def chat():
             "agent_analysis": user_conversation_context.get(user_id, {}).get('agent_analysis'),
             "agent_intervention": user_conversation_context.get(user_id, {}).get('agent_intervention'),
             "risk_trends": user_conversation_context.get(user_id, {}).get('risk_trends'),
-            "has_agent_intervention": bool(user_conversation_context.get(user_id, {}).get('agent_intervention'))
+            "has_agent_intervention": bool(user_conversation_context.get(user_id, {}).get('agent_intervention')),
+            
+            # Background speech synthesis handle when requested with "tts": true
+            "speech_job": speech_job,
+            
+            # Per-stage latency of this request in seconds
+            "performance_metrics": stage_timings(total_since=start_time),
+            "request_id": request_id
         })
         
     except Exception as e:
-        print(f"Error in chat endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in chat endpoint")
         
-        end_time = time.time()
+        FALLBACKS.inc('chat_error')
         error_response = {
             "error": "AI service temporarily unavailable, using fallback response",
             "error_details": str(e),
             "timestamp": time.time(),
-            "performance_metrics": {
-                "total_time": end_time - start_time,
-                "status": "error"
-            }
+            "performance_metrics": dict(stage_timings(total_since=start_time), status="error"),
+            "request_id": request_id
         }
         
         try:
@@ -1375,25 +1868,7 @@ def chat():
             conv_count = user_conversation_context.get(user_id, {}).get('total_messages', 0)
             
             # Select appropriate fallback response based on support context
-            fallback_responses = {
-                'general': [
-                    "Everything will be okay. 🌟 I'm here to support you through whatever you're going through.",
-                    "I hear you, and I want you to know that your feelings are valid. Take a deep breath with me. 💙",
-                    "You're not alone in this. Every challenge you face is making you stronger. सब कुछ ठीक हो जाएगा (Everything will be fine). 🌈"
-                ],
-                'academic': [
-                    "I understand academic pressure can be overwhelming. Let's take this one step at a time. 📚💙",
-                    "Your education matters, but your well-being matters more. We'll work through this together. 🌟",
-                    "Every student faces challenges. You have the strength to overcome this. पढ़ाई का stress होना normal है. ✨"
-                ],
-                'family': [
-                    "Family relationships can be complex. Your feelings about this are completely valid. 🏠💙",
-                    "I understand family dynamics can be challenging. Take a moment to breathe. 🌸",
-                    "Family matters touch our hearts deeply. You're not alone in navigating this. दिल की बात समझती हूँ। 💕"
-                ]
-            }
-            
-            context_responses = fallback_responses.get(support_context, fallback_responses['general'])
+            context_responses = CHAT_ERROR_FALLBACK_RESPONSES.get(support_context, CHAT_ERROR_FALLBACK_RESPONSES['general'])
             import random
             response = random.choice(context_responses)
             
@@ -1417,7 +1892,7 @@ def chat():
             
         except Exception as inner_e:
             # If everything fails, return minimal error response
-            print(f"Error in fallback handling: {inner_e}")
+            log.error("Error in fallback handling", error=str(inner_e))
             error_response["response"] = "I'm here to support you. Let's try that again in a moment. 💙"
         
         # Always return 200 to avoid frontend errors
@@ -1430,6 +1905,7 @@ def proactive_chat():
         data = request.get_json()
         user_id = data.get("userId", "anonymous")
         support_context = data.get("context", "general")  # New: support context
+        progressive = bool(data.get("progressive", False))  # Serve a template now, push the LLM message later
         
         # Validate context
         available_contexts = get_available_contexts()
@@ -1440,8 +1916,17 @@ def proactive_chat():
         starter_type = should_use_proactive_starter(user_id)
         
         if starter_type:
-            # Generate intelligent proactive message using LLM and conversation context
-            proactive_message = generate_proactive_message_with_context(user_id, starter_type, support_context)
+            # Serve the precomputed message if one is queued, otherwise generate it now
+            proactive_message = proactive_queue.take(user_id, starter_type, support_context)
+            precomputed = proactive_message is not None
+            upgrade_id = None
+            if not precomputed:
+                if progressive and geminiLlm:
+                    proactive_message = proactive_template_message(starter_type, support_context)
+                    PROACTIVE_TEMPLATES.inc('progressive')
+                    upgrade_id = proactive_upgrades.start(user_id, starter_type, support_context)
+                else:
+                    proactive_message = generate_proactive_message_with_context(user_id, starter_type, support_context)
             
             # Update conversation context
             if user_id not in user_conversation_context:
@@ -1463,6 +1948,10 @@ def proactive_chat():
                 "starter_type": starter_type,
                 "context": support_context,
                 "context_aware": True,
+                "precomputed": precomputed,
+                "progressive": upgrade_id is not None,
+                "upgrade_id": upgrade_id,
+                "upgrade_url": f"/proactive_upgrade/{upgrade_id}" if upgrade_id else None,
                 "message": f"Generated intelligent proactive message using {starter_type} context for {support_context} support"
             })
         else:
@@ -1474,10 +1963,8 @@ def proactive_chat():
                 "message": "No proactive message needed at this time"
             })
             
-    except Exception as e:
-        print(f"Error in proactive chat endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("Error in proactive chat endpoint")
         
         # Fallback to simple proactive message
         support_context = data.get("context", "general") if 'data' in locals() else "general"
@@ -1491,6 +1978,61 @@ def proactive_chat():
             "context_aware": False
         })
 
+@app.route("/proactive_upgrade/<upgrade_id>", methods=["GET"])
+def proactive_upgrade_stream(upgrade_id):
+    """Server-sent event stream delivering the personalized proactive message"""
+    def event_stream():
+        deadline = time.time() + PROACTIVE_UPGRADE_TIMEOUT
+        while True:
+            remaining = deadline - time.time()
+            upgrade = proactive_upgrades.wait(upgrade_id, min(SSE_KEEPALIVE_INTERVAL, max(remaining, 0)))
+            
+            if upgrade is None:
+                yield f"event: expired\ndata: {json.dumps({'upgrade_id': upgrade_id})}\n\n"
+                return
+            if upgrade['status'] == 'ready':
+                payload = {
+                    'upgrade_id': upgrade_id,
+                    'userId': upgrade['user_id'],
+                    'proactive_message': upgrade['message'],
+                    'starter_type': upgrade['starter_type'],
+                    'context': upgrade['support_context'],
+                    'timestamp': time.time()
+                }
+                yield f"event: upgrade\ndata: {json.dumps(payload)}\n\n"
+                return
+            if upgrade['status'] in ('dropped', 'failed'):
+                yield f"event: {upgrade['status']}\ndata: {json.dumps({'upgrade_id': upgrade_id})}\n\n"
+                return
+            if remaining <= 0:
+                yield f"event: timeout\ndata: {json.dumps({'upgrade_id': upgrade_id})}\n\n"
+                return
+            yield ": keep-alive\n\n"
+    
+    return Response(event_stream(), mimetype="text/event-stream", headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route("/end_session", methods=["POST"])
+def end_session():
+    """Mark the end of a chat session and precompute the user's next proactive message"""
+    try:
+        data = request.get_json()
+        user_id = data.get("userId", "anonymous")
+        
+        scheduled = bool(geminiLlm) and user_id in user_conversation_context and precompute_proactive_message(user_id)
+        
+        return jsonify({
+            "userId": user_id,
+            "proactive_precompute_scheduled": bool(scheduled),
+            "timestamp": time.time()
+        })
+        
+    except Exception as e:
+        log.exception("Error in end session endpoint")
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/emotional_status", methods=["GET"])
 def get_emotional_status():
     """Get emotional status for a user"""
@@ -1511,7 +2053,7 @@ def get_emotional_status():
         })
         
     except Exception as e:
-        print(f"Error in emotional status endpoint: {str(e)}")
+        log.exception("Error in emotional status endpoint")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/contexts", methods=["GET"])
@@ -1547,7 +2089,7 @@ def get_contexts():
         })
         
     except Exception as e:
-        print(f"Error in contexts endpoint: {str(e)}")
+        log.exception("Error in contexts endpoint")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/conversation_context", methods=["GET"])
@@ -1582,9 +2124,41 @@ def get_conversation_context():
         return jsonify(context_data)
         
     except Exception as e:
-        print(f"Error in conversation context endpoint: {str(e)}")
+        log.exception("Error in conversation context endpoint")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/wellness_activity", methods=["GET"])
+def get_wellness_activity():
+    """Recommend a wellness activity from the curated catalog"""
+    try:
+        user_id = request.args.get("userId", "anonymous")
+        context = request.args.get("context", "general")
+        
+        if not care_agent:
+            return jsonify({
+                "error": "AI Care Agent not available",
+                "userId": user_id,
+                "timestamp": time.time()
+            }), 200
+        
+        personalize = request.args.get("personalize", "false").lower() == "true"
+        activity = care_agent.generate_wellness_activity(user_id, context=context, personalize=personalize)
+        return jsonify({
+            "userId": user_id,
+            "timestamp": time.time(),
+            "activity": activity,
+            "success": bool(activity)
+        })
+        
+    except Exception as e:
+        log.exception("Error recommending wellness activity")
+        return jsonify({
+            "error": str(e),
+            "userId": user_id if 'user_id' in locals() else "anonymous",
+            "timestamp": time.time(),
+            "success": False
+        }), 500
+
 @app.route("/clear_memory", methods=["POST"])
 @app.route("/insight_report", methods=["GET"])
 def get_insight_report():
@@ -1599,8 +2173,14 @@ def get_insight_report():
                 "timestamp": time.time()
             }), 200
             
-        # Generate insight report
-        insight_report = care_agent.generate_weekly_insight_report(user_id)
+        # Generate insight report (served from cache while the agent state is unchanged)
+        force_refresh = request.args.get("refresh", "false").lower() == "true"
+        emotion_history = user_emotional_states.get(user_id, {}).get('emotion_history', [])
+        insight_report = care_agent.generate_weekly_insight_report(
+            user_id,
+            emotion_history=emotion_history,
+            force_refresh=force_refresh
+        )
         
         if insight_report:
             return jsonify({
@@ -1618,7 +2198,7 @@ def get_insight_report():
             }), 200
             
     except Exception as e:
-        print(f"Error generating insight report: {e}")
+        log.exception("Error generating insight report")
         return jsonify({
             "error": str(e),
             "userId": user_id if 'user_id' in locals() else "anonymous",
@@ -1634,6 +2214,7 @@ def clear_memory():
         
         if user_id in user_conversations:
             del user_conversations[user_id]
+            memory_accountant.changed(user_id)
             return jsonify({"status": "Memory cleared", "userId": user_id})
         else:
             return jsonify({"status": "No memory found", "userId": user_id})
@@ -1645,47 +2226,74 @@ def clear_memory():
 def generate_speech():
     """Generate speech using Murf AI TTS service"""
     try:
-        # Check if TTS service is available
-        if not murf_tts_service or not murf_tts_service.client:
-            error_msg = "Murf AI TTS service not available - API key not configured"
-            print(f"❌ TTS Error: {error_msg}")
+        data = request.get_json()
+        
+        text = data.get("text", "")
+        voice_profile = data.get("voice_profile", "compassionate_female")
+        emotion_context = data.get("emotion_context")  # Optional, will auto-detect if not provided
+        user_id = data.get("userId", "anonymous")
+        chunked = bool(data.get("chunked", False))  # Stream sentence chunks as they are synthesized
+        
+        if not text:
+            return jsonify({"error": "Text is required for speech generation"}), 400
+        
+        # Limit text length to prevent long processing times
+        max_chars = TTS_CHUNKED_MAX_CHARS if chunked else TTS_MAX_CHARS
+        if len(text) > max_chars:
+            text = text[:max_chars] + "..."
+        segments = split_into_chunks(text) if chunked and tts_router else [text]
+        
+        # Check if any TTS backend can serve this (cached speech needs neither an API key nor a local engine)
+        if not tts_router or not all(tts_router.can_synthesize(segment, DEFAULT_TTS_VOICE) for segment in segments):
+            error_msg = "TTS not available - Murf API key not configured and no local engine installed"
+            log.warning("❌ TTS unavailable", error=error_msg)
             return jsonify({
                 "success": False,
                 "audio_data": None,
                 "audio_filename": None,
                 "audio_url": None,
                 "duration_seconds": 0,
-                "voice_profile": "compassionate_female",
+                "voice_profile": voice_profile,
                 "emotion_context": "supportive",
                 "provider": "murf_ai",
                 "error": error_msg,
                 "fallback_message": "TTS service requires Murf API key configuration.",
-                "userId": "anonymous",
+                "userId": user_id,
                 "timestamp": time.time()
             }), 200
         
-        data = request.get_json()
-        print("Received TTS request:", data)
-        
-        text = data.get("text", "")
-        voice_profile = data.get("voice_profile", "compassionate_female")
-        emotion_context = data.get("emotion_context")  # Optional, will auto-detect if not provided
-        user_id = data.get("userId", "anonymous")
-        
-        if not text:
-            return jsonify({"error": "Text is required for speech generation"}), 400
-        
-        # Limit text length to prevent long processing times
-        if len(text) > 1000:
-            text = text[:1000] + "..."
-        
-        print(f"Generating speech for user {user_id}: '{text[:50]}...' with voice profile: {voice_profile}")
+        log.info("Generating speech", user_id=user_id, text=text, voice_profile=voice_profile,
+                 chunks=len(segments) if chunked else None)
+        
+        if chunked:
+            def chunk_stream():
+                for chunk in chunked_synthesizer.iter_in_order(segments, DEFAULT_TTS_VOICE, user_id=user_id):
+                    chunk.update({
+                        'userId': user_id,
+                        'timestamp': time.time(),
+                        'duration_seconds': chunk.get('audio_length', 0),
+                        'voice_profile': voice_profile,
+                        'emotion_context': emotion_context or 'supportive',
+                        'provider': chunk.get('provider', 'murf_ai')
+                    })
+                    yield json.dumps(chunk) + "\n"
+            
+            return Response(chunk_stream(), mimetype="application/x-ndjson", headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            })
         
-        # Generate speech using Murf AI service
-        result = murf_tts_service.generate_speech(
-            text=text,
-            voice_id="en-US-natalie"  # Default voice
-        )
+        # Generate speech through the job queue so concurrent requests share the bounded worker pool
+        job_id = speech_jobs.submit(text, DEFAULT_TTS_VOICE, user_id=user_id)
+        job = speech_jobs.get(job_id, wait=TTS_SYNC_WAIT) if job_id else None
+        if job and job['result']:
+            result = dict(job['result'])
+        else:
+            result = {
+                'success': False,
+                'error': 'TTS busy',
+                'message': 'Speech job queue full' if not job else f"Speech job still {job['status']}"
+            }
         
         # Add user ID and timestamp
         result['userId'] = user_id
@@ -1697,18 +2305,15 @@ def generate_speech():
             result['duration_seconds'] = result.get('audio_length', 0)
             result['voice_profile'] = voice_profile
             result['emotion_context'] = emotion_context or 'supportive'
-            result['provider'] = 'murf_ai'
+            result.setdefault('provider', 'murf_ai')
         
-        # Log the result (without audio data for brevity)
-        log_result = {k: v for k, v in result.items() if k != 'audio_data'}
-        print(f"TTS result for user {user_id}:", log_result)
+        log.info("TTS result", user_id=user_id, success=result.get('success'), provider=result.get('provider'),
+                 cached=result.get('cached'), error=result.get('error'))
         
         return jsonify(result)
         
     except Exception as e:
-        print(f"Error in generate_speech endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in generate_speech endpoint")
         
         # Return fallback response
         return jsonify({
@@ -1726,6 +2331,71 @@ def generate_speech():
             "timestamp": time.time()
         }), 200  # Return 200 to avoid breaking frontend
 
+@app.route("/speech_jobs", methods=["POST"])
+def create_speech_job():
+    """Queue a speech synthesis job and return its handle immediately"""
+    data = request.get_json() or {}
+    text = data.get("text", "")
+    user_id = data.get("userId", "anonymous")
+    priority = data.get("priority", "normal")  # 'high' is reserved for crisis replies from /chat
+    
+    if not text:
+        return jsonify({"error": "Text is required for speech generation"}), 400
+    if priority not in ('normal', 'low'):
+        return jsonify({"error": "priority must be 'normal' or 'low'"}), 400
+    if not speech_jobs:
+        return jsonify({"error": "TTS service not initialized"}), 503
+    
+    speech_job = start_speech_job(user_id, text, priority)
+    if not speech_job:
+        return jsonify({"error": "TTS unavailable or job queue full"}), 503
+    return jsonify(dict(speech_job, status='queued', priority=priority, userId=user_id)), 202
+
+@app.route("/speech_jobs/<job_id>", methods=["GET"])
+def speech_job_status(job_id):
+    """Status and result of a background speech job"""
+    if not speech_jobs:
+        return jsonify({"error": "TTS service not initialized"}), 503
+    
+    # Optionally wait for the job to finish, capped so requests cannot hang a worker
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0), SPEECH_JOB_MAX_WAIT)
+    except ValueError:
+        wait = 0
+    
+    job = speech_jobs.get(job_id, wait=wait)
+    if job is None:
+        return jsonify({"error": "Speech job not found or expired", "job_id": job_id}), 404
+    
+    response = {
+        'job_id': job_id,
+        'status': job['status'],
+        'userId': job['user_id'],
+        'timestamp': time.time()
+    }
+    result = job['result']
+    if result:
+        response.update(result)
+        response['duration_seconds'] = result.get('audio_length', 0)
+        response.setdefault('provider', 'murf_ai')
+    return jsonify(response)
+
+@app.route("/audio/<audio_hash>", methods=["GET"])
+def serve_audio(audio_hash):
+    """Serve locally stored speech with Range support for seeking"""
+    if not audio_store or not re.fullmatch(r"[0-9a-f]{64}", audio_hash):
+        return jsonify({"error": "Audio not found"}), 404
+    
+    meta = audio_store.get_meta(audio_hash)
+    if not meta:
+        return jsonify({"error": "Audio not found"}), 404
+    
+    # Content-addressed, so the bytes behind a URL never change
+    response = send_file(meta['path'], mimetype=meta['mime_type'], conditional=True,
+                         etag=audio_hash, max_age=AUDIO_CACHE_MAX_AGE)
+    response.headers['Cache-Control'] = f"public, max-age={AUDIO_CACHE_MAX_AGE}, immutable"
+    return response
+
 @app.route("/tts_status", methods=["GET"])
 def tts_status():
     """Check TTS service status"""
@@ -1756,11 +2426,16 @@ def tts_status():
             "api_key_configured": api_key_configured,
             "available_voices": voices if api_key_configured else [],
             "service": "Murf AI TTS",
+            "cache": murf_tts_service.cache.get_stats() if murf_tts_service.cache else None,
+            "warmup": tts_warmup.progress if tts_warmup else None,
+            "jobs": speech_jobs.get_stats() if speech_jobs else None,
+            "backends": tts_router.get_stats() if tts_router else None,
+            "audio_store": audio_store.get_stats() if audio_store else None,
             "timestamp": time.time()
         })
         
     except Exception as e:
-        print(f"Error in tts_status endpoint: {str(e)}")
+        log.exception("Error in tts_status endpoint")
         return jsonify({
             "status": "error",
             "api_key_configured": False,
@@ -1769,28 +2444,101 @@ def tts_status():
             "timestamp": time.time()
         }), 500
 
+def start_background_jobs(run_singletons=True):
+    """Start component loading and periodic maintenance jobs for this process"""
+    # Gemini first so chat is ready soonest, then the embedding model and the care agent
+    component_registry.start_background_loading(['llm', 'embedding_model', 'care_agent'])
+    # Precompute proactive messages for users who have gone idle
+    start_periodic_job('proactive_precompute', PROACTIVE_IDLE_SCAN_INTERVAL, precompute_idle_proactive_messages)
+    # Keep per-user in-memory data within MEMORY_BUDGET_MB
+    if MEMORY_BUDGET_MB:
+        start_periodic_job('memory_budget', MEMORY_CHECK_INTERVAL, enforce_memory_budget)
+    # Write this process's aggregated LLM usage to the shared store
+    if llm_accountant:
+        start_periodic_job('llm_usage_flush', LLM_USAGE_FLUSH_INTERVAL, llm_accountant.flush)
+    if run_singletons:
+        # Weekly pre-generation of clinician insight reports (shared through the care agent store)
+        start_periodic_job('insight_report_warmup', INSIGHT_REPORT_WARM_INTERVAL, warm_insight_reports,
+                           initial_delay=INSIGHT_REPORT_WARM_DELAY)
+        # Embed the wellness activity catalog once the care agent is loaded, if no index was built offline
+        start_background_task('activity_index', build_activity_index)
+        # Synthesize static fallback and crisis replies so they always have audio (one worker per machine)
+        start_tts_warmup()
+
+def set_torch_threads():
+    """Cap torch intra-op threads so N pre-forked workers do not oversubscribe the CPU"""
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(TORCH_THREADS_PER_WORKER)
+
+def preload_for_fork():
+    """Load fork-safe shared state in the gunicorn master before workers are forked
+
+    Only state that survives fork is built here: the embedding model weights
+    (no inference runs in the master, so torch/OpenMP thread pools are first
+    created in the workers), and the modules request handlers import lazily.
+    The Gemini client holds gRPC channels and is created per worker, as are
+    all threads and SQLite connections (see after_fork).
+    """
+    started = time.time()
+    component_registry.get('embedding_model')
+    set_torch_threads()
+    for module_name in ('preference_mapping', 'langchain_google_genai'):
+        try:
+            __import__(module_name)
+        except Exception as e:
+            log.warning("⚠️ Could not preload module", module=module_name, error=str(e))
+
+    # Move everything loaded so far out of the collector's reach: a full collection
+    # in a worker would otherwise write to every shared object and unshare its page
+    gc.collect()
+    gc.freeze()
+    log.info("✅ Preloaded shared state for workers", seconds=round(time.time() - started, 2),
+             frozen_objects=gc.get_freeze_count())
+
+def after_fork(run_singletons=True):
+    """Re-create per-process state in a freshly forked worker (called from gunicorn's post_fork)"""
+    set_torch_threads()
+    if tts_cache:
+        tts_cache.reopen()
+    if audio_store:
+        audio_store.reopen()
+    if llm_accountant:
+        llm_accountant.reopen()
+    if isinstance(embedding_model, RemoteEmbeddingModel):
+        embedding_model.reset_connections()
+    start_background_jobs(run_singletons=run_singletons)
+
+def start_tts_warmup():
+    """Warm the TTS cache with all static response strings now and then every TTS_WARMUP_INTERVAL"""
+    global tts_warmup
+    if not TTS_WARMUP_ON_START or not murf_tts_service or not murf_tts_service.client or not murf_tts_service.cache:
+        return
+    if TTS_WARMUP_INTERVAL <= 0:
+        tts_warmup = TTSWarmup(murf_tts_service, voice_id=DEFAULT_TTS_VOICE)
+        start_background_task('tts_warmup', tts_warmup.run)
+        return
+    # Renew anything that would expire before the next run
+    tts_warmup = TTSWarmup(murf_tts_service, voice_id=DEFAULT_TTS_VOICE, refresh_within=TTS_WARMUP_INTERVAL + 3600)
+    start_periodic_job('tts_warmup', TTS_WARMUP_INTERVAL, tts_warmup.run, initial_delay=0)
+
+# Importing main starts no threads: the dev server below, gunicorn's worker hooks (after_fork,
+# see gunicorn.conf.py) and benchmarks/fakes.py start what they need explicitly
+if PREFORK_MODE:
+    preload_for_fork()
+
 if __name__ == "__main__":
-    print("Starting MindCare AI Service with Intelligent Proactive Chat...")
-    print(f"System Prompt configured: {bool(PROMPT)}")
-    print(f"GEMINI_API_KEY configured: {bool(os.environ.get('GEMINI_API_KEY'))}")
-    print(f"Embedding model initialized: {bool(embedding_model)}")
+    log.info("Starting MindCare AI Service with Intelligent Proactive Chat",
+             system_prompt_configured=bool(PROMPT),
+             gemini_api_key_configured=bool(os.environ.get('GEMINI_API_KEY')))
+    log.info("AI components are loading in the background, see /readyz for progress")
     
     if not os.environ.get("GEMINI_API_KEY"):
-        print("⚠️  WARNING: GEMINI_API_KEY not found in environment variables!")
-        print("   The service will work with fallback responses, but AI functionality will be limited.")
-        print("   Please add GEMINI_API_KEY to your .env file for full functionality.")
-    
-    if not embedding_model:
-        print("⚠️  WARNING: Embedding model not initialized!")
-        print("   Vector similarity features will be disabled.")
-        print("   Proactive messages will use fallback responses.")
-    else:
-        print("✅ Vector similarity search enabled for intelligent proactive conversations")
-    
-    print("\n🌟 Enhanced Features:")
-    print("   - LLM-generated proactive messages based on conversation history")
-    print("   - Vector similarity search for contextual responses") 
-    print("   - Emotional pattern recognition and memory")
-    print("   - Cultural sensitivity with Indian context integration")
+        log.warning("⚠️ GEMINI_API_KEY not found in environment variables! The service will work with "
+                    "fallback responses, but AI functionality will be limited. Please add GEMINI_API_KEY "
+                    "to your .env file for full functionality.")
     
+    # The debug reloader runs this block in a watching parent too; only the serving child starts jobs
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_jobs()
     app.run(host='0.0.0.0', port=5010, debug=True)
\ No newline at end of file
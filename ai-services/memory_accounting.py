@@ -0,0 +1,192 @@
+"""Per-user memory accounting
+
+Estimates how many bytes each in-memory structure holds per user by walking
+the objects (sys.getsizeof on containers and strings, nbytes for numpy
+arrays, objects referenced twice by one user counted once). Walking every
+user on every poll would cost O(all conversation data), so per-user sizes
+are cached and only re-measured when the user's version changes (main
+passes the last interaction time and the care agent's state version) or
+changed() was called for them since (main calls it after writing a turn); a
+poll walks just the users whose data changed since the previous one.
+
+The report (totals per structure, the heaviest users, process RSS) is served
+at /debug/memory and drives main's memory budget eviction.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Only needed to size embedding vectors
+    np = None
+
+MEMORY_REPORT_TTL = float(os.environ.get('MEMORY_REPORT_TTL', 10))  # Seconds a report is reused
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate bytes held by an object and everything it references"""
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if np is not None and isinstance(current, np.ndarray):
+            total += sys.getsizeof(current) + (current.nbytes if current.base is None else 0)
+            continue
+        total += sys.getsizeof(current)
+        if isinstance(current, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, '__dict__'):
+            stack.append(vars(current))
+    return total
+
+def process_rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class MemoryAccountant:
+    def __init__(self, version_of: Callable[[str], Any] = lambda user_id: None):
+        # name -> getter returning {user_id: value}
+        self._per_user: Dict[str, Callable[[], Dict]] = {}
+        # name -> getter returning any object, sized as a whole
+        self._shared: Dict[str, Callable[[], Any]] = {}
+        self._version_of = version_of
+        self._user_cache: Dict[str, Tuple[Any, Dict[str, int]]] = {}  # user_id -> (version, bytes per structure)
+        self._changes: Dict[str, int] = {}  # user_id -> sequence number of the last changed() call
+        self._change_sequence = itertools.count(1)
+        self._report: Optional[Dict] = None
+        self._users: List[Dict] = []  # Every user of the last report, heaviest first
+        self._report_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'reports': 0, 'users_measured': 0, 'users_reused': 0}
+
+    def register_per_user(self, name: str, getter: Callable[[], Dict]) -> None:
+        """A dict keyed by user id; each entry is attributed to that user"""
+        self._per_user[name] = getter
+
+    def register_shared(self, name: str, getter: Callable[[], Any]) -> None:
+        """A structure that is not keyed by user; reported as a total only"""
+        self._shared[name] = getter
+
+    def changed(self, user_id: str) -> None:
+        """Mark a user's data as modified so the next report re-measures them (cheap, no lock)"""
+        self._changes[user_id] = next(self._change_sequence)
+
+    def _snapshot(self) -> Dict[str, Dict]:
+        snapshot = {}
+        for name, getter in self._per_user.items():
+            try:
+                snapshot[name] = dict(getter() or {})
+            except Exception:
+                snapshot[name] = {}
+        return snapshot
+
+    def _measure_user(self, user_id: str, snapshot: Dict[str, Dict]) -> Dict[str, int]:
+        for _ in range(3):
+            seen = set()
+            sizes = {}
+            try:
+                for name, entries in snapshot.items():
+                    if user_id in entries:
+                        sizes[name] = sys.getsizeof(user_id) + deep_sizeof(entries[user_id], seen)
+                return sizes
+            except RuntimeError:
+                continue  # A request thread resized one of the user's dicts mid-walk
+        return sizes
+
+    def _refresh(self, max_age: float) -> None:
+        if self._report is None or time.time() - self._report_at >= max_age:
+            self._report, self._users = self._build()
+            self._report_at = time.time()
+
+    def report(self, top: int = 20, max_age: float = MEMORY_REPORT_TTL) -> Dict:
+        """Bytes per structure and the heaviest users; reuses a recent report unless max_age is 0"""
+        with self._lock:
+            self._refresh(max_age)
+            return dict(self._report, top_users=self._users[:top])
+
+    def _build(self) -> Tuple[Dict, List[Dict]]:
+        started = time.perf_counter()
+        snapshot = self._snapshot()
+        user_ids = set()
+        for entries in snapshot.values():
+            user_ids.update(entries.keys())
+
+        users = []
+        per_structure = {name: 0 for name in snapshot}
+        for user_id in user_ids:
+            version = self._version_of(user_id)
+            if version is not None:
+                version = (version, self._changes.get(user_id))
+            cached = self._user_cache.get(user_id)
+            if cached is not None and version is not None and cached[0] == version:
+                sizes = cached[1]
+                self.stats['users_reused'] += 1
+            else:
+                sizes = self._measure_user(user_id, snapshot)
+                self._user_cache[user_id] = (version, sizes)
+                self.stats['users_measured'] += 1
+            for name, size in sizes.items():
+                per_structure[name] += size
+            users.append({'user_id': user_id, 'bytes': sum(sizes.values()), 'structures': sizes})
+        for user_id in list(self._user_cache):
+            if user_id not in user_ids:
+                del self._user_cache[user_id]
+        for user_id in list(self._changes):
+            if user_id not in user_ids:
+                self._changes.pop(user_id, None)
+
+        shared = {}
+        for name, getter in self._shared.items():
+            try:
+                shared[name] = deep_sizeof(getter())
+            except Exception:
+                shared[name] = 0
+
+        users.sort(key=lambda entry: entry['bytes'], reverse=True)
+        tracked = sum(per_structure.values()) + sum(shared.values())
+        self.stats['reports'] += 1
+        report = {
+            'tracked_bytes': tracked,
+            'per_user_structures': per_structure,
+            'shared_structures': shared,
+            'user_count': len(users),
+            'avg_bytes_per_user': sum(per_structure.values()) // len(users) if users else 0,
+            'process_rss_bytes': process_rss_bytes(),
+            'build_ms': round((time.perf_counter() - started) * 1000, 2),
+            'generated_at': time.time(),
+            'stats': dict(self.stats)
+        }
+        return report, users
+
+    def user_bytes(self, max_age: float = MEMORY_REPORT_TTL) -> Tuple[int, List[Dict]]:
+        """Tracked bytes and every user with their size, heaviest first (for eviction)"""
+        with self._lock:
+            self._refresh(max_age)
+            return self._report['tracked_bytes'], list(self._users)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Forget cached sizes (one user after their data changed outside a new interaction, or all)"""
+        with self._lock:
+            if user_id is None:
+                self._user_cache.clear()
+            else:
+                self._user_cache.pop(user_id, None)
+            self._report = None
+            self._users = []
@@ -0,0 +1,191 @@
+"""Prometheus-style service metrics
+
+In-process counters and latency histograms rendered in the Prometheus text
+exposition format at /metrics. Recording a value is a dict lookup, a bisect
+and an add under a per-metric lock, so timing every request and pipeline
+stage costs microseconds. Counts that components already keep (TTS cache,
+proactive queue) are read through callbacks at scrape time rather than
+being counted twice on the hot path.
+
+Values are per process: under the pre-fork server each worker exposes its
+own /metrics.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import g, has_request_context
+
+from tracing import span
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+# Seconds; spans keyword checks (ms) through LLM calls and chunked synthesis (tens of s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callbacks: List[Callable[[], Dict[Tuple[str, ...], float]]] = []
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def add_callback(self, callback: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        """Merge counts kept elsewhere into this counter when it is scraped"""
+        self._callbacks.append(callback)
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            values = dict(self._values)
+        for callback in self._callbacks:
+            try:
+                for labelvalues, value in callback().items():
+                    values[labelvalues] = values.get(labelvalues, 0.0) + value
+            except Exception as e:
+                log.warning("⚠️ Metrics callback failed", metric=self.name, error=str(e))
+        return values
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+        for labelvalues, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'mindcare_request_duration_seconds', 'HTTP request latency by endpoint', ('endpoint', 'method'))
+REQUESTS = registry.counter(
+    'mindcare_requests_total', 'HTTP requests by endpoint and status code', ('endpoint', 'status'))
+STAGE_LATENCY = registry.histogram(
+    'mindcare_stage_duration_seconds', 'Latency of chat pipeline stages (stages may nest)', ('stage',))
+FALLBACKS = registry.counter(
+    'mindcare_fallbacks_total', 'Responses served from a fallback path, by reason', ('reason',))
+PROACTIVE_TEMPLATES = registry.counter(
+    'mindcare_proactive_templates_total', 'Template proactive messages served by design, not as a fallback',
+    ('mode',))
+RATE_LIMITED = registry.counter(
+    'mindcare_rate_limited_total', 'Requests rejected by the rate limiter', ('endpoint',))
+CACHE_REQUESTS = registry.counter(
+    'mindcare_cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result'))
+MEMORY_EVICTIONS = registry.counter(
+    'mindcare_memory_evictions_total', 'Users whose in-memory data was evicted to stay within MEMORY_BUDGET_MB')
+LLM_TOKENS = registry.counter(
+    'mindcare_llm_tokens_total', 'LLM tokens by endpoint, model and kind (prompt or completion)',
+    ('endpoint', 'model', 'kind'))
+
+def observe_request(endpoint: str, method: str, status: int, elapsed: Optional[float]) -> None:
+    if elapsed is not None:
+        REQUEST_LATENCY.observe(elapsed, endpoint, method)
+    REQUESTS.inc(endpoint, str(status))
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage into the stage histogram, the current request's timings and its trace"""
+    started = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_LATENCY.observe(elapsed, name)
+        if has_request_context():
+            timings = g.setdefault('stage_timings', {})
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+def stage_timings(total_since: Optional[float] = None) -> Dict[str, float]:
+    """Stage durations recorded so far in this request, in seconds, for response payloads"""
+    timings = dict(g.get('stage_timings', {})) if has_request_context() else {}
+    result = {f"{name}_time": round(seconds, 4) for name, seconds in timings.items()}
+    if total_since is not None:
+        result['total_time'] = round(time.time() - total_since, 4)
+    return result
+
+def stats_callback(stats_source: Callable[[], Dict], cache_name: str) -> Callable[[], Dict[Tuple[str, ...], float]]:
+    """Adapt a component's {'hits': n, 'misses': m} stats into CACHE_REQUESTS samples"""
+    def collect():
+        stats = stats_source() or {}
+        return {(cache_name, 'hit'): stats.get('hits', 0), (cache_name, 'miss'): stats.get('misses', 0)}
+    return collect
@@ -1,41 +1,115 @@
 import os
+import time
+from typing import Optional
 from dotenv import load_dotenv
 from murf import Murf
 from murf.core.api_error import ApiError
+from murf.environment import MurfEnvironment
+from tts_cache import TTSCache
+from audio_store import AudioStore
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+# Murf audio file URLs expire after 72 hours; stop serving cached URLs a little earlier
+MURF_AUDIO_URL_TTL = 71 * 3600
+MURF_BACKEND = os.environ.get('MURF_BACKEND', 'murf')  # 'local' uses the offline stand-in
+MURF_BASE_URL = os.environ.get('MURF_BASE_URL', '')  # Alternative API host, e.g. benchmarks/standin_server.py
 
 class MurfTTSService:
-    def __init__(self):
+    def __init__(self, cache: Optional[TTSCache] = None, audio_store: Optional[AudioStore] = None):
+        self.cache = cache
+        self.audio_store = audio_store
+
         # Load environment variables
         load_dotenv()
         load_dotenv('c:\\Users\\rohit\\Desktop\\mentalHealth\\.env')
         
-        print("🔧 MurfTTSService initializing...")
         self.api_key = os.getenv('MURF_API_KEY')
-        print(f"🔑 MURF_API_KEY found: {'Yes' if self.api_key else 'No'}")
+        log.info("🔧 MurfTTSService initializing", api_key_configured=bool(self.api_key))
+        
+        # Character quota reported by the last Murf response (None until the first call)
+        self.remaining_characters: Optional[int] = None
+        self.quota_updated_at: Optional[float] = None
         
-        if not self.api_key:
-            print("❌ Warning: MURF_API_KEY not found in environment variables")
+        if MURF_BACKEND == 'local':
+            from local_murf import LocalMurf
+            log.info("🧪 Using local Murf stand-in (MURF_BACKEND=local)")
+            self.client = LocalMurf()
+        elif not self.api_key:
+            log.warning("❌ MURF_API_KEY not found in environment variables")
             self.client = None
         else:
-            print("✅ Initializing Murf client with API key")
-            self.client = Murf(api_key=self.api_key)
+            log.info("✅ Initializing Murf client with API key", base_url=MURF_BASE_URL or None)
+            if MURF_BASE_URL:
+                environment = MurfEnvironment(base=MURF_BASE_URL.rstrip('/'),
+                                              production=MurfEnvironment.DEFAULT.production)
+                self.client = Murf(api_key=self.api_key, environment=environment)
+            else:
+                self.client = Murf(api_key=self.api_key)
+    
+    def _update_quota(self, remaining: Optional[int]) -> None:
+        """Record the character quota reported by Murf"""
+        if remaining is None:
+            return
+        self.remaining_characters = remaining
+        self.quota_updated_at = time.time()
+        log.debug("📊 Murf quota updated", remaining_characters=remaining)
+    
+    def _store_audio(self, audio_url: Optional[str]) -> Optional[str]:
+        """Fetch synthesized audio into the local store, returning its hash (None on failure)"""
+        if not self.audio_store or not audio_url:
+            return None
+        try:
+            return self.audio_store.fetch(audio_url)
+        except Exception as e:
+            log.warning("⚠️ Could not store audio locally, using Murf URL", error=str(e))
+            return None
     
-    def generate_speech(self, text: str, voice_id: str = "en-US-natalie") -> dict:
+    def _audio_available(self, cached: dict) -> bool:
+        """Whether a cached result's locally stored audio still exists (URL-only results expire instead)"""
+        audio_hash = cached.get('audio_hash')
+        return not audio_hash or bool(self.audio_store and self.audio_store.contains(audio_hash))
+    
+    def is_cached(self, text: str, voice_id: str = "en-US-natalie",
+                  audio_format: str = "MP3", sample_rate: float = 44100.0, min_ttl: float = 0) -> bool:
+        """Check whether playable speech for this text is in the cache (and not expiring within min_ttl seconds)"""
+        if not self.cache:
+            return False
+        return self.cache.contains(TTSCache.make_key(text, voice_id, audio_format, sample_rate),
+                                   is_valid=self._audio_available, min_ttl=min_ttl)
+    
+    def generate_speech(self, text: str, voice_id: str = "en-US-natalie",
+                        audio_format: str = "MP3", sample_rate: float = 44100.0, refresh: bool = False) -> dict:
         """
         Generate speech using Murf AI TTS
         
         Args:
             text (str): Text to convert to speech
             voice_id (str): Voice ID to use (default: en-US-natalie)
+            audio_format (str): Output audio format (default: MP3)
+            sample_rate (float): Output sample rate (default: 44100)
+            refresh (bool): Synthesize again even if cached, replacing the cache entry
             
         Returns:
             dict: Response containing audio file URL or error message
         """
-        print(f"🎤 Generating speech for text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
-        print(f"🗣️ Using voice: {voice_id}")
+        log.debug("🎤 Generating speech", text=text, voice_id=voice_id)
+        
+        # Serve identical requests from the cache without touching the network
+        cache_key = TTSCache.make_key(text, voice_id, audio_format, sample_rate)
+        if self.cache and not refresh:
+            # Entries whose stored audio was evicted count as misses and are dropped
+            cached = self.cache.get(cache_key, is_valid=self._audio_available)
+            if cached and cached.get('audio_hash'):
+                # Locally stored audio: serve our own URL
+                cached['audio_url'] = self.audio_store.url_for(cached['audio_hash'])
+            if cached:
+                log.debug("🎯 TTS cache hit", cache_key=cache_key[:12])
+                return dict(cached, cached=True)
         
         if not self.client:
-            print("❌ Murf client not initialized (API key missing)")
+            log.error("❌ Murf client not initialized (API key missing)")
             return {
                 'success': False,
                 'error': 'Murf API key not configured',
@@ -43,34 +117,59 @@ class MurfTTSService:
             }
         
         try:
-            print("📡 Making request to Murf API...")
             response = self.client.text_to_speech.generate(
                 text=text,
                 voice_id=voice_id,
-                format="MP3",
-                sample_rate=44100.0
+                format=audio_format,
+                sample_rate=sample_rate
             )
             
-            print("✅ Murf API response received successfully")
-            print(f"🎵 Audio file URL: {response.audio_file}")
-            print(f"⏱️ Audio length: {response.audio_length_in_seconds}s")
+            log.info("✅ Murf API response received", audio_seconds=response.audio_length_in_seconds,
+                     text_chars=len(text), remaining_characters=response.remaining_character_count)
             
-            return {
+            result = {
                 'success': True,
                 'audio_url': response.audio_file,
                 'audio_length': response.audio_length_in_seconds,
                 'remaining_characters': response.remaining_character_count
             }
+            self._update_quota(response.remaining_character_count)
+            
+            # Keep a local copy so replays never depend on Murf's expiring URL
+            expires_at = time.time() + MURF_AUDIO_URL_TTL
+            audio_hash = self._store_audio(response.audio_file)
+            if audio_hash:
+                result['audio_url'] = self.audio_store.url_for(audio_hash)
+                result['audio_hash'] = audio_hash
+                expires_at = None
+            
+            if self.cache:
+                try:
+                    self.cache.put(
+                        cache_key,
+                        {k: v for k, v in result.items() if k != 'remaining_characters'},
+                        text_chars=len(text),
+                        voice_id=voice_id,
+                        audio_format=audio_format,
+                        sample_rate=sample_rate,
+                        expires_at=expires_at
+                    )
+                except Exception as e:
+                    log.warning("⚠️ Could not cache TTS result", error=str(e))
+            
+            return dict(result, cached=False)
             
         except ApiError as e:
-            print(f"❌ Murf API error: {e.status_code} - {e.body}")
+            log.error("❌ Murf API error", status_code=e.status_code, error=str(e.body))
+            if e.status_code == 402:
+                self._update_quota(0)
             return {
                 'success': False,
                 'error': f'Murf API error: {e.status_code}',
                 'message': str(e.body)
             }
         except Exception as e:
-            print(f"❌ Unexpected error: {str(e)}")
+            log.exception("❌ Unexpected Murf error")
             return {
                 'success': False,
                 'error': 'Unexpected error',
@@ -6,6 +6,9 @@ import os
 import psycopg2
 from typing import Dict, List, Union
 from dotenv import load_dotenv
+from service_logging import get_logger
+
+log = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -59,7 +62,7 @@ def get_user_preferences(user_id: str) -> Dict:
                         'preferred_support_context': result[11]
                     }
     except Exception as e:
-        print(f"Database connection failed: {e}, using default preferences")
+        log.warning("Database connection failed, using default preferences", error=str(e))
         return None
     return None
 
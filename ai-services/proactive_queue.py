@@ -0,0 +1,244 @@
+"""Precomputed proactive messages
+
+Generates the next likely proactive check-in for a user in the background
+(when they go idle or end a session) so /proactive_chat can serve it without
+waiting on the LLM. Entries are keyed by starter type and support context and
+are dropped as soon as new conversation data arrives for the user.
+A message is generated at most once per version of a user's conversation data,
+so dormant users cost nothing after their first precompute, and failed
+generations are retried with exponential backoff.
+
+The generator returns a personalized message, None when it has nothing to
+offer (no LLM, or the user's token budget is spent) and raises when the LLM
+fails. Templates are never stored: None backs off for that user only, while
+raised errors also count towards the streak that pauses all generation.
+
+When nothing is precomputed, ProactiveUpgradeChannel supports a progressive
+mode: a template is served immediately and the personalized message is pushed
+later, or dropped if the user has already typed.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+PROACTIVE_QUEUE_TTL = 86400 * 7  # Precomputed messages older than a week are discarded
+PROACTIVE_RETRY_BASE = 300  # First retry of a failed generation after 5 minutes, doubling per failure
+PROACTIVE_RETRY_MAX = 86400
+PROACTIVE_FAILURE_STREAK = 5  # Consecutive failures (any user) that pause all generation
+PROACTIVE_FAILURE_PAUSE = 600
+
+class ProactiveMessageQueue:
+    def __init__(self, generate_fn: Callable[[str, str, str], Optional[str]], max_workers: int = 2,
+                 ttl_seconds: float = PROACTIVE_QUEUE_TTL):
+        self.generate_fn = generate_fn
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict] = {}  # user_id -> precomputed message
+        self._versions: Dict[str, int] = {}  # user_id -> conversation data version
+        self._attempts: Dict[str, Dict] = {}  # user_id -> last generation for the current version
+        self._pending = set()
+        self._failure_streak = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='proactive')
+        self.stats = {'hits': 0, 'misses': 0, 'generated': 0, 'invalidated': 0, 'failed': 0, 'skipped': 0}
+
+    def has_entry(self, user_id: str) -> bool:
+        """Whether a fresh message is queued or being generated for the user"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            fresh = entry is not None and time.time() - entry['generated_at'] < self.ttl_seconds
+            return fresh or user_id in self._pending
+
+    def schedule(self, user_id: str, starter_type: str, support_context: str = 'general') -> bool:
+        """Queue background generation of the user's next proactive message.
+
+        Nothing is queued when a message was already generated for this version
+        of the user's data (even if it was since served or expired), while a
+        failed generation is backing off, or while generation is paused after a
+        streak of failures.
+        """
+        now = time.time()
+        with self._lock:
+            if user_id in self._pending or now < self._paused_until:
+                return False
+            version = self._versions.get(user_id, 0)
+            attempt = self._attempts.get(user_id)
+            if attempt and attempt['version'] == version:
+                if attempt['failures']:
+                    if now < attempt['retry_at']:
+                        return False
+                elif attempt['starter_type'] == starter_type and attempt['support_context'] == support_context:
+                    return False
+            self._pending.add(user_id)
+
+        self._executor.submit(self._generate, user_id, starter_type, support_context, version)
+        return True
+
+    def _generate(self, user_id: str, starter_type: str, support_context: str, version: int) -> None:
+        """Generate and store a message unless the user's data changed meanwhile"""
+        message = None
+        errored = False
+        try:
+            message = self.generate_fn(user_id, starter_type, support_context)
+        except Exception as e:
+            errored = True
+            log.error("Error precomputing proactive message", user_id=user_id, error=str(e))
+        finally:
+            with self._lock:
+                self._pending.discard(user_id)
+                self._record_attempt(user_id, starter_type, support_context, version, bool(message), errored)
+                if message and self._versions.get(user_id, 0) == version:
+                    self._entries[user_id] = {
+                        'starter_type': starter_type,
+                        'support_context': support_context,
+                        'message': message,
+                        'generated_at': time.time()
+                    }
+                    self.stats['generated'] += 1
+
+    def _record_attempt(self, user_id: str, starter_type: str, support_context: str, version: int,
+                        succeeded: bool, errored: bool = False) -> None:
+        """Remember the generation for this data version and set up backoff (caller holds the lock)"""
+        if succeeded:
+            self._failure_streak = 0
+            failures = 0
+        else:
+            if not errored:
+                self.stats['skipped'] += 1  # Nothing to generate for this user right now, not an outage
+            else:
+                self.stats['failed'] += 1
+                self._failure_streak += 1
+                if self._failure_streak >= PROACTIVE_FAILURE_STREAK:
+                    self._paused_until = time.time() + PROACTIVE_FAILURE_PAUSE
+                    log.warning("⚠️ Pausing proactive precompute after repeated failures",
+                                failures=self._failure_streak, pause_seconds=PROACTIVE_FAILURE_PAUSE)
+            previous = self._attempts.get(user_id)
+            failures = (previous['failures'] if previous else 0) + 1
+        self._attempts[user_id] = {
+            'version': version,
+            'starter_type': starter_type,
+            'support_context': support_context,
+            'failures': failures,
+            'retry_at': time.time() + min(PROACTIVE_RETRY_BASE * 2 ** (failures - 1), PROACTIVE_RETRY_MAX)
+        }
+
+    def take(self, user_id: str, starter_type: str, support_context: str = 'general') -> Optional[str]:
+        """Pop the precomputed message if it matches the requested starter and context"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if (entry and entry['starter_type'] == starter_type
+                    and entry['support_context'] == support_context
+                    and time.time() - entry['generated_at'] < self.ttl_seconds):
+                del self._entries[user_id]
+                self.stats['hits'] += 1
+                return entry['message']
+            self.stats['misses'] += 1
+            return None
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop queued messages after new conversation data arrives"""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            if self._entries.pop(user_id, None) is not None:
+                self.stats['invalidated'] += 1
+
+    def forget(self, user_id: str) -> None:
+        """Remove all queue state for a user"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._versions.pop(user_id, None)
+            self._attempts.pop(user_id, None)
+
+PROACTIVE_UPGRADE_TTL = 300  # Upgrades nobody collected are purged after 5 minutes
+
+class ProactiveUpgradeChannel:
+    """Personalized messages generated after an instant template was served"""
+
+    def __init__(self, generate_fn: Callable[[str, str, str], Optional[str]], max_workers: int = 2,
+                 ttl_seconds: float = PROACTIVE_UPGRADE_TTL):
+        self.generate_fn = generate_fn
+        self.ttl_seconds = ttl_seconds
+        self._upgrades: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='proactive-upgrade')
+        self.stats = {'started': 0, 'delivered': 0, 'dropped': 0}
+
+    def start(self, user_id: str, starter_type: str, support_context: str = 'general') -> str:
+        """Begin generating the personalized message and return its upgrade id"""
+        upgrade_id = uuid.uuid4().hex
+        with self._lock:
+            self._purge_expired()
+            self._upgrades[upgrade_id] = {
+                'user_id': user_id,
+                'starter_type': starter_type,
+                'support_context': support_context,
+                'status': 'pending',
+                'message': None,
+                'created_at': time.time(),
+                'ready': threading.Event()
+            }
+            self.stats['started'] += 1
+
+        self._executor.submit(self._generate, upgrade_id)
+        return upgrade_id
+
+    def _generate(self, upgrade_id: str) -> None:
+        """Generate the message unless the upgrade was dropped meanwhile (no message means 'failed',
+        so the client keeps the template it already shows)"""
+        with self._lock:
+            upgrade = self._upgrades.get(upgrade_id)
+            if upgrade is None or upgrade['status'] != 'pending':
+                return
+            user_id, starter_type, support_context = \
+                upgrade['user_id'], upgrade['starter_type'], upgrade['support_context']
+        try:
+            message = self.generate_fn(user_id, starter_type, support_context)
+        except Exception as e:
+            log.error("Error generating proactive upgrade", user_id=user_id, error=str(e))
+            message = None
+
+        with self._lock:
+            if upgrade['status'] == 'pending':
+                upgrade['status'] = 'ready' if message else 'failed'
+                upgrade['message'] = message
+            upgrade['ready'].set()
+
+    def drop_user(self, user_id: str) -> int:
+        """Cancel pending upgrades once the user has started typing"""
+        dropped = 0
+        with self._lock:
+            for upgrade in self._upgrades.values():
+                if upgrade['user_id'] == user_id and upgrade['status'] in ('pending', 'ready'):
+                    upgrade['status'] = 'dropped'
+                    upgrade['ready'].set()
+                    dropped += 1
+            self.stats['dropped'] += dropped
+        return dropped
+
+    def wait(self, upgrade_id: str, timeout: float) -> Optional[Dict]:
+        """Block until the upgrade resolves or the timeout passes"""
+        with self._lock:
+            upgrade = self._upgrades.get(upgrade_id)
+        if upgrade is None:
+            return None
+        upgrade['ready'].wait(timeout)
+
+        with self._lock:
+            result = {k: v for k, v in upgrade.items() if k != 'ready'}
+            if upgrade['status'] in ('ready', 'dropped', 'failed'):
+                self._upgrades.pop(upgrade_id, None)
+                if upgrade['status'] == 'ready':
+                    self.stats['delivered'] += 1
+        return result
+
+    def _purge_expired(self) -> None:
+        """Remove upgrades nobody collected (caller holds the lock)"""
+        cutoff = time.time() - self.ttl_seconds
+        for upgrade_id in [k for k, v in self._upgrades.items() if v['created_at'] < cutoff]:
+            del self._upgrades[upgrade_id]
@@ -0,0 +1,158 @@
+"""On-demand request profiling
+
+A request is profiled with cProfile when it carries the admin header
+(X-Profile: <PROFILE_ADMIN_TOKEN>) or is picked by PROFILE_SAMPLE_RATE.
+Other requests only pay for a header lookup and, when sampling is on, one
+random draw. Only one request per process is profiled at a time, so a burst
+of profiled traffic cannot pile profiler overhead onto every worker thread.
+
+Each profile is written to PROFILE_DIR as a .prof file (load it with pstats
+or snakeviz) next to a .json summary with the request's endpoint, trace id,
+duration and hottest functions. The directory is capped at PROFILE_MAX_FILES
+profiles, oldest removed first, and listed at /debug/profiles.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN', '')  # Header profiling is off while unset
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # Fraction of requests, 0 disables
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))
+PROFILE_HEADER = 'X-Profile'
+PROFILE_TOP_FUNCTIONS = 25  # Hottest functions kept in the JSON summary
+PROFILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+_active = threading.Lock()  # Held while a request is being profiled
+stats = {'profiled': 0, 'skipped_busy': 0, 'write_errors': 0}
+
+def should_profile(headers) -> Optional[str]:
+    """Why this request should be profiled ('header' or 'sampled'), or None"""
+    if PROFILE_ADMIN_TOKEN and headers.get(PROFILE_HEADER) == PROFILE_ADMIN_TOKEN:
+        return 'header'
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return 'sampled'
+    return None
+
+def start(reason: str) -> Optional[cProfile.Profile]:
+    """Enable a profiler for the current thread, or None if another request is being profiled"""
+    if not _active.acquire(blocking=False):
+        stats['skipped_busy'] += 1
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except Exception:
+        _active.release()  # Another profiler (a debugger, coverage) already owns the hook
+        raise
+    profiler.reason = reason
+    return profiler
+
+def stop(profiler: cProfile.Profile) -> None:
+    """Disable the profiler without saving it (the request failed before it could be finished)"""
+    try:
+        profiler.disable()
+    finally:
+        _active.release()
+
+def finish(profiler: cProfile.Profile, endpoint: str, trace_id: Optional[str], duration: float,
+           status: int, directory: str = PROFILE_DIR) -> Optional[str]:
+    """Disable the profiler, write the profile and its summary, and return the profile id"""
+    stop(profiler)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{(trace_id or 'untraced')[:12]}"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(directory, f"{profile_id}.prof"))
+        summary = {
+            'profile_id': profile_id,
+            'endpoint': endpoint,
+            'trace_id': trace_id,
+            'reason': profiler.reason,
+            'status': status,
+            'duration_ms': round(duration * 1000, 2),
+            'created_at': time.time(),
+            'pid': os.getpid(),
+            'top_functions': top_functions(profiler)
+        }
+        with open(os.path.join(directory, f"{profile_id}.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        stats['profiled'] += 1
+        _enforce_limit(directory)
+        return profile_id
+    except OSError as e:
+        stats['write_errors'] += 1
+        log.warning("⚠️ Could not save request profile", profile_id=profile_id, error=str(e))
+        return None
+
+def top_functions(profiler: cProfile.Profile, limit: int = PROFILE_TOP_FUNCTIONS) -> List[Dict]:
+    """Functions with the most cumulative time"""
+    profile_stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in profile_stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(filename)}:{line}({function})",
+            'calls': calls,
+            'own_ms': round(own * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3)
+        })
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+def _enforce_limit(directory: str) -> None:
+    """Remove the oldest profiles beyond PROFILE_MAX_FILES"""
+    summaries = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    for name in summaries[:max(0, len(summaries) - PROFILE_MAX_FILES)]:
+        for path in (os.path.join(directory, name), os.path.join(directory, name[:-5] + '.prof')):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def list_profiles(limit: int = 50, directory: str = PROFILE_DIR) -> List[Dict]:
+    """Saved profile summaries, newest first, without their function tables"""
+    if not os.path.isdir(directory):
+        return []
+    result = []
+    for name in sorted((n for n in os.listdir(directory) if n.endswith('.json')), reverse=True)[:limit]:
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            continue  # Removed or half-written by another worker
+        summary.pop('top_functions', None)
+        result.append(summary)
+    return result
+
+def profile_path(profile_id: str, directory: str = PROFILE_DIR) -> Optional[str]:
+    """Path of a saved .prof file, None for unknown or malformed ids"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(directory, f"{profile_id}.prof")
+    return path if os.path.exists(path) else None
+
+def load_summary(profile_id: str, directory: str = PROFILE_DIR) -> Optional[Dict]:
+    if not profile_path(profile_id, directory):
+        return None
+    with open(os.path.join(directory, f"{profile_id}.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+def render_text(profile_id: str, sort: str = 'cumulative', limit: int = 60, directory: str = PROFILE_DIR) -> Optional[str]:
+    """pstats report of a saved profile"""
+    path = profile_path(profile_id, directory)
+    if not path:
+        return None
+    output = io.StringIO()
+    pstats.Stats(path, stream=output).strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
@@ -0,0 +1,212 @@
+"""Structured, non-blocking logging for the AI service
+
+Modules get a logger with get_logger(__name__) and pass context as keyword
+fields instead of interpolating it into the message:
+
+    log.info("chat reply generated", user_id=user_id, reply_chars=len(reply))
+
+Records go through a bounded queue to a listener thread that does the
+formatting and stdout I/O, so request threads never block on the console;
+when the queue is full records are dropped and counted rather than waited on.
+
+Fields named like user content (message, response, text, prompt, ...) are
+replaced by their length unless LOG_INCLUDE_CONTENT=true, and e-mail
+addresses and phone numbers are masked in every message. INFO and DEBUG
+records can be sampled with LOG_SAMPLE_RATE, or per call with sample_rate=.
+
+Environment:
+    LOG_LEVEL            DEBUG, INFO (default), WARNING, ERROR
+    LOG_FORMAT           text (default) or json
+    LOG_SAMPLE_RATE      fraction of INFO/DEBUG records kept (default 1.0)
+    LOG_QUEUE_SIZE       records buffered before dropping (default 10000)
+    LOG_INCLUDE_CONTENT  log user content fields verbatim (default false)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+LOG_INCLUDE_CONTENT = os.environ.get('LOG_INCLUDE_CONTENT', 'false').lower() == 'true'
+
+# Field names whose values are user or model content
+REDACTED_FIELDS = {
+    'message', 'messages', 'response', 'reply', 'text', 'content', 'prompt', 'body', 'payload',
+    'history', 'condition_description', 'email', 'phone', 'name'
+}
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+PHONE_PATTERN = re.compile(r'(?<!\w)\+?\d[\d\s-]{8,}\d(?!\w)')
+MAX_FIELD_CHARS = 300  # Longer non-content field values are truncated
+QUIET_LOGGERS = ('httpx', 'httpcore', 'urllib3', 'sentence_transformers')  # Per-request INFO noise
+
+_STANDARD_KWARGS = {'exc_info', 'stack_info', 'stacklevel', 'extra'}
+stats = {'dropped': 0, 'sampled_out': 0}
+
+_trace_id_getter = None
+
+def _current_trace_id() -> Optional[str]:
+    global _trace_id_getter
+    if _trace_id_getter is None:
+        from tracing import current_trace_id  # Imported late, tracing itself logs through this module
+        _trace_id_getter = current_trace_id
+    return _trace_id_getter()
+
+def redact(value: Any) -> Any:
+    """Replace content with a length marker"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, dict, str)):
+        return f"<redacted {len(value)}>"
+    return '<redacted>'
+
+def mask_text(text: str) -> str:
+    return PHONE_PATTERN.sub('<phone>', EMAIL_PATTERN.sub('<email>', text))
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger that turns keyword arguments into structured fields"""
+
+    def process(self, msg, kwargs):
+        fields = {k: kwargs.pop(k) for k in list(kwargs) if k not in _STANDARD_KWARGS}
+        extra = kwargs.setdefault('extra', {})
+        if 'sample_rate' in fields:
+            extra['sample_rate'] = fields.pop('sample_rate')
+        extra['fields'] = fields
+        return msg, kwargs
+
+class ContextFilter(logging.Filter):
+    """Sample low-severity records, attach the trace id and redact content fields"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.INFO:
+            rate = getattr(record, 'sample_rate', LOG_SAMPLE_RATE)
+            if rate < 1.0 and random.random() >= rate:
+                stats['sampled_out'] += 1
+                return False
+
+        if not hasattr(record, 'trace_id'):
+            record.trace_id = _current_trace_id()
+
+        fields = getattr(record, 'fields', None)
+        if fields and not LOG_INCLUDE_CONTENT:
+            record.fields = {k: redact(v) if k in REDACTED_FIELDS else v for k, v in fields.items()}
+        return True
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the caller"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here, while the caller's objects are still alive.
+        # This is the only handler, so the record is updated in place rather than copied.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            stats['dropped'] += 1
+
+def _format_field(value: Any) -> str:
+    if isinstance(value, str):
+        text = value if len(value) <= MAX_FIELD_CHARS else value[:MAX_FIELD_CHARS] + '...'
+        return json.dumps(text, ensure_ascii=False) if (' ' in text or not text) else text
+    return json.dumps(value, default=str, ensure_ascii=False)[:MAX_FIELD_CHARS]
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        parts = [
+            time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            f"{record.levelname:<7}",
+            record.name
+        ]
+        if getattr(record, 'trace_id', None):
+            parts.append(f"[{record.trace_id[:12]}]")
+        parts.append(mask_text(record.getMessage()))
+        fields = getattr(record, 'fields', None) or {}
+        line = ' '.join(parts)
+        if fields:
+            line += ' ' + ' '.join(f"{k}={_format_field(v)}" for k, v in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': mask_text(record.getMessage())
+        }
+        if getattr(record, 'trace_id', None):
+            entry['trace_id'] = record.trace_id
+        for key, value in (getattr(record, 'fields', None) or {}).items():
+            entry.setdefault(key, value)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+_setup_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+def _start_listener() -> None:
+    """Create the queue and its consumer thread (again in a forked child)"""
+    global _listener
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == 'json' else TextFormatter())
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+
+def setup_logging() -> None:
+    """Route the root logger through the queue; safe to call more than once"""
+    global _queue_handler
+    with _setup_lock:
+        if _queue_handler is not None:
+            return
+        _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+        _queue_handler.addFilter(ContextFilter())
+        _start_listener()
+
+        root = logging.getLogger()
+        root.setLevel(LOG_LEVEL)
+        root.addHandler(_queue_handler)
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+        atexit.register(flush_logging)
+        # The listener thread does not survive fork (pre-fork server workers)
+        os.register_at_fork(after_in_child=_start_listener)
+
+def flush_logging() -> None:
+    """Drain the queue and stop the listener thread"""
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except Exception:
+            pass
+
+def get_logger(name: str) -> StructuredLogger:
+    setup_logging()
+    return StructuredLogger(logging.getLogger(name), {})
+
+def get_stats() -> Dict:
+    queue_size = _queue_handler.queue.qsize() if _queue_handler is not None else 0
+    return dict(stats, queued=queue_size, level=LOG_LEVEL, sample_rate=LOG_SAMPLE_RATE)
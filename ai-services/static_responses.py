@@ -0,0 +1,92 @@
+"""Static user-facing responses
+
+Fixed strings served when the LLM is unavailable or a request fails, plus the
+legacy proactive starters. Kept in one place so they can be pre-synthesized
+into the TTS cache (see tts_warmup.py).
+"""
+
+# Proactive conversation starters based on emotional context - DEPRECATED
+# These are now replaced by LLM-generated responses based on vector context
+PROACTIVE_STARTERS = {
+    'first_time': [
+        "नमस्ते! Welcome to MindCare. I'm here to listen and support you. How has your heart been feeling today?",
+        "Hello! I'm so glad you're here. Sometimes it takes courage to reach out. What's been on your mind lately?",
+        "Welcome! I'm here to create a safe space for you. Would you like to share what brought you here today?"
+    ],
+    'returning_positive': [
+        "It's wonderful to see you again! How are you feeling since our last conversation?",
+        "Welcome back! I've been thinking about our previous chat. How have things been unfolding for you?",
+        "Good to see you here again. What emotions have been visiting you since we last talked?"
+    ],
+    'returning_concerned': [
+        "I'm glad you came back. I was thinking about what you shared before. How are you processing everything?",
+        "It's really good that you're here again. How has your heart been since our last conversation?",
+        "I'm here for you. After what you shared last time, I wanted to check in - how are you feeling right now?"
+    ],
+    'check_in': [
+        "How are you feeling in this moment? Sometimes it helps to pause and notice what's happening inside.",
+        "I'd love to hear what's been in your heart lately. What emotions have been present for you?",
+        "Take a breath with me. What's been weighing on your mind or bringing you joy recently?"
+    ]
+}
+
+# Proactive check-ins used when the LLM is unavailable, by support context and starter type
+PROACTIVE_FALLBACK_MESSAGES = {
+    'general': {
+        'first_time': "नमस्ते! Welcome to MindCare. I'm here to listen and support you. How are you feeling today? 🌟",
+        'returning_positive': "It's wonderful to see you again! How have you been since we last talked? 💙",
+        'returning_concerned': "I'm glad you're here. I've been thinking about you - how are you feeling right now? 🤗",
+        'check_in': "How is your heart today? I'm here if you'd like to share what's on your mind. ✨"
+    },
+    'academic': {
+        'first_time': "नमस्ते! Welcome to Academic Support. I understand the unique pressures students face - how has your academic journey been feeling lately? 📚✨",
+        'returning_positive': "Great to see you back! How have your studies been progressing since we last talked? 🌟",
+        'returning_concerned': "I'm here for you. Academic pressure can be overwhelming - how are you managing your studies and stress right now? 💙",
+        'check_in': "How is your academic life treating you today? Any study stress or career thoughts you'd like to share? 📖"
+    },
+    'family': {
+        'first_time': "नमस्ते! Welcome to Family Support. I know family relationships can be complex - how has your दिल (heart) been with family matters? 🏠💙",
+        'returning_positive': "Good to see you again! How have things been with your family since our last conversation? 🌸",
+        'returning_concerned': "I'm glad you're back. Family situations can be challenging - how are you feeling about things at home? 🤗",
+        'check_in': "How are things in your family world today? Any relationship dynamics you'd like to talk through? 💕"
+    }
+}
+
+# Chat replies used when Gemini is not configured, by support context
+CHAT_FALLBACK_RESPONSES = {
+    'general': [
+        "Everything will be okay. 🌟 I'm here to support you through whatever you're going through.",
+        "I hear you, and I want you to know that your feelings are valid. Take a deep breath with me. 💙",
+        "You're not alone in this. सब कुछ ठीक हो जाएगा (Everything will be fine). 🌈",
+        "Thank you for sharing with me. Your courage to reach out shows how strong you are. ✨"
+    ],
+    'academic': [
+        "Academic pressure can be overwhelming, but you're not alone in this journey. 📚💙",
+        "Your education is important, but so is your mental health. Take care of yourself. 🌟",
+        "Every student faces challenges. You have the strength to overcome this. पढ़ाई का stress होना normal है. ✨"
+    ],
+    'family': [
+        "Family relationships can be complex. Your feelings about this are completely valid. 🏠💙",
+        "I understand family dynamics can be challenging. You're doing your best. 🌸",
+        "Family matters touch our hearts deeply. Take time to process your emotions. 💕"
+    ]
+}
+
+# Chat replies used when the chat pipeline raises, by support context
+CHAT_ERROR_FALLBACK_RESPONSES = {
+    'general': [
+        "Everything will be okay. 🌟 I'm here to support you through whatever you're going through.",
+        "I hear you, and I want you to know that your feelings are valid. Take a deep breath with me. 💙",
+        "You're not alone in this. Every challenge you face is making you stronger. सब कुछ ठीक हो जाएगा (Everything will be fine). 🌈"
+    ],
+    'academic': [
+        "I understand academic pressure can be overwhelming. Let's take this one step at a time. 📚💙",
+        "Your education matters, but your well-being matters more. We'll work through this together. 🌟",
+        "Every student faces challenges. You have the strength to overcome this. पढ़ाई का stress होना normal है. ✨"
+    ],
+    'family': [
+        "Family relationships can be complex. Your feelings about this are completely valid. 🏠💙",
+        "I understand family dynamics can be challenging. Take a moment to breathe. 🌸",
+        "Family matters touch our hearts deeply. You're not alone in navigating this. दिल की बात समझती हूँ। 💕"
+    ]
+}
@@ -0,0 +1,29 @@
+"""Shared setup for the AI service unit tests
+
+These tests exercise single modules, or the app in-process with the fake LLM
+and embedding model from benchmarks/fakes.py, with no running server, API
+keys or models. Run them from ai-services with:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, os.path.join(SERVICE_DIR, 'benchmarks'))
+
+@pytest.fixture(scope='session')
+def main(tmp_path_factory):
+    """The service module, imported once with fakes in place of Gemini and the embedding model"""
+    from fakes import install_fakes
+
+    cwd = os.getcwd()
+    os.environ.setdefault('LOG_LEVEL', 'CRITICAL')
+    try:
+        yield install_fakes(workdir=str(tmp_path_factory.mktemp('service')))
+    finally:
+        os.chdir(cwd)
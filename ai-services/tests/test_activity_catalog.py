@@ -0,0 +1,56 @@
+"""Wellness activity catalog: keyword fallback until an index exists, never built on a request"""
+
+import pytest
+
+import activity_catalog
+from activity_catalog import ActivityCatalog
+from fakes import FakeEmbeddingModel
+
+class CountingEmbeddingModel(FakeEmbeddingModel):
+    def __init__(self):
+        super().__init__()
+        self.batches = 0
+
+    def encode(self, sentences, **kwargs):
+        if not isinstance(sentences, str):
+            self.batches += 1
+        return super().encode(sentences, **kwargs)
+
+@pytest.fixture
+def model():
+    return CountingEmbeddingModel()
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / 'activities.index.pkl')
+
+def test_retrieve_without_an_index_uses_keywords(model, index_path):
+    catalog = ActivityCatalog(model, index_path=index_path)
+    matches = catalog.retrieve("panic and anxiety before my exam, I need to calm my breathing", context='academic')
+
+    assert matches[0]['id'] == 'box-breathing-pranayama'
+    assert model.batches == 0
+    assert catalog.embeddings is None
+
+def test_retrieve_without_any_match_returns_nothing(model, index_path):
+    assert ActivityCatalog(model, index_path=index_path).retrieve("qwerty zxcvb") == []
+
+def test_an_index_built_elsewhere_is_picked_up(model, index_path, monkeypatch):
+    catalog = ActivityCatalog(model, index_path=index_path)
+    catalog.retrieve("stress")  # Looks for the index once, finds none
+
+    ActivityCatalog(model, index_path=index_path).ensure_index()  # Offline build
+    batches = model.batches
+    assert catalog.retrieve("stress") and catalog.embeddings is None  # Not looked for again yet
+
+    monkeypatch.setattr(activity_catalog, 'INDEX_RECHECK_INTERVAL', 0)
+    catalog.retrieve("stress")
+    assert catalog.embeddings is not None
+    assert model.batches == batches
+
+def test_wellness_activity_endpoint_recommends_from_the_catalog(main):
+    response = main.app.test_client().get('/wellness_activity?userId=activity-user&context=academic')
+    body = response.get_json()
+
+    assert response.status_code == 200 and body['success']
+    assert body['activity']['catalog_version'] == main.care_agent.activity_catalog.version
@@ -0,0 +1,67 @@
+"""Care agent event log: replay, snapshots and compaction"""
+
+import care_agent
+from care_agent import AICareAgent
+from care_agent_store import CareAgentStore, EVENT_INTERVENTION, EVENT_RISK
+
+def make_agent(db_path):
+    return AICareAgent(llm=None, embedding_model=None, store=CareAgentStore(str(db_path)))
+
+def event_count(store, user_id):
+    return store._conn.execute("SELECT COUNT(*) FROM care_agent_events WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+def test_state_is_replayed_after_restart(tmp_path):
+    agent = make_agent(tmp_path / 'state.db')
+    for risk in (1, 2, 4):
+        agent.track_risk_trends('u1', risk)
+    agent._record_event('u1', EVENT_INTERVENTION, {'type': 'check_in', 'timestamp': 100.0})
+
+    restarted = make_agent(tmp_path / 'state.db')
+    restarted._ensure_user_loaded('u1')
+
+    assert [entry['risk_level'] for entry in restarted.risk_trends['u1']['history']] == [1, 2, 4]
+    assert restarted.intervention_history['u1']['count'] == 1
+    assert restarted.intervention_history['u1']['last_time'] == 100.0
+
+def test_log_is_compacted_into_a_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(care_agent, 'SNAPSHOT_EVERY_EVENTS', 5)
+    agent = make_agent(tmp_path / 'state.db')
+    for index in range(12):
+        agent._record_event('u1', EVENT_INTERVENTION, {'type': 'check_in', 'timestamp': float(index)})
+
+    # Two compactions (after 5 and 10 events) leave only the two latest events in the log
+    assert event_count(agent.store, 'u1') == 2
+
+    restarted = make_agent(tmp_path / 'state.db')
+    restarted._ensure_user_loaded('u1')
+    assert restarted.intervention_history['u1'] == agent.intervention_history['u1']
+    assert restarted.intervention_history['u1']['count'] == 12
+
+def test_compaction_on_load_bounds_an_existing_log(tmp_path, monkeypatch):
+    store = CareAgentStore(str(tmp_path / 'state.db'))
+    for index in range(30):
+        store.append('u1', EVENT_RISK, {'risk_level': index % 5, 'timestamp': float(index)})
+
+    monkeypatch.setattr(care_agent, 'SNAPSHOT_EVERY_EVENTS', 10)
+    agent = AICareAgent(llm=None, embedding_model=None, store=store)
+    agent._ensure_user_loaded('u1')
+
+    assert event_count(store, 'u1') == 0
+    assert len(agent.risk_trends['u1']['history']) == 10
+
+def test_snapshot_is_refused_when_another_process_wrote_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(care_agent, 'SNAPSHOT_EVERY_EVENTS', 3)
+    db_path = str(tmp_path / 'state.db')
+    agent = make_agent(db_path)
+    agent._record_event('u1', EVENT_RISK, {'risk_level': 1, 'timestamp': 1.0})
+
+    other_process = CareAgentStore(db_path)
+    other_process.append('u1', EVENT_RISK, {'risk_level': 5, 'timestamp': 2.0})
+
+    agent._record_event('u1', EVENT_RISK, {'risk_level': 2, 'timestamp': 3.0})
+    agent._record_event('u1', EVENT_RISK, {'risk_level': 3, 'timestamp': 4.0})
+
+    # The other process's event was not lost; the agent reloaded it instead of snapshotting over it
+    assert [entry['risk_level'] for entry in agent.risk_trends['u1']['history']] == [1, 5, 2, 3]
+    snapshot, _, events = agent.store.load_user('u1')
+    assert snapshot is None and len(events) == 4
@@ -0,0 +1,27 @@
+"""Chat history: merging the backend's sessionHistory without storing turns twice"""
+
+def test_session_history_is_not_stored_again(main):
+    client = main.app.test_client()
+    session = []
+    for turn in range(12):
+        message = f"I keep worrying about my exams, day {turn}"
+        response = client.post('/chat', json={'message': message, 'userId': 'history-user', 'sessionHistory': session})
+        assert response.status_code == 200
+        session += [{'role': 'user', 'content': message},
+                    {'role': 'assistant', 'content': response.get_json()['response']}]
+
+        history = main.user_conversations['history-user']
+        human = [msg.content for msg in history if msg.type == 'human']
+        assert len(human) == len(set(human)), f"repeated turns after turn {turn}"
+        assert len(history) == min(2 * (turn + 1), main.CONVERSATION_HISTORY_LIMIT)
+        assert human[-1] == message
+
+def test_merge_puts_unknown_session_messages_first(main):
+    stored = [main.HumanMessage(content='stored question'), main.AIMessage(content='stored answer')]
+    session = [{'role': 'user', 'content': 'from another device'}, {'role': 'assistant', 'content': 'reply there'},
+               {'role': 'user', 'content': 'stored question'}, {'role': 'assistant', 'content': 'stored answer'}]
+
+    merged = main.merge_session_history(stored, session)
+
+    assert [msg.content for msg in merged] == ['from another device', 'reply there', 'stored question', 'stored answer']
+    assert [msg.content for msg in stored] == ['stored question', 'stored answer']
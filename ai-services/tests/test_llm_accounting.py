@@ -0,0 +1,94 @@
+"""LLM usage accounting: in-memory aggregation, flushing and daily budgets"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from llm_accounting import AccountedLLM, LLMAccountant, LLMBudgetExceeded, attributed
+
+class StubLLM:
+    def __init__(self, input_tokens=60, output_tokens=40):
+        self.usage = {'input_tokens': input_tokens, 'output_tokens': output_tokens}
+        self.calls = 0
+
+    def invoke(self, prompt, *args, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(content='ok', usage_metadata=self.usage)
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'llm_usage.db')
+
+def stored_calls(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COALESCE(SUM(calls), 0) FROM llm_usage").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_usage_is_written_on_flush_not_per_call(db_path):
+    accountant = LLMAccountant(db_path, daily_token_budget=0)
+    for _ in range(3):
+        accountant.record('u1', 'chat', 'model', 'llm.chat_reply', 10, 5, 0.1)
+
+    assert stored_calls(db_path) == 0
+    assert accountant.flush() == 1
+    assert stored_calls(db_path) == 3
+    assert accountant.user_usage('u1')['total_tokens'] == 45
+
+def test_pending_calls_over_the_threshold_force_a_flush(db_path):
+    accountant = LLMAccountant(db_path, daily_token_budget=0, flush_calls=2)
+    accountant.record('u1', 'chat', 'model', 'llm.chat_reply', 10, 5, 0.1)
+    accountant.record('u2', 'chat', 'model', 'llm.chat_reply', 10, 5, 0.1)
+
+    assert stored_calls(db_path) == 2
+
+def test_no_budget_means_no_usage_lookups(db_path, monkeypatch):
+    accountant = LLMAccountant(db_path, daily_token_budget=0)
+    monkeypatch.setattr(accountant, 'tokens_today', lambda user_id: pytest.fail('usage read without a budget'))
+
+    assert not accountant.over_budget('u1')
+
+def test_budget_counts_unflushed_usage(db_path):
+    accountant = LLMAccountant(db_path, daily_token_budget=0)
+    accountant.set_budget('u1', 250)
+    llm = AccountedLLM(StubLLM(), accountant, 'model')
+
+    with attributed('u1', 'chat', 'llm.emotion'):
+        llm.invoke('hello')
+        llm.invoke('hello')
+        assert not accountant.over_budget('u1')
+        llm.invoke('hello')  # 300 tokens, none flushed yet
+        with pytest.raises(LLMBudgetExceeded):
+            llm.invoke('hello')
+    assert accountant.stats['budget_denied'] == 1
+    assert stored_calls(db_path) == 0
+
+def test_exempt_callers_move_to_the_fallback_model(db_path):
+    accountant = LLMAccountant(db_path, daily_token_budget=100)
+    primary, fallback = StubLLM(), StubLLM()
+    llm = AccountedLLM(primary, accountant, 'model', fallback, 'cheap-model')
+
+    with attributed('u1', 'chat', 'llm.chat_reply'):
+        llm.invoke('hello')
+        llm.invoke('hello')
+    with attributed('u1', 'chat', 'llm.crisis_detection'):
+        llm.invoke('hello')
+
+    assert (primary.calls, fallback.calls) == (2, 1)  # The second reply and crisis detection ran over budget
+    assert accountant.stats['budget_downgraded'] == 1
+    calls = {(entry['caller'], entry['model']) for entry in accountant.user_usage('u1')['breakdown']}
+    assert calls == {('llm.chat_reply', 'model'), ('llm.chat_reply', 'cheap-model'), ('llm.crisis_detection', 'model')}
+
+def test_budget_overrides_from_another_worker_are_seen_after_a_flush(db_path):
+    worker_a = LLMAccountant(db_path, daily_token_budget=0)
+    worker_b = LLMAccountant(db_path, daily_token_budget=0)
+    worker_a.record('u1', 'chat', 'model', 'llm.emotion', 80, 40, 0.1)
+    worker_a.flush()
+    worker_b.set_budget('u1', 100)
+
+    assert not worker_a.over_budget('u1')
+    worker_a.flush()
+    assert worker_a.over_budget('u1')
+    assert worker_b.over_budget('u1')  # Reads the usage worker_a flushed
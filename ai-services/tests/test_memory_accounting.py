@@ -0,0 +1,29 @@
+"""Per-user memory accounting: cached sizes and when users are re-measured"""
+
+from memory_accounting import MemoryAccountant
+
+def make_accountant(conversations, versions):
+    accountant = MemoryAccountant(version_of=lambda user_id: versions.get(user_id, 0))
+    accountant.register_per_user('conversations', lambda: conversations)
+    return accountant
+
+def test_unchanged_users_are_not_re_measured():
+    conversations = {'u1': ['hello'] * 4}
+    accountant = make_accountant(conversations, {'u1': 1})
+    accountant.report(max_age=0)
+    accountant.report(max_age=0)
+
+    assert accountant.stats['users_measured'] == 1
+    assert accountant.stats['users_reused'] == 1
+
+def test_changed_re_measures_a_capped_history():
+    conversations = {'u1': ['short'] * 4}
+    accountant = make_accountant(conversations, {'u1': 1})
+    before = accountant.report(max_age=0)['per_user_structures']['conversations']
+
+    conversations['u1'] = ['a much longer message than before'] * 4  # Same length, same version
+    accountant.changed('u1')
+    after = accountant.report(max_age=0)['per_user_structures']['conversations']
+
+    assert after > before
+    assert accountant.stats['users_measured'] == 2
@@ -0,0 +1,132 @@
+"""Proactive message queue: versioning, one generation per version and failure backoff"""
+
+import pytest
+
+import proactive_queue
+from fakes import FakeLLM
+from proactive_queue import ProactiveMessageQueue, ProactiveUpgradeChannel
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+class Generator:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self, user_id, starter_type, support_context):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError('LLM unavailable')
+        return f"message {self.calls} for {user_id}"
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(proactive_queue.time, 'time', lambda: now[0])
+    return now
+
+def make_queue(generator):
+    queue = ProactiveMessageQueue(generator)
+    queue._executor = InlineExecutor()
+    return queue
+
+def test_message_is_generated_once_per_data_version(clock):
+    generator = Generator()
+    queue = make_queue(generator)
+
+    assert queue.schedule('u1', 'returning', 'general')
+    assert queue.take('u1', 'returning', 'general') == 'message 1 for u1'
+
+    # Served, and later expired: neither regenerates without new conversation data
+    assert not queue.schedule('u1', 'returning', 'general')
+    clock[0] += proactive_queue.PROACTIVE_QUEUE_TTL + 1
+    assert not queue.schedule('u1', 'returning', 'general')
+    assert generator.calls == 1
+
+    queue.invalidate('u1')
+    assert queue.schedule('u1', 'returning', 'general')
+    assert generator.calls == 2
+
+def test_invalidate_drops_the_queued_message(clock):
+    queue = make_queue(Generator())
+    queue.schedule('u1', 'returning', 'general')
+    queue.invalidate('u1')
+
+    assert queue.take('u1', 'returning', 'general') is None
+    assert queue.stats['invalidated'] == 1
+
+def test_result_for_a_stale_version_is_discarded(clock):
+    queue = make_queue(None)
+
+    def generate(user_id, starter_type, support_context):
+        queue.invalidate(user_id)  # The user chatted while the message was being generated
+        return 'stale'
+
+    queue.generate_fn = generate
+    queue.schedule('u1', 'returning', 'general')
+    assert queue.take('u1', 'returning', 'general') is None
+
+def test_failed_generations_back_off_exponentially(clock):
+    generator = Generator(fail=True)
+    queue = make_queue(generator)
+
+    assert queue.schedule('u1', 'returning', 'general')
+    assert not queue.schedule('u1', 'returning', 'general')
+
+    clock[0] += proactive_queue.PROACTIVE_RETRY_BASE
+    assert queue.schedule('u1', 'returning', 'general')
+    clock[0] += proactive_queue.PROACTIVE_RETRY_BASE
+    assert not queue.schedule('u1', 'returning', 'general')  # Second failure waits twice as long
+    clock[0] += proactive_queue.PROACTIVE_RETRY_BASE
+    assert queue.schedule('u1', 'returning', 'general')
+    assert generator.calls == 3
+
+def test_no_message_backs_off_without_pausing_other_users(clock):
+    queue = make_queue(lambda user_id, starter_type, support_context: None)
+    for index in range(proactive_queue.PROACTIVE_FAILURE_STREAK):
+        queue.schedule(f"u{index}", 'returning', 'general')
+
+    assert queue.stats['skipped'] == proactive_queue.PROACTIVE_FAILURE_STREAK
+    assert queue.stats['failed'] == 0
+    assert not queue.schedule('u0', 'returning', 'general')
+    assert queue.schedule('fresh-user', 'returning', 'general')
+
+def test_failure_streak_pauses_all_users(clock):
+    generator = Generator(fail=True)
+    queue = make_queue(generator)
+    for index in range(proactive_queue.PROACTIVE_FAILURE_STREAK):
+        queue.schedule(f"u{index}", 'returning', 'general')
+
+    assert not queue.schedule('fresh-user', 'returning', 'general')
+    clock[0] += proactive_queue.PROACTIVE_FAILURE_PAUSE
+    assert queue.schedule('fresh-user', 'returning', 'general')
+
+@pytest.fixture
+def failing_llm(main, monkeypatch):
+    monkeypatch.setattr(main, 'geminiLlm', FakeLLM(error_rate=1.0))
+
+def test_service_generator_failures_reach_the_backoff(main, failing_llm, clock):
+    assert main.proactive_queue.generate_fn is main.generate_personalized_proactive_message
+    queue = make_queue(main.generate_personalized_proactive_message)
+    for index in range(proactive_queue.PROACTIVE_FAILURE_STREAK):
+        queue.schedule(f"outage-{index}", 'check_in', 'general')
+
+    assert queue.stats['failed'] == proactive_queue.PROACTIVE_FAILURE_STREAK
+    assert queue.take('outage-0', 'check_in', 'general') is None  # No template stored as personalized
+    assert not queue.schedule('fresh-user', 'check_in', 'general')  # Paused
+
+def test_service_generator_failure_leaves_the_template_in_place(main, failing_llm):
+    assert main.proactive_upgrades.generate_fn is main.generate_personalized_proactive_message
+    channel = ProactiveUpgradeChannel(main.generate_personalized_proactive_message)
+    upgrade_id = channel.start('outage-user', 'check_in', 'general')
+
+    result = channel.wait(upgrade_id, timeout=10)
+    assert result['status'] == 'failed'
+    assert result['message'] is None
+
+def test_requests_still_get_a_template_when_the_llm_fails(main, failing_llm):
+    message = main.generate_proactive_message_with_context('outage-user', 'check_in', 'general')
+
+    assert message == main.proactive_template_message('check_in', 'general')
@@ -0,0 +1,96 @@
+"""Traffic capture: redaction of free text, per-worker files and rotation"""
+
+import json
+import os
+import stat
+
+import pytest
+
+import traffic_capture
+
+MESSAGE = "I'm Priya, write to priya@example.com or call 98765 43210, my exams are killing me"
+
+@pytest.fixture
+def capture_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(traffic_capture, 'TRAFFIC_CAPTURE_PATH', str(tmp_path / 'capture.jsonl'))
+    return tmp_path
+
+def test_filler_keeps_length_and_word_count():
+    filler = traffic_capture.filler_text(MESSAGE)
+
+    assert len(filler) == len(MESSAGE)
+    assert len(filler.split()) == len(MESSAGE.split())
+    assert set(filler) <= {'x', ' '}
+
+def test_request_text_is_replaced_by_filler():
+    request = traffic_capture.redact_request({
+        'message': MESSAGE, 'context': 'academic', 'tts': 1, 'userId': 'priya',
+        'sessionHistory': [{'role': 'user', 'content': 'Priya here'}, {'role': 'assistant', 'content': 'Hi Priya!'},
+                           {'role': 'Priya', 'content': 'hi'}]
+    })
+
+    assert 'Priya' not in json.dumps(request)
+    assert request['context'] == 'academic'
+    assert request['tts'] is True
+    assert [entry['role'] for entry in request['sessionHistory']] == ['user', 'assistant', 'xxxxx']
+    assert len(request['message']) == len(MESSAGE)
+
+def test_json_output_keeps_its_shape_and_labels():
+    output = ('```json\n{"primary_emotion": "anxiety", "secondary_emotions": ["stress", "sadness"], '
+              '"intensity": 4, "avatar_emotion": "concerned", '
+              '"emotional_context": "Priya says her exams are killing her"}\n```')
+    redacted = traffic_capture.redact_output(output)
+
+    assert redacted.startswith('```json\n') and redacted.endswith('\n```')
+    parsed = json.loads(redacted[len('```json\n'):-len('\n```')])
+    assert parsed['primary_emotion'] == 'anxiety'
+    assert parsed['secondary_emotions'] == ['stress', 'sadness']
+    assert parsed['avatar_emotion'] == 'concerned'
+    assert parsed['intensity'] == 4
+    assert 'Priya' not in parsed['emotional_context']
+
+def test_short_strings_outside_label_vocabularies_become_filler():
+    output = json.dumps({
+        "triggers": ["breakup with John"], "primary_emotion": "John",
+        "wellness_trends": {"emotional_trajectory": "declining", "engagement_quality": "Priya"},
+        "crisis_indicators": [{"type": "self_harm", "evidence": "cuts"}]
+    })
+    parsed = json.loads(traffic_capture.redact_output(output))
+
+    assert 'John' not in json.dumps(parsed) and 'Priya' not in json.dumps(parsed)
+    assert parsed['triggers'] == [traffic_capture.filler_text("breakup with John")]
+    assert parsed['wellness_trends']['emotional_trajectory'] == 'declining'
+    assert parsed['crisis_indicators'][0]['type'] == 'self_harm'
+    assert parsed['crisis_indicators'][0]['evidence'] == 'xxxx'
+
+def test_free_text_output_becomes_filler():
+    reply = "That sounds hard, Priya."
+    assert traffic_capture.redact_output(reply) == traffic_capture.filler_text(reply)
+
+def test_each_worker_writes_its_own_owner_only_file(capture_dir):
+    traffic_capture._write('{}')
+    path = traffic_capture.capture_path()
+
+    assert path.endswith(f".{os.getpid()}")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+def test_rotation_keeps_only_the_newest_files(capture_dir, monkeypatch):
+    monkeypatch.setattr(traffic_capture, 'TRAFFIC_CAPTURE_KEEP', 2)
+    base = str(capture_dir / 'capture.jsonl')
+    for age, name in enumerate(('20260101-000003', '20260101-000002', '20260101-000001')):
+        rotated = f"{base}.999.{name}"
+        with open(rotated, 'w') as f:
+            f.write('{}\n')
+        os.utime(rotated, (1000 - age, 1000 - age))
+    with open(f"{base}.998", 'w') as f:  # Another worker's live file
+        f.write('{}\n')
+    monkeypatch.setattr(traffic_capture, 'TRAFFIC_CAPTURE_MAX_MB', 0)
+    traffic_capture._write('{}')  # Creates this worker's file
+    traffic_capture._write('{}')  # Over the cap: rotates it and prunes
+
+    remaining = sorted(os.listdir(capture_dir))
+    assert "capture.jsonl.998" in remaining
+    assert f"capture.jsonl.{os.getpid()}" in remaining
+    rotated = [name for name in remaining if traffic_capture.ROTATED_SUFFIX.search(name)]
+    assert len(rotated) == 2
+    assert 'capture.jsonl.999.20260101-000003' in rotated  # The newest of the old ones survives
@@ -0,0 +1,128 @@
+"""TTS cache and local audio store: lookups, expiry and eviction"""
+
+import os
+import time
+
+import pytest
+
+import audio_store as audio_store_module
+from audio_store import AudioStore
+from tts_cache import TTSCache
+
+@pytest.fixture
+def cache(tmp_path):
+    return TTSCache(str(tmp_path / 'tts_cache'), max_bytes=10 ** 6, max_entries=3)
+
+@pytest.fixture
+def audio_store(tmp_path):
+    return AudioStore(str(tmp_path / 'audio_store'), max_bytes=10, base_url='http://service')
+
+def put(cache, key, **fields):
+    cache.put(key, dict({'success': True, 'audio_url': f"http://murf/{key}"}, **fields), text_chars=10,
+              voice_id='voice')
+
+def test_lru_eviction_over_the_entry_cap(cache):
+    for key in ('a', 'b', 'c'):
+        put(cache, key)
+    cache.get('a')  # 'b' is now least recently used
+    put(cache, 'd')
+
+    assert cache.contains('a') and cache.contains('c') and cache.contains('d')
+    assert not cache.contains('b')
+    assert cache.stats['evictions'] == 1
+
+def test_expired_entries_are_misses(cache):
+    cache.put('k', {'success': True}, text_chars=5, voice_id='voice', expires_at=1.0)
+
+    assert not cache.contains('k')
+    assert cache.get('k') is None
+    assert (cache.stats['hits'], cache.stats['misses']) == (0, 1)
+
+def test_contains_treats_entries_expiring_soon_as_absent(cache):
+    cache.put('k', {'success': True}, text_chars=5, voice_id='voice', expires_at=time.time() + 3600)
+
+    assert cache.contains('k')
+    assert not cache.contains('k', min_ttl=7200)
+
+def test_contains_drops_entries_whose_audio_blob_was_evicted(cache, audio_store):
+    first = audio_store.put_bytes(b'123456', 'audio/wav')
+    put(cache, 'k', audio_hash=first)
+    is_valid = lambda payload: audio_store.contains(payload['audio_hash'])
+    assert cache.contains('k', is_valid=is_valid)
+
+    audio_store.put_bytes(b'abcdefgh', 'audio/wav')  # Over the 10 byte cap: the older blob is evicted
+
+    assert not audio_store.contains(first)
+    assert not cache.contains('k', is_valid=is_valid)
+    assert not cache.contains('k')  # The stale row was dropped
+
+def test_audio_store_lookup_of_a_deleted_file(audio_store):
+    audio_hash = audio_store.put_bytes(b'1234', 'audio/mpeg')
+    meta = audio_store.get_meta(audio_hash)
+    os.remove(meta['path'])
+
+    assert audio_store.get_meta(audio_hash) is None
+    assert audio_store.get_stats()['blobs'] == 0
+
+def test_hit_with_an_evicted_blob_is_a_miss(cache, audio_store):
+    audio_hash = audio_store.put_bytes(b'123456', 'audio/wav')
+    cache.put('k', {'success': True, 'audio_hash': audio_hash}, text_chars=42, voice_id='voice')
+    is_valid = lambda payload: audio_store.contains(payload['audio_hash'])
+    assert cache.get('k', is_valid=is_valid)['audio_hash'] == audio_hash
+
+    audio_store.put_bytes(b'abcdefgh', 'audio/wav')  # Evicts the first blob
+
+    assert cache.get('k', is_valid=is_valid) is None
+    assert (cache.stats['hits'], cache.stats['misses'], cache.stats['saved_characters']) == (1, 1, 42)
+    assert cache.get_stats()['entries'] == 0
+
+class StubResponse:
+    def __init__(self, chunks, headers):
+        self.chunks = chunks
+        self.headers = headers
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=None):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+def stub_download(audio_store, monkeypatch, chunks, **headers):
+    response = StubResponse(chunks, headers)
+    monkeypatch.setattr(audio_store._session, 'get', lambda url, **kwargs: response)
+    return response
+
+def test_fetch_streams_audio_into_the_store(audio_store, monkeypatch):
+    stub_download(audio_store, monkeypatch, [b'1234', b'56'], **{'Content-Type': 'audio/mpeg; charset=binary'})
+    audio_hash = audio_store.fetch('http://murf/clip.mp3')
+
+    assert audio_store.get_meta(audio_hash)['size_bytes'] == 6
+
+def test_fetch_rejects_content_that_is_not_audio(audio_store, monkeypatch):
+    stub_download(audio_store, monkeypatch, [b'<html>'], **{'Content-Type': 'text/html'})
+    with pytest.raises(ValueError):
+        audio_store.fetch('http://murf/clip.mp3')
+    with pytest.raises(ValueError):
+        audio_store.fetch('data:text/plain;base64,aGVsbG8=')
+    assert audio_store.get_stats()['blobs'] == 0
+
+def test_fetch_stops_at_the_size_limit(audio_store, monkeypatch):
+    monkeypatch.setattr(audio_store_module, 'AUDIO_FETCH_MAX_BYTES', 8)
+    stub_download(audio_store, monkeypatch, [b'x'], **{'Content-Type': 'audio/mpeg', 'Content-Length': '9'})
+    with pytest.raises(ValueError):
+        audio_store.fetch('http://murf/declared.mp3')
+
+    response = stub_download(audio_store, monkeypatch, [b'12345'] * 100, **{'Content-Type': 'audio/mpeg'})
+    with pytest.raises(ValueError):
+        audio_store.fetch('http://murf/undeclared.mp3')
+    assert response.read == 2
+    assert audio_store.get_stats()['blobs'] == 0
@@ -0,0 +1,184 @@
+"""Lightweight request tracing
+
+Every HTTP request gets a unique trace id (taken from an incoming X-Trace-Id
+header when present) held in a context variable, so code anywhere below the
+request handler - crisis detection, the care agent, TTS routing - can open a
+span without threading ids through call signatures. A span records its
+offset from the start of the trace, duration and outcome ('ok' or 'error').
+
+Finished traces slower than TRACE_SLOW_MS are kept in a ring buffer served at
+/debug/traces, and can be dumped to a JSON file on demand or appended to
+TRACE_EXPORT_PATH as they complete.
+"""
+
+import collections
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', 1000))  # Traces at least this slow are kept
+TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 200))
+TRACE_MAX_SPANS = 256  # Per trace, so a runaway loop cannot grow one without bound
+TRACE_EXPORT_DIR = os.environ.get('TRACE_EXPORT_DIR', 'traces')
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', '')  # JSON lines file for every slow trace, off if empty
+
+class Span:
+    __slots__ = ('span_id', 'parent_id', 'name', 'started', 'duration', 'outcome', 'error', 'attributes')
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, attributes: Dict):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.outcome = 'ok'
+        self.error: Optional[str] = None
+        self.attributes = attributes
+
+class Trace:
+    def __init__(self, trace_id: str, name: str, attributes: Optional[Dict] = None):
+        self.trace_id = trace_id
+        self.name = name
+        self.attributes = attributes or {}
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.outcome = 'ok'
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self._next_span_id = 1
+
+    def new_span(self, name: str, parent_id: Optional[int], attributes: Dict) -> Optional[Span]:
+        if len(self.spans) >= TRACE_MAX_SPANS:
+            self.dropped_spans += 1
+            return None
+        span = Span(self._next_span_id, parent_id, name, attributes)
+        self._next_span_id += 1
+        self.spans.append(span)
+        return span
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'duration_ms': round(self.duration * 1000, 2) if self.duration is not None else None,
+            'outcome': self.outcome,
+            'attributes': self.attributes,
+            'dropped_spans': self.dropped_spans,
+            'spans': [
+                {
+                    'span_id': span.span_id,
+                    'parent_id': span.parent_id,
+                    'name': span.name,
+                    'start_ms': round((span.started - self.started) * 1000, 2),
+                    'duration_ms': round(span.duration * 1000, 2) if span.duration is not None else None,
+                    'outcome': span.outcome,
+                    'error': span.error,
+                    'attributes': span.attributes
+                }
+                for span in self.spans
+            ]
+        }
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar('trace', default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('span', default=None)
+
+_slow_traces: collections.deque = collections.deque(maxlen=TRACE_BUFFER_SIZE)
+_slow_lock = threading.Lock()
+stats = {'traces': 0, 'slow': 0}
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+def current_span_name() -> Optional[str]:
+    current = _current_span.get()
+    return current.name if current else None
+
+def start_trace(name: str, trace_id: Optional[str] = None, **attributes):
+    """Begin a trace for this context; returns (trace, token) for finish_trace"""
+    trace = Trace(trace_id or new_trace_id(), name, attributes)
+    return trace, _current_trace.set(trace)
+
+def finish_trace(trace: Trace, token, outcome: str = 'ok', **attributes) -> None:
+    """Close the trace, keep it if it was slow, and detach it from the context"""
+    if trace.duration is None:
+        trace.duration = time.perf_counter() - trace.started
+        trace.outcome = outcome
+        trace.attributes.update(attributes)
+        stats['traces'] += 1
+        if trace.duration * 1000 >= TRACE_SLOW_MS:
+            _keep_slow(trace)
+    try:
+        _current_trace.reset(token)
+    except ValueError:
+        _current_trace.set(None)  # Finished from a different context than it was started in
+    _current_span.set(None)
+
+def _keep_slow(trace: Trace) -> None:
+    with _slow_lock:
+        _slow_traces.append(trace)
+        stats['slow'] += 1
+    if TRACE_EXPORT_PATH:
+        try:
+            with open(TRACE_EXPORT_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(trace.to_dict(), default=str) + '\n')
+        except OSError as e:
+            log.warning("⚠️ Could not export trace", exported_trace_id=trace.trace_id, error=str(e))
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a span in the current trace; a no-op outside of a traced request"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = trace.new_span(name, parent.span_id if parent else None, attributes)
+    if current is None:
+        yield None
+        return
+
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.outcome = 'error'
+        current.error = f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.started
+        _current_span.reset(token)
+
+def slow_traces(limit: int = 50, min_ms: float = 0) -> List[Dict]:
+    """Most recent slow traces first"""
+    with _slow_lock:
+        traces = list(_slow_traces)
+    result = []
+    for trace in reversed(traces):
+        if trace.duration * 1000 >= min_ms:
+            result.append(trace.to_dict())
+            if len(result) >= limit:
+                break
+    return result
+
+def export_slow_traces(directory: str = TRACE_EXPORT_DIR) -> str:
+    """Write the ring buffer to a timestamped JSON file and return its path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.abspath(os.path.join(directory, f"traces-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(slow_traces(limit=TRACE_BUFFER_SIZE), f, indent=2, default=str)
+    return path
@@ -0,0 +1,249 @@
+"""Sampled traffic capture for offline replay
+
+A sampled share of /chat requests (TRAFFIC_CAPTURE_RATE, off by default) is
+written to TRAFFIC_CAPTURE_PATH together with every LLM response the request
+received, so benchmarks/replay.py can re-run real traffic against a new build
+with those responses substituted and no API calls.
+
+Replay only needs the shape of the traffic, not its content, so no free text
+is written: messages, session history and LLM replies are replaced by filler
+of the same length and word count. LLM outputs that are JSON (emotion, crisis
+and care agent analyses) keep their structure and numbers, and a string is
+kept only under a known label key (LABEL_VOCABULARIES) and only when it is
+one of that key's values from the prompts ("anxiety", "declining"), so replay
+takes the same parsing paths. Every other string becomes filler, however short
+it is ("breakup with John" under "triggers" is as private as any message).
+User ids are replaced by a salted hash
+(stable for the salt, so one user's turns stay linked) and prompts are kept
+only as a length. Paths that depend on the wording itself (keyword emotion
+and crisis checks) therefore run on filler in replay.
+
+One JSON line per request, in a file per worker process
+(TRAFFIC_CAPTURE_PATH.<pid>, mode 0600). A file is rotated when it reaches
+TRAFFIC_CAPTURE_MAX_MB, and only the newest TRAFFIC_CAPTURE_KEEP rotated
+files are kept.
+"""
+
+import contextvars
+import glob
+import hashlib
+import json
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from context_prompts import CONTEXT_PROMPTS
+from service_logging import get_logger
+from tracing import current_span_name
+
+log = get_logger(__name__)
+
+TRAFFIC_CAPTURE_RATE = float(os.environ.get('TRAFFIC_CAPTURE_RATE', 0))  # Fraction of /chat requests, 0 disables
+TRAFFIC_CAPTURE_PATH = os.environ.get('TRAFFIC_CAPTURE_PATH', 'traffic_capture.jsonl')
+TRAFFIC_CAPTURE_MAX_MB = float(os.environ.get('TRAFFIC_CAPTURE_MAX_MB', 100))
+TRAFFIC_CAPTURE_KEEP = int(os.environ.get('TRAFFIC_CAPTURE_KEEP', 5))  # Rotated files kept across all workers
+# Without a configured salt, user ids only stay linked within one server start
+TRAFFIC_CAPTURE_SALT = os.environ.get('TRAFFIC_CAPTURE_SALT') or secrets.token_hex(16)
+CAPTURED_ENDPOINTS = {'chat'}
+CAPTURED_FIELDS = ('message', 'context', 'sessionHistory', 'tts')  # Request fields replay needs
+# The label values the service's prompts ask the LLM for (main.analyze_emotion_with_llm,
+# crisis_detection, care_agent); strings are kept only under these keys and with these values
+EMOTION_LABELS = frozenset({
+    'sadness', 'anxiety', 'anger', 'loneliness', 'joy', 'gratitude', 'confusion', 'hope', 'stress', 'fear',
+    'overwhelm', 'relief', 'pride', 'shame', 'guilt', 'love', 'excitement', 'calm', 'frustration', 'determination'
+})
+INTERVENTION_TYPES = frozenset({'check_in', 'activity', 'resource', 'professional'})
+LABEL_VOCABULARIES = {
+    'primary_emotion': EMOTION_LABELS,
+    'secondary_emotions': EMOTION_LABELS,
+    'emotions': EMOTION_LABELS,
+    'avatar_emotion': frozenset({'neutral', 'happy', 'sad', 'concerned', 'supportive', 'excited'}),
+    'type': frozenset({'suicidal_ideation', 'self_harm', 'severe_depression', 'substance_abuse',
+                       'eating_disorder', 'panic_attack'}),
+    'pattern_type': frozenset({'emotional', 'behavioral', 'crisis', 'engagement'}),
+    'suggested_intervention': INTERVENTION_TYPES,
+    'action_type': INTERVENTION_TYPES,
+    'intervention_type': INTERVENTION_TYPES,
+    'timing': frozenset({'immediate', 'next_session', 'scheduled'}),
+    'emotional_trajectory': frozenset({'improving', 'stable', 'declining'}),
+    'engagement_quality': frozenset({'high', 'moderate', 'low'}),
+    'risk_trajectory': frozenset({'decreasing', 'stable', 'increasing'}),
+    'difficulty': frozenset({'easy', 'moderate', 'challenging'}),
+}
+REQUEST_CONTEXTS = frozenset(CONTEXT_PROMPTS)
+SESSION_ROLES = frozenset({'user', 'assistant'})
+ROTATED_SUFFIX = re.compile(r"\.\d+\.\d{8}-\d{6}$")  # <pid>.<timestamp>
+
+class Capture:
+    __slots__ = ('started', 'request', 'llm_calls')
+
+    def __init__(self, request: Dict):
+        self.started = time.perf_counter()
+        self.request = request
+        self.llm_calls: List[Dict] = []
+
+_current: contextvars.ContextVar[Optional[Capture]] = contextvars.ContextVar('traffic_capture', default=None)
+_write_lock = threading.Lock()
+stats = {'captured': 0, 'llm_calls': 0, 'rotations': 0, 'deleted': 0, 'write_errors': 0}
+
+def hash_user_id(user_id: Any) -> str:
+    return 'u_' + hashlib.sha256(f"{TRAFFIC_CAPTURE_SALT}:{user_id}".encode('utf-8')).hexdigest()[:16]
+
+def filler_text(text: str) -> str:
+    """Placeholder with the same length and word count as `text`"""
+    words = len(text.split())
+    if not words:
+        return ' ' * len(text)
+    word_chars = max(1, (len(text) - words + 1) // words)
+    filler = ' '.join(['x' * word_chars] * words)
+    return filler + 'x' * (len(text) - len(filler))
+
+def _label_or_filler(value: str, vocabulary: Optional[frozenset]) -> str:
+    return value if vocabulary is not None and value.strip().lower() in vocabulary else filler_text(value)
+
+def _sketch(value: Any, vocabulary: Optional[frozenset] = None) -> Any:
+    """Keep the structure of parsed JSON output, replacing strings that are not known labels"""
+    if isinstance(value, str):
+        return _label_or_filler(value, vocabulary)
+    if isinstance(value, list):
+        return [_sketch(item, vocabulary) for item in value]
+    if isinstance(value, dict):
+        return {key: _sketch(item, LABEL_VOCABULARIES.get(key)) for key, item in value.items()}
+    return value
+
+def redact_output(text: str) -> str:
+    """An LLM reply without its wording: JSON keeps its shape and labels, other text becomes filler"""
+    start = min((index for index in (text.find('{'), text.find('[')) if index >= 0), default=-1)
+    end = max(text.rfind('}'), text.rfind(']'))
+    if start >= 0 and end > start:
+        try:
+            parsed = json.loads(text[start:end + 1])
+        except ValueError:
+            pass
+        else:
+            prefix, suffix = text[:start], text[end + 1:]
+            # Keep the ```json fences the parsers strip, nothing else around the JSON
+            prefix = prefix if re.fullmatch(r"[\s`]*(json)?\s*", prefix) else filler_text(prefix)
+            suffix = suffix if re.fullmatch(r"[\s`]*", suffix) else filler_text(suffix)
+            return prefix + json.dumps(_sketch(parsed), ensure_ascii=False) + suffix
+    return filler_text(text)
+
+def redact_request(payload: Dict) -> Dict:
+    """The captured request fields, with message and session history text replaced by filler"""
+    request = {}
+    if isinstance(payload.get('message'), str):
+        request['message'] = filler_text(payload['message'])
+    if isinstance(payload.get('context'), str):
+        request['context'] = _label_or_filler(payload['context'], REQUEST_CONTEXTS)
+    if isinstance(payload.get('sessionHistory'), list):
+        request['sessionHistory'] = [
+            {'role': _label_or_filler(str(entry.get('role', '')), SESSION_ROLES), 'content': filler_text(str(entry.get('content', '')))}
+            for entry in payload['sessionHistory'] if isinstance(entry, dict)
+        ]
+    if 'tts' in payload:
+        request['tts'] = bool(payload['tts'])
+    return request
+
+def should_capture(endpoint: Optional[str]) -> bool:
+    return TRAFFIC_CAPTURE_RATE > 0 and endpoint in CAPTURED_ENDPOINTS and random.random() < TRAFFIC_CAPTURE_RATE
+
+def begin(endpoint: str, payload: Optional[Dict]):
+    """Start capturing this request; returns a token for finish/discard"""
+    payload = payload if isinstance(payload, dict) else {}
+    request = redact_request(payload)
+    request['endpoint'] = endpoint
+    request['user'] = hash_user_id(payload.get('userId', 'anonymous'))
+    return _current.set(Capture(request))
+
+def discard(token) -> None:
+    """Drop the capture without writing it (the request failed before a response)"""
+    try:
+        _current.reset(token)
+    except ValueError:
+        _current.set(None)
+
+def finish(token, status: int, response: Optional[Dict]) -> None:
+    """Write the captured request, its LLM calls and a summary of the response"""
+    capture = _current.get()
+    discard(token)
+    if capture is None:
+        return
+    response = response if isinstance(response, dict) else {}
+    record = {
+        'captured_at': round(time.time(), 3),
+        'request': capture.request,
+        'llm_calls': capture.llm_calls,
+        'response': {
+            'status': status,
+            'ms': round((time.perf_counter() - capture.started) * 1000, 1),
+            'reply_chars': len(response.get('response') or ''),
+            'crisis': bool(response.get('has_crisis')),
+            'fallback': 'error' in response
+        }
+    }
+    _write(json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+
+def capture_path() -> str:
+    """This process's capture file; workers never share one"""
+    return f"{TRAFFIC_CAPTURE_PATH}.{os.getpid()}"
+
+def _rotate(path: str) -> None:
+    """Move a full capture file aside and delete all but the newest TRAFFIC_CAPTURE_KEEP rotated files"""
+    os.replace(path, f"{path}.{time.strftime('%Y%m%d-%H%M%S')}")
+    stats['rotations'] += 1
+    rotated = [name for name in glob.glob(f"{glob.escape(TRAFFIC_CAPTURE_PATH)}.*") if ROTATED_SUFFIX.search(name)]
+    rotated.sort(key=os.path.getmtime, reverse=True)
+    for name in rotated[max(TRAFFIC_CAPTURE_KEEP, 0):]:
+        try:
+            os.remove(name)
+            stats['deleted'] += 1
+        except FileNotFoundError:
+            pass  # Another worker pruned it first
+
+def _write(line: str) -> None:
+    path = capture_path()
+    with _write_lock:
+        try:
+            if os.path.exists(path) and os.path.getsize(path) >= TRAFFIC_CAPTURE_MAX_MB * 1024 * 1024:
+                _rotate(path)
+            # Owner-only: the file still holds request timing, lengths and hashed user ids
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            with os.fdopen(fd, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            stats['captured'] += 1
+        except OSError as e:
+            stats['write_errors'] += 1
+            log.warning("⚠️ Could not write captured traffic", path=path, error=str(e))
+
+class CapturingLLM:
+    """Wraps the chat model: records responses for requests that are being captured"""
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def invoke(self, prompt, *args, **kwargs):
+        capture = _current.get()
+        if capture is None:
+            return self.llm.invoke(prompt, *args, **kwargs)
+
+        call = {'caller': current_span_name() or 'unknown', 'prompt_chars': len(str(prompt))}
+        started = time.perf_counter()
+        try:
+            response = self.llm.invoke(prompt, *args, **kwargs)
+        except Exception as e:
+            call['error'] = type(e).__name__
+            raise
+        else:
+            call['output'] = redact_output(str(getattr(response, 'content', response)))
+            return response
+        finally:
+            call['ms'] = round((time.perf_counter() - started) * 1000, 1)
+            capture.llm_calls.append(call)
+            stats['llm_calls'] += 1
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
@@ -0,0 +1,239 @@
+"""Pluggable TTS backends and latency-aware routing
+
+Every backend exposes the same `generate_speech` result shape as
+MurfTTSService. The router tries backends in preference order, skipping one
+whose observed latency, error rate or remaining quota makes it a poor choice,
+so voice replies keep working (on the local engine) when Murf is slow,
+failing, out of characters or not configured.
+"""
+
+import base64
+import hashlib
+from abc import ABC, abstractmethod
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from typing import Dict, List, Optional
+
+from metrics import stage
+from tts_jobs import TTS_QUOTA_RESERVE_CHARS
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+LOCAL_TTS_VOICE = os.environ.get('LOCAL_TTS_VOICE', 'en-us')
+LOCAL_TTS_RATE = int(os.environ.get('LOCAL_TTS_RATE', 160))  # Words per minute
+LOCAL_TTS_TIMEOUT = 20  # Seconds
+
+TTS_ROUTER_MAX_LATENCY = float(os.environ.get('TTS_ROUTER_MAX_LATENCY', 4.0))  # Seconds, smoothed
+TTS_ROUTER_MAX_ERROR_RATE = float(os.environ.get('TTS_ROUTER_MAX_ERROR_RATE', 0.5))
+TTS_ROUTER_PROBE_INTERVAL = 30  # Seconds between trial requests to a backend judged unhealthy
+EWMA_ALPHA = 0.3
+
+class TTSBackend(ABC):
+    """Interface for speech synthesis backends"""
+
+    name = 'base'
+    provider = 'unknown'
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Whether the backend can synthesize right now"""
+
+    def is_cached(self, text: str, voice_id: str, audio_format: str = "MP3", sample_rate: float = 44100.0) -> bool:
+        return False
+
+    @property
+    def remaining_characters(self) -> Optional[int]:
+        """Remaining character quota, or None when the backend is not metered"""
+        return None
+
+    @abstractmethod
+    def generate_speech(self, text: str, voice_id: str, audio_format: str = "MP3",
+                        sample_rate: float = 44100.0) -> Dict:
+        """Synthesize text, returning the MurfTTSService result shape"""
+
+class MurfBackend(TTSBackend):
+    name = 'murf'
+    provider = 'murf_ai'
+
+    def __init__(self, murf_service):
+        self.service = murf_service
+
+    def is_available(self) -> bool:
+        return self.service.client is not None
+
+    def is_cached(self, text, voice_id, audio_format="MP3", sample_rate=44100.0) -> bool:
+        return self.service.is_cached(text, voice_id, audio_format, sample_rate)
+
+    @property
+    def remaining_characters(self) -> Optional[int]:
+        return self.service.remaining_characters
+
+    def generate_speech(self, text, voice_id, audio_format="MP3", sample_rate=44100.0) -> Dict:
+        return self.service.generate_speech(text=text, voice_id=voice_id,
+                                            audio_format=audio_format, sample_rate=sample_rate)
+
+class LocalEngineBackend(TTSBackend):
+    """On-box synthesis with espeak-ng/espeak, or pyttsx3 if installed; returns base64 WAV"""
+
+    name = 'local'
+    provider = 'local_tts'
+
+    def __init__(self, voice: str = LOCAL_TTS_VOICE, rate: int = LOCAL_TTS_RATE):
+        self.voice = voice
+        self.rate = rate
+        self.espeak_path = shutil.which('espeak-ng') or shutil.which('espeak')
+        self._pyttsx3_lock = threading.Lock()  # pyttsx3 engines are not thread-safe
+
+        self._pyttsx3 = None
+        if not self.espeak_path:
+            try:
+                import pyttsx3
+                self._pyttsx3 = pyttsx3
+            except ImportError:
+                log.warning("⚠️ No local TTS engine found (install espeak-ng or pyttsx3)")
+
+    def is_available(self) -> bool:
+        return bool(self.espeak_path or self._pyttsx3)
+
+    def _synthesize_espeak(self, text: str) -> bytes:
+        completed = subprocess.run(
+            [self.espeak_path, '--stdout', '--stdin', '-v', self.voice, '-s', str(self.rate)],
+            input=text.encode('utf-8'), capture_output=True, timeout=LOCAL_TTS_TIMEOUT, check=True
+        )
+        return completed.stdout
+
+    def _synthesize_pyttsx3(self, text: str) -> bytes:
+        fd, path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            with self._pyttsx3_lock:
+                engine = self._pyttsx3.init()
+                engine.setProperty('rate', self.rate)
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def generate_speech(self, text, voice_id, audio_format="MP3", sample_rate=44100.0) -> Dict:
+        if not self.is_available():
+            return {'success': False, 'error': 'Local TTS engine not available',
+                    'message': 'Install espeak-ng or pyttsx3'}
+        try:
+            audio = self._synthesize_espeak(text) if self.espeak_path else self._synthesize_pyttsx3(text)
+            with wave.open(io.BytesIO(audio)) as wav:
+                duration = wav.getnframes() / float(wav.getframerate())
+        except Exception as e:
+            return {'success': False, 'error': 'Local TTS error', 'message': str(e)}
+
+        return {
+            'success': True,
+            'audio_data': base64.b64encode(audio).decode('ascii'),
+            'audio_filename': f"local_{hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]}.wav",
+            'audio_length': round(duration, 2),
+            'cached': False
+        }
+
+class TTSRouter:
+    """Picks a backend per request from observed latency, error rate and quota"""
+
+    def __init__(self, backends: List[TTSBackend]):
+        self.backends = backends
+        self._lock = threading.Lock()
+        self.health = {
+            backend.name: {'latency_ewma': None, 'error_rate': 0.0, 'requests': 0,
+                           'failures': 0, 'last_probe': 0.0}
+            for backend in backends
+        }
+
+    @property
+    def remaining_characters(self) -> Optional[int]:
+        """Quota for job admission; None when an unmetered backend can absorb the overflow"""
+        quotas = [backend.remaining_characters for backend in self.backends if backend.is_available()]
+        if not quotas or None in quotas:
+            return None
+        return max(quotas)
+
+    def is_cached(self, text, voice_id, audio_format="MP3", sample_rate=44100.0) -> bool:
+        return any(backend.is_cached(text, voice_id, audio_format, sample_rate) for backend in self.backends)
+
+    def can_synthesize(self, text: str, voice_id: str) -> bool:
+        """Whether any backend can produce speech for this text right now"""
+        return any(backend.is_available() for backend in self.backends) or self.is_cached(text, voice_id)
+
+    def _is_healthy(self, backend: TTSBackend, text: str) -> bool:
+        remaining = backend.remaining_characters
+        if remaining is not None and remaining - len(text) < TTS_QUOTA_RESERVE_CHARS:
+            return False
+
+        health = self.health[backend.name]
+        degraded = (health['error_rate'] > TTS_ROUTER_MAX_ERROR_RATE or
+                    (health['latency_ewma'] or 0) > TTS_ROUTER_MAX_LATENCY)
+        if not degraded:
+            return True
+
+        # Let an occasional request through so a recovered backend is noticed
+        now = time.time()
+        with self._lock:
+            if now - health['last_probe'] >= TTS_ROUTER_PROBE_INTERVAL:
+                health['last_probe'] = now
+                return True
+        return False
+
+    def _candidates(self, text: str, voice_id: str, audio_format: str, sample_rate: float) -> List[TTSBackend]:
+        """Backends to try, best first"""
+        for backend in self.backends:
+            if backend.is_cached(text, voice_id, audio_format, sample_rate):
+                return [backend] + [b for b in self.backends if b is not backend and b.is_available()]
+
+        available = [backend for backend in self.backends if backend.is_available()]
+        healthy = [backend for backend in available if self._is_healthy(backend, text)]
+        return healthy + [backend for backend in available if backend not in healthy]
+
+    def _record(self, backend: TTSBackend, latency: float, success: bool) -> None:
+        with self._lock:
+            health = self.health[backend.name]
+            health['requests'] += 1
+            if not success:
+                health['failures'] += 1
+            health['error_rate'] = EWMA_ALPHA * (0.0 if success else 1.0) + (1 - EWMA_ALPHA) * health['error_rate']
+            if success:
+                previous = health['latency_ewma']
+                health['latency_ewma'] = latency if previous is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * previous
+
+    def generate_speech(self, text: str, voice_id: str = "en-US-natalie",
+                        audio_format: str = "MP3", sample_rate: float = 44100.0) -> Dict:
+        """Synthesize on the best backend, falling back to the next one on failure"""
+        result = {'success': False, 'error': 'No TTS backend available',
+                  'message': 'Murf is not configured and no local engine is installed'}
+
+        with stage('tts'):
+            for backend in self._candidates(text, voice_id, audio_format, sample_rate):
+                started = time.time()
+                result = backend.generate_speech(text, voice_id, audio_format, sample_rate)
+                if not result.get('cached'):
+                    self._record(backend, time.time() - started, bool(result.get('success')))
+                if result.get('success'):
+                    return dict(result, provider=backend.provider, backend=backend.name)
+                log.warning("⚠️ TTS backend failed, trying next", backend=backend.name, error=result.get('error'))
+
+        return result
+
+    def get_stats(self) -> Dict:
+        """Per-backend availability and health"""
+        return {
+            backend.name: dict(
+                self.health[backend.name],
+                available=backend.is_available(),
+                remaining_characters=backend.remaining_characters
+            )
+            for backend in self.backends
+        }
@@ -0,0 +1,191 @@
+"""Content-addressed TTS cache
+
+Disk-backed cache of synthesized speech keyed on hash(text, voice_id, format,
+sample_rate). Payloads are stored as files next to a SQLite metadata index
+that drives LRU eviction under a size cap, so repeated phrases (fallback,
+proactive and crisis messages) never hit the Murf API twice.
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+TTS_CACHE_DIR = os.environ.get('TTS_CACHE_DIR', 'tts_cache')
+TTS_CACHE_MAX_BYTES = int(os.environ.get('TTS_CACHE_MAX_BYTES', 512 * 1024 * 1024))  # 512 MB
+TTS_CACHE_MAX_ENTRIES = int(os.environ.get('TTS_CACHE_MAX_ENTRIES', 20000))
+
+class TTSCache:
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 max_entries: int = TTS_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'saved_characters': 0, 'evictions': 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(os.path.join(self.cache_dir, 'index.db'), check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tts_entries (
+                key TEXT PRIMARY KEY,
+                voice_id TEXT NOT NULL,
+                format TEXT NOT NULL,
+                sample_rate REAL NOT NULL,
+                text_chars INTEGER NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                expires_at REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tts_entries_lru ON tts_entries (last_access)")
+        return conn
+
+    def reopen(self) -> None:
+        """Open a fresh index connection in a forked worker (SQLite handles must not cross fork)"""
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    @staticmethod
+    def make_key(text: str, voice_id: str, audio_format: str = "MP3", sample_rate: float = 44100.0) -> str:
+        """Content address for a synthesis request"""
+        material = json.dumps([text, voice_id, audio_format.upper(), float(sample_rate)], ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _payload_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_payload(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._payload_path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def contains(self, key: str, is_valid: Optional[Callable[[Dict], bool]] = None, min_ttl: float = 0) -> bool:
+        """Whether a usable entry exists, without counting a hit or miss.
+
+        Entries expiring within `min_ttl` seconds count as absent. With
+        `is_valid`, the payload is checked too (e.g. that its stored audio still
+        exists) and entries failing the check are dropped.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM tts_entries WHERE key = ?", (key,)).fetchone()
+        if not row or (row[0] is not None and row[0] <= time.time() + min_ttl):
+            return False
+        if is_valid is None:
+            return True
+
+        payload = self._read_payload(key)
+        if payload is not None and is_valid(payload):
+            return True
+        with self._lock:
+            self._delete(key)
+        return False
+
+    def get(self, key: str, is_valid: Optional[Callable[[Dict], bool]] = None) -> Optional[Dict]:
+        """Return the cached synthesis result, or None on a miss
+
+        With `is_valid`, a payload failing the check (e.g. its stored audio was
+        evicted) is dropped and counted as a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text_chars, expires_at FROM tts_entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and row[1] is not None and row[1] <= now:
+                self._delete(key)
+                row = None
+
+            payload = None
+            if row:
+                payload = self._read_payload(key)
+                if payload is not None and is_valid is not None and not is_valid(payload):
+                    payload = None
+                if payload is None:
+                    self._delete(key)
+
+            if payload is None:
+                self.stats['misses'] += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE tts_entries SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self.stats['hits'] += 1
+            self.stats['saved_characters'] += row[0]
+            return payload
+
+    def put(self, key: str, result: Dict, text_chars: int, voice_id: str,
+            audio_format: str = "MP3", sample_rate: float = 44100.0,
+            expires_at: Optional[float] = None) -> None:
+        """Store a synthesis result and evict least recently used entries over the caps"""
+        data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        path = self._payload_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO tts_entries
+                (key, voice_id, format, sample_rate, text_chars, size_bytes, created_at, last_access, hits, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+            """, (key, voice_id, audio_format.upper(), float(sample_rate), text_chars, len(data), now, now, expires_at))
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within the caps (caller holds the lock)"""
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM tts_entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        for key, size in self._conn.execute(
+                "SELECT key, size_bytes FROM tts_entries ORDER BY last_access").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._delete(key)
+            count -= 1
+            total -= size
+            self.stats['evictions'] += 1
+
+    def _delete(self, key: str) -> None:
+        """Remove an entry and its payload (caller holds the lock)"""
+        self._conn.execute("DELETE FROM tts_entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._payload_path(key))
+        except OSError:
+            pass
+
+    def get_stats(self) -> Dict:
+        """Cache effectiveness and size summary"""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM tts_entries"
+            ).fetchone()
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'entries': count,
+            'size_bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+            'saved_murf_characters': self.stats['saved_characters'],
+            'evictions': self.stats['evictions']
+        }
@@ -0,0 +1,88 @@
+"""Sentence-chunked TTS synthesis
+
+Splits long replies at sentence boundaries and synthesizes the chunks in
+parallel, yielding them in order as soon as each one (and every chunk before
+it) is ready so playback can start on the first sentence instead of waiting
+for the whole reply.
+
+Chunks run as jobs on the shared speech job queue (tts_jobs.py), so they go
+through the same quota admission and worker pool as every other synthesis,
+and each request keeps at most TTS_CHUNK_CONCURRENCY chunks queued at once so
+one long reply cannot crowd out other requests.
+"""
+
+import os
+import re
+from typing import Dict, Iterator, List, Optional
+
+from tts_jobs import PRIORITY_NORMAL
+
+TTS_CHUNK_MAX_CHARS = int(os.environ.get('TTS_CHUNK_MAX_CHARS', 300))
+TTS_CHUNK_CONCURRENCY = int(os.environ.get('TTS_CHUNK_CONCURRENCY', 3))  # Chunks in flight per request
+TTS_CHUNK_WAIT = 60  # Longest a stream waits for one chunk
+
+# Sentence ends: Latin punctuation, Devanagari danda, or line breaks
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?।])\s+|\n+')
+CLAUSE_BOUNDARY = re.compile(r'(?<=[,;:])\s+')
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """Break a sentence longer than max_chars at clause boundaries, then at spaces"""
+    parts = []
+    for clause in CLAUSE_BOUNDARY.split(sentence):
+        while len(clause) > max_chars:
+            cut = clause.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            parts.append(clause[:cut].strip())
+            clause = clause[cut:].strip()
+        if clause:
+            parts.append(clause)
+    return parts
+
+def split_into_chunks(text: str, max_chars: int = TTS_CHUNK_MAX_CHARS) -> List[str]:
+    """Split text into sentence-aligned chunks of at most max_chars"""
+    pieces = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        pieces.extend(_split_long(sentence, max_chars) if len(sentence) > max_chars else [sentence])
+
+    # Merge short sentences so each request carries a reasonable amount of speech,
+    # keeping the first sentence on its own so audio can start as early as possible
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + 1 + len(piece) <= max_chars and len(chunks) > 1:
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    return chunks
+
+class ChunkedSynthesizer:
+    def __init__(self, speech_jobs, max_in_flight: int = TTS_CHUNK_CONCURRENCY, chunk_wait: float = TTS_CHUNK_WAIT):
+        self.speech_jobs = speech_jobs
+        self.max_in_flight = max(1, max_in_flight)
+        self.chunk_wait = chunk_wait
+
+    def iter_in_order(self, chunks: List[str], voice_id: str, user_id: str = 'anonymous',
+                      priority: int = PRIORITY_NORMAL) -> Iterator[Dict]:
+        """Yield chunk results in order, each as soon as it is ready"""
+        job_ids: List[Optional[str]] = []
+        index = 0
+        try:
+            for index, chunk in enumerate(chunks):
+                # Keep a sliding window of this request's chunks on the shared queue
+                while len(job_ids) < min(index + self.max_in_flight, len(chunks)):
+                    job_ids.append(self.speech_jobs.submit(chunks[len(job_ids)], voice_id, user_id=user_id,
+                                                           priority=priority))
+                job = self.speech_jobs.get(job_ids[index], wait=self.chunk_wait) if job_ids[index] else None
+                if job and job['result']:
+                    result = job['result']
+                else:
+                    result = {'success': False, 'error': 'TTS busy',
+                              'message': 'Speech job queue full' if not job else f"Speech job still {job['status']}"}
+                yield dict(result, index=index, text=chunk, chunk_count=len(chunks))
+        finally:
+            # Stop work nobody will consume if the client went away
+            for job_id in job_ids[index + 1:]:
+                if job_id:
+                    self.speech_jobs.cancel(job_id)
@@ -0,0 +1,212 @@
+"""Background speech synthesis jobs
+
+Asynchronous TTS job queue: requests are accepted immediately and get a job id,
+then dispatched in priority order through a bounded worker pool sharing the one
+Murf client. Jobs are admitted against the character quota Murf reports back,
+so as the quota runs low, low-priority work is deferred or shed to keep
+characters for chat replies and, last of all, crisis messages.
+"""
+
+import itertools
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+TTS_JOB_WORKERS = int(os.environ.get('TTS_JOB_WORKERS', 4))
+TTS_JOB_QUEUE_MAX = int(os.environ.get('TTS_JOB_QUEUE_MAX', 200))
+TTS_JOB_TTL = 600  # Finished jobs are kept for 10 minutes
+
+# Quota thresholds in Murf characters
+TTS_QUOTA_DEFER_CHARS = int(os.environ.get('TTS_QUOTA_DEFER_CHARS', 20000))  # Below this low-priority jobs wait
+TTS_QUOTA_RESERVE_CHARS = int(os.environ.get('TTS_QUOTA_RESERVE_CHARS', 5000))  # Kept for high-priority jobs
+TTS_JOB_DEFER_SECONDS = 30
+TTS_JOB_MAX_DEFERRALS = 10
+
+PRIORITY_HIGH = 0  # Crisis responses
+PRIORITY_NORMAL = 1  # Chat replies
+PRIORITY_LOW = 2  # Prefetch and other speculative work
+PRIORITIES = {'high': PRIORITY_HIGH, 'normal': PRIORITY_NORMAL, 'low': PRIORITY_LOW}
+
+class SpeechJobRegistry:
+    def __init__(self, tts_service, max_workers: int = TTS_JOB_WORKERS,
+                 max_queued: int = TTS_JOB_QUEUE_MAX, ttl_seconds: float = TTS_JOB_TTL):
+        self.tts_service = tts_service
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._queue: queue.PriorityQueue = queue.PriorityQueue(maxsize=max_queued)
+        self._sequence = itertools.count()  # FIFO within a priority level
+        self._workers_pid: Optional[int] = None
+        self.stats = {'submitted': 0, 'rejected': 0, 'done': 0, 'failed': 0, 'shed': 0, 'deferred': 0,
+                      'cancelled': 0}
+
+    def _ensure_workers(self) -> None:
+        """Start the worker pool on first use in this process
+
+        Threads do not survive fork, so a registry created in a pre-fork master
+        starts its pool (and a fresh queue) lazily in each worker instead.
+        """
+        if self._workers_pid == os.getpid():
+            return
+        with self._lock:
+            if self._workers_pid == os.getpid():
+                return
+            self._queue = queue.PriorityQueue(maxsize=self.max_queued)
+            for index in range(self.max_workers):
+                threading.Thread(target=self._worker, name=f"tts-job-{index}", daemon=True).start()
+            self._workers_pid = os.getpid()
+
+    def submit(self, text: str, voice_id: str, user_id: str = 'anonymous',
+               priority: int = PRIORITY_NORMAL) -> Optional[str]:
+        """Queue synthesis of text and return the job id, or None if the queue is full"""
+        self._ensure_workers()
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'user_id': user_id,
+            'status': 'queued',
+            'priority': priority,
+            'text_chars': len(text),
+            'deferrals': 0,
+            'result': None,
+            'created_at': time.time(),
+            'finished_at': None,
+            '_text': text,
+            '_voice_id': voice_id,
+            '_done': threading.Event()
+        }
+        with self._lock:
+            self._purge_expired()
+            self._jobs[job_id] = job
+
+        if not self._enqueue(job):
+            with self._lock:
+                self._jobs.pop(job_id, None)
+                self.stats['rejected'] += 1
+            return None
+
+        self.stats['submitted'] += 1
+        return job_id
+
+    def _enqueue(self, job: Dict) -> bool:
+        try:
+            self._queue.put_nowait((job['priority'], next(self._sequence), job['job_id']))
+            return True
+        except queue.Full:
+            return False
+
+    def _admission(self, job: Dict) -> str:
+        """Decide whether a job may call Murf now: 'run', 'defer' or 'shed'"""
+        if self.tts_service.is_cached(job['_text'], job['_voice_id']):
+            return 'run'  # Cached speech costs no quota
+
+        remaining = self.tts_service.remaining_characters
+        if remaining is None:
+            return 'run'  # Quota unknown until the first Murf response
+        if job['text_chars'] > remaining:
+            return 'shed'
+        if job['priority'] == PRIORITY_HIGH:
+            return 'run'
+        if remaining - job['text_chars'] < TTS_QUOTA_RESERVE_CHARS:
+            return 'shed'
+        if job['priority'] == PRIORITY_LOW and remaining < TTS_QUOTA_DEFER_CHARS:
+            return 'defer' if job['deferrals'] < TTS_JOB_MAX_DEFERRALS else 'shed'
+        return 'run'
+
+    def _defer(self, job: Dict) -> None:
+        """Put a job back on the queue after a delay, leaving room for higher-priority work"""
+        job['status'] = 'deferred'
+        job['deferrals'] += 1
+        self.stats['deferred'] += 1
+
+        def requeue():
+            if job['status'] == 'cancelled':
+                return
+            if not self._enqueue(job):
+                self._finish(job, 'shed', {'success': False, 'error': 'TTS queue full',
+                                           'message': 'Deferred speech job could not be requeued'})
+            else:
+                job['status'] = 'queued'
+
+        timer = threading.Timer(TTS_JOB_DEFER_SECONDS, requeue)
+        timer.daemon = True
+        timer.start()
+
+    def _finish(self, job: Dict, status: str, result: Dict) -> None:
+        job['result'] = result
+        job['status'] = status
+        job['finished_at'] = time.time()
+        self.stats[status] += 1
+        job['_done'].set()
+
+    def _worker(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] == 'cancelled':
+                continue
+
+            decision = self._admission(job)
+            if decision == 'defer':
+                self._defer(job)
+                continue
+            if decision == 'shed':
+                log.info("⏭️ Shedding speech job, Murf quota low", job_id=job_id, priority=job['priority'],
+                         remaining_characters=self.tts_service.remaining_characters)
+                self._finish(job, 'shed', {
+                    'success': False,
+                    'error': 'TTS quota low',
+                    'message': f"Murf characters remaining: {self.tts_service.remaining_characters}"
+                })
+                continue
+
+            job['status'] = 'running'
+            try:
+                result = self.tts_service.generate_speech(text=job['_text'], voice_id=job['_voice_id'])
+            except Exception as e:
+                result = {'success': False, 'error': 'Unexpected error', 'message': str(e)}
+            self._finish(job, 'done' if result.get('success') else 'failed', result)
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that has not started yet (its requester went away)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in ('queued', 'deferred'):
+                return False
+            job['status'] = 'cancelled'
+            job['finished_at'] = time.time()
+            self.stats['cancelled'] += 1
+        job['_done'].set()
+        return True
+
+    def get(self, job_id: str, wait: float = 0) -> Optional[Dict]:
+        """Job status and result, optionally waiting up to `wait` seconds for completion"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if wait > 0:
+            job['_done'].wait(wait)
+        return {k: v for k, v in job.items() if not k.startswith('_')}
+
+    def get_stats(self) -> Dict:
+        """Queue depth, outcome counts and the last known quota"""
+        return dict(
+            self.stats,
+            queued=self._queue.qsize(),
+            remaining_characters=self.tts_service.remaining_characters
+        )
+
+    def _purge_expired(self) -> None:
+        """Forget finished jobs older than the TTL (caller holds the lock)"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [k for k, v in self._jobs.items() if v['finished_at'] and v['created_at'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,116 @@
+"""TTS cache warm-up
+
+Synthesizes every static user-facing string (crisis messages, fallback replies,
+proactive templates and starters) into the TTS cache so those replies always
+have audio ready. Runs rate-limited and is resumable: strings already in the
+cache are skipped, and progress is recorded to a small JSON file. The service
+runs it periodically, renewing strings whose cached audio would expire (or
+whose stored audio was evicted) before the next run.
+
+Run at deploy time with:
+    python tts_warmup.py
+"""
+
+import os
+import json
+import time
+from typing import Dict, List, Optional
+
+from crisis_detection import CRISIS_RESPONSES
+from static_responses import (
+    PROACTIVE_STARTERS, PROACTIVE_FALLBACK_MESSAGES,
+    CHAT_FALLBACK_RESPONSES, CHAT_ERROR_FALLBACK_RESPONSES
+)
+from tts_jobs import TTS_QUOTA_DEFER_CHARS
+from service_logging import get_logger
+
+log = get_logger(__name__)
+
+TTS_WARMUP_RATE_PER_MINUTE = float(os.environ.get('TTS_WARMUP_RATE_PER_MINUTE', 20))
+TTS_WARMUP_PROGRESS_PATH = os.environ.get('TTS_WARMUP_PROGRESS_PATH', 'tts_warmup_progress.json')
+MAX_CONSECUTIVE_FAILURES = 5  # Stop and resume on the next run after this many failures in a row
+
+def collect_static_texts() -> List[str]:
+    """All static strings that may be spoken, most important first, without duplicates"""
+    texts = [response['user_message'] for _, response in sorted(CRISIS_RESPONSES.items(), reverse=True)]
+    for responses in (CHAT_FALLBACK_RESPONSES, CHAT_ERROR_FALLBACK_RESPONSES):
+        for context_responses in responses.values():
+            texts.extend(context_responses)
+    for context_messages in PROACTIVE_FALLBACK_MESSAGES.values():
+        texts.extend(context_messages.values())
+    for starters in PROACTIVE_STARTERS.values():
+        texts.extend(starters)
+
+    return list(dict.fromkeys(text.strip() for text in texts if text.strip()))
+
+class TTSWarmup:
+    def __init__(self, tts_service, voice_id: str = "en-US-natalie",
+                 rate_per_minute: float = TTS_WARMUP_RATE_PER_MINUTE,
+                 progress_path: Optional[str] = TTS_WARMUP_PROGRESS_PATH, refresh_within: float = 0):
+        self.tts_service = tts_service
+        self.voice_id = voice_id
+        self.refresh_within = refresh_within  # Re-synthesize cached audio expiring within this many seconds
+        self.min_interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0
+        self.progress_path = progress_path
+        self.progress = {'synthesized': 0, 'skipped': 0, 'failed': 0, 'remaining': 0, 'completed': False}
+
+    def _save_progress(self) -> None:
+        if not self.progress_path:
+            return
+        try:
+            with open(self.progress_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(self.progress, updated_at=time.time()), f, indent=2)
+        except OSError as e:
+            log.warning("⚠️ Could not write TTS warm-up progress", error=str(e))
+
+    def run(self, texts: Optional[List[str]] = None) -> Dict:
+        """Synthesize every uncached text, pacing requests to the configured rate"""
+        texts = texts if texts is not None else collect_static_texts()
+        pending = [text for text in texts
+                   if not self.tts_service.is_cached(text, self.voice_id, min_ttl=self.refresh_within)]
+        self.progress.update(synthesized=0, failed=0, skipped=len(texts) - len(pending), remaining=len(pending),
+                             completed=False)
+        log.info("🔥 TTS warm-up starting", pending=len(pending), total=len(texts))
+
+        consecutive_failures = 0
+        last_request = 0.0
+        for text in pending:
+            # Warm-up is low-priority work: leave the remaining quota for live replies
+            remaining = self.tts_service.remaining_characters
+            if remaining is not None and remaining < TTS_QUOTA_DEFER_CHARS:
+                log.info("⏸️ TTS warm-up paused, Murf quota low", remaining_characters=remaining)
+                break
+
+            wait = self.min_interval - (time.time() - last_request)
+            if wait > 0:
+                time.sleep(wait)
+            last_request = time.time()
+
+            result = self.tts_service.generate_speech(text=text, voice_id=self.voice_id, refresh=True)
+            if result.get('success'):
+                self.progress['synthesized'] += 1
+                consecutive_failures = 0
+            else:
+                self.progress['failed'] += 1
+                consecutive_failures += 1
+                log.warning("⚠️ TTS warm-up failed for a string", text=text, error=result.get('error'))
+                if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                    log.warning("⏸️ TTS warm-up paused after repeated failures, will resume on next run")
+                    break
+            self.progress['remaining'] -= 1
+            self._save_progress()
+
+        self.progress['completed'] = self.progress['remaining'] == 0
+        self._save_progress()
+        log.info("✅ TTS warm-up finished", **self.progress)
+        return self.progress
+
+if __name__ == "__main__":
+    from murf_tts_service import MurfTTSService
+    from tts_cache import TTSCache
+
+    service = MurfTTSService(cache=TTSCache())
+    if not service.client:
+        log.error("❌ MURF_API_KEY not configured, nothing to warm up")
+    else:
+        TTSWarmup(service).run()